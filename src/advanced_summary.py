@@ -50,7 +50,8 @@ product_region_sales = df.pivot_table(
     index="Product",
     columns="Region",
     values="Sales",
-    aggfunc="sum"
+    aggfunc="sum",
+    observed=True,
 )
 
 print("\nProduct-Region Sales Matrix (Total Sales):")
@@ -70,8 +71,8 @@ print("\nAverage Sales by Age Group:")
 print(age_summary)
 
 # Gender-based analysis
-gender_sales = df.groupby("Customer_Gender")["Sales"].agg(["count", "mean", "sum"]).reset_index()
-gender_satisfaction = df.groupby("Customer_Gender")["Customer_Satisfaction"].mean().reset_index()
+gender_sales = df.groupby("Customer_Gender", observed=True)["Sales"].agg(["count", "mean", "sum"]).reset_index()
+gender_satisfaction = df.groupby("Customer_Gender", observed=True)["Customer_Satisfaction"].mean().reset_index()
 
 print("\nSales by Gender:")
 print(gender_sales)
@@ -0,0 +1,296 @@
+"""
+Mergeable partial aggregates for the sales knowledge base.
+
+Each grouping (Product, Region, Month, Customer_Age, Customer_Gender and the
+Age × Gender pair) keeps one small table of per-group partials:
+sum / count / max / sum-of-squares of Sales plus sum / count of
+Customer_Satisfaction. Partials from different chunks (or partitions) fold
+together with plain sums and maxes, and the KB tables are derived from them
+without ever holding the raw rows. A chunk is reduced once over all the
+grouping keys and every grouping is rolled up from that small table, so a
+small append costs O(batch) rather than one groupby per grouping.
+"""
+
+import numpy as np
+import pandas as pd
+
+GROUPINGS = {
+    "product": ["Product"],
+    "region": ["Region"],
+    "month": ["Month"],
+    "age": ["Customer_Age"],
+    "gender": ["Customer_Gender"],
+    "age_gender": ["Customer_Age", "Customer_Gender"],
+}
+
+KB_TABLES = [
+    "product_summary",
+    "region_summary",
+    "monthly_sales",
+    "age_summary",
+    "gender_summary",
+    "age_gender_matrix",
+]
+
+# How each partial column combines across chunks
+MERGE_RULES = {
+    "sales_sum": "sum",
+    "sales_count": "sum",
+    "sales_max": "max",
+    "sales_sumsq": "sum",
+    "sat_sum": "sum",
+    "sat_count": "sum",
+}
+
+
+# Every key any grouping uses; a chunk is reduced over all of them once
+FINE_KEYS = list(dict.fromkeys(key for keys in GROUPINGS.values() for key in keys))
+GROWTH_FACTOR = 2
+
+
+def _group_ids(codes):
+    """Dense group id per row (first-appearance order) for one or more integer code columns."""
+    ids = pd.factorize(codes[0])[0]
+    for column in codes[1:]:
+        ids = pd.factorize(ids * (int(column.max()) + 1) + column)[0]
+    return ids, (int(ids.max()) + 1 if len(ids) else 0)
+
+
+def _first_rows(ids, n_groups):
+    """Position of the first row of each group."""
+    return np.unique(ids, return_index=True)[1] if n_groups else np.empty(0, dtype=np.int64)
+
+
+def _reduce(ids, n_groups, measures):
+    """Fold per-row (or per-group) measures into ``n_groups`` partials."""
+    reduced = {}
+    for column, rule in MERGE_RULES.items():
+        values = measures[column]
+        if rule == "sum":
+            total = np.bincount(ids, weights=values, minlength=n_groups)
+            reduced[column] = total.astype(np.int64) if values.dtype.kind in "iub" else total
+        else:
+            peak = np.full(n_groups, np.nan)
+            np.fmax.at(peak, ids, values)
+            reduced[column] = peak
+    return reduced
+
+
+def _row_measures(df: pd.DataFrame):
+    """Each row as a one-row partial (missing Sales / satisfaction are not counted)."""
+    sales = df["Sales"].to_numpy(dtype=np.float64, na_value=np.nan)
+    sat = df["Customer_Satisfaction"].to_numpy(dtype=np.float64, na_value=np.nan)
+    has_sales, has_sat = ~np.isnan(sales), ~np.isnan(sat)
+    sales_clean = np.where(has_sales, sales, 0.0)
+    return {
+        "sales_sum": sales_clean,
+        "sales_count": has_sales.astype(np.int64),
+        "sales_max": sales,
+        "sales_sumsq": sales_clean * sales_clean,
+        "sat_sum": np.where(has_sat, sat, 0.0),
+        "sat_count": has_sat.astype(np.int64),
+    }
+
+
+class PartialTable:
+    """
+    Per-group partials of one grouping, held as growable column arrays.
+    Groups are looked up by label in a dict, so folding a batch costs
+    O(groups in the batch), not O(groups seen so far).
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.rows = {}
+        self.labels = [[] for _ in self.keys]
+        self.label_dtypes = [None for _ in self.keys]
+        self.values = {
+            column: np.zeros(0, dtype=np.int64 if column.endswith("_count") else np.float64)
+            for column in MERGE_RULES
+        }
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _reserve(self, size):
+        capacity = len(self.values["sales_sum"])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * GROWTH_FACTOR)
+        for column, rule in MERGE_RULES.items():
+            old = self.values[column]
+            grown = np.full(capacity, np.nan if rule == "max" else 0, dtype=old.dtype)
+            grown[: len(old)] = old
+            self.values[column] = grown
+
+    def fold(self, labels, partial):
+        """Add ``partial`` (one row per distinct group) for groups ``labels`` (one array per key)."""
+        for i, column in enumerate(labels):
+            if self.label_dtypes[i] is None:
+                self.label_dtypes[i] = column.dtype
+
+        positions = np.empty(len(labels[0]), dtype=np.int64)
+        for i, label in enumerate(zip(*(column.tolist() for column in labels))):
+            row = self.rows.get(label)
+            if row is None:
+                row = self.rows[label] = len(self.rows)
+                for values, part in zip(self.labels, label):
+                    values.append(part)
+            positions[i] = row
+
+        self._reserve(len(self.rows))
+        for column, rule in MERGE_RULES.items():
+            target = self.values[column]
+            if rule == "sum":
+                target[positions] += partial[column].astype(target.dtype, copy=False)
+            else:
+                target[positions] = np.fmax(target[positions], partial[column])
+
+    def label_arrays(self):
+        return [
+            np.asarray(values, dtype=dtype if dtype is not None else object)
+            for values, dtype in zip(self.labels, self.label_dtypes)
+        ]
+
+    def frame(self, sales_dtype=None) -> pd.DataFrame:
+        """The partials as a DataFrame indexed by the grouping keys."""
+        arrays = self.label_arrays()
+        if len(arrays) == 1:
+            index = pd.Index(arrays[0], name=self.keys[0])
+        else:
+            index = pd.MultiIndex.from_arrays(arrays, names=self.keys)
+
+        n = len(self)
+        frame = pd.DataFrame({column: self.values[column][:n].copy() for column in MERGE_RULES}, index=index)
+        # Sums and maxes of an integer Sales column keep its dtype, as a groupby would
+        if sales_dtype is not None and np.dtype(sales_dtype).kind in "iu":
+            frame = frame.astype({"sales_sum": sales_dtype, "sales_max": sales_dtype})
+        return frame
+
+
+class SalesAggregates:
+    """
+    Partial aggregates for every KB grouping.
+    Fold chunks in with ``update`` or combine two instances with ``merge``.
+    """
+
+    def __init__(self):
+        self.partials = {name: PartialTable(keys) for name, keys in GROUPINGS.items()}
+        self.sales_dtype = None
+        self.row_count = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        aggregates = cls()
+        aggregates.update(df)
+        return aggregates
+
+    @property
+    def tables(self):
+        """{grouping: partials DataFrame}."""
+        return {name: partial.frame(self.sales_dtype) for name, partial in self.partials.items()}
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Fold one prepared chunk (Date parsed, Month derived) into the partials.
+        The chunk is reduced once over every key; each grouping is then
+        rolled up from that (at most chunk-sized) table.
+        """
+        if chunk is None or chunk.empty:
+            return self
+        if self.sales_dtype is None:
+            self.sales_dtype = chunk["Sales"].dtype
+
+        # Codes are shifted by one so 0 marks a missing key
+        codes, uniques = {}, {}
+        for key in FINE_KEYS:
+            key_codes, key_uniques = pd.factorize(chunk[key])
+            codes[key] = key_codes + 1
+            uniques[key] = np.asarray(key_uniques)
+
+        fine_ids, n_fine = _group_ids([codes[key] for key in FINE_KEYS])
+        fine = _reduce(fine_ids, n_fine, _row_measures(chunk))
+        first = _first_rows(fine_ids, n_fine)
+        fine_codes = {key: codes[key][first] for key in FINE_KEYS}
+
+        for name, keys in GROUPINGS.items():
+            present = np.logical_and.reduce([fine_codes[key] > 0 for key in keys])
+            key_codes = [fine_codes[key][present] for key in keys]
+            ids, n_groups = _group_ids(key_codes)
+            partial = _reduce(ids, n_groups, {column: fine[column][present] for column in MERGE_RULES})
+            rows = _first_rows(ids, n_groups)
+            labels = [uniques[key][column[rows] - 1] for key, column in zip(keys, key_codes)]
+            self.partials[name].fold(labels, partial)
+
+        self.row_count += len(chunk)
+        return self
+
+    def merge(self, other: "SalesAggregates"):
+        """Fold another SalesAggregates (e.g. from a different partition) into this one."""
+        if self.sales_dtype is None:
+            self.sales_dtype = other.sales_dtype
+        for name, partial in other.partials.items():
+            if len(partial):
+                n = len(partial)
+                self.partials[name].fold(
+                    partial.label_arrays(),
+                    {column: values[:n] for column, values in partial.values.items()},
+                )
+        self.row_count += other.row_count
+        return self
+
+    # ---------------------------------------------------------
+    # KB tables derived from the partials
+    # ---------------------------------------------------------
+    def _sorted(self, name):
+        return self.partials[name].frame(self.sales_dtype).sort_index()
+
+    def _summary(self, name, key):
+        table = self._sorted(name)
+        summary = pd.DataFrame({
+            "Sales_sum": table["sales_sum"],
+            "Sales_mean": table["sales_sum"] / table["sales_count"],
+            "Sales_max": table["sales_max"],
+            "Customer_Satisfaction_mean": table["sat_sum"] / table["sat_count"],
+        })
+        summary.index.name = key
+        return summary.reset_index()
+
+    def product_summary(self):
+        return self._summary("product", "Product")
+
+    def region_summary(self):
+        return self._summary("region", "Region")
+
+    def monthly_sales(self):
+        monthly = self._sorted("month")
+        return pd.DataFrame({
+            "Month": monthly.index.get_level_values(0),
+            "Sales": monthly["sales_sum"].to_numpy(),
+        })
+
+    def age_summary(self):
+        age = self._sorted("age")
+        return pd.DataFrame({
+            "Customer_Age": age.index.get_level_values(0),
+            "Average_Sales": (age["sales_sum"] / age["sales_count"]).to_numpy(),
+        })
+
+    def gender_summary(self):
+        gender = self._sorted("gender")
+        return pd.DataFrame({
+            "Customer_Gender": gender.index.get_level_values(0),
+            "Total_Sales": gender["sales_sum"].to_numpy(),
+        })
+
+    def age_gender_matrix(self):
+        age_gender = self._sorted("age_gender")
+        return (age_gender["sales_sum"] / age_gender["sales_count"]).unstack("Customer_Gender")
+
+    def table_builders(self):
+        """Zero-argument builders per KB table (for ``knowledge_base.LazyKB``)."""
+        return {name: getattr(self, name) for name in KB_TABLES}
+
+    def to_kb(self) -> dict:
+        """Build the same tables as ``load_data.build_kb`` from the partials."""
+        return {name: build() for name, build in self.table_builders().items()}
@@ -0,0 +1,198 @@
+"""
+Approximate nearest-neighbour search for ``SimpleVectorStore``.
+
+``IVFIndex`` is an inverted-file index: a spherical k-means coarse
+quantizer splits the (unit-norm) vectors into ``n_lists`` cells, and a
+query scans only the ``nprobe`` cells whose centroids are closest. Cost
+per query is roughly ``nprobe / n_lists`` of a brute-force scan; raising
+``nprobe`` trades latency for recall. The index stores row ids only and
+scores candidates against the store's own matrix.
+
+``recall_at_k`` measures an index against exact search so the knob can be
+tuned per collection (see ``evaluate_ann.py``).
+"""
+
+import threading
+import time
+
+import numpy as np
+
+INDEX_TYPES = ["exact", "ivf", "int8", "pq"]
+
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+# Training sample per centroid, and the smallest store worth indexing
+SAMPLES_PER_LIST = 50
+MIN_INDEX_SIZE = 10_000
+ASSIGN_BLOCK = 65_536
+
+
+def top_k(scores, k):
+    """Positions of the ``k`` largest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _nearest(vectors, centroids):
+    """Index of the most similar centroid per row (blocked to bound memory)."""
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK):
+        block = vectors[start: start + ASSIGN_BLOCK]
+        out[start: start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(vectors, n_clusters, iterations=KMEANS_ITERATIONS, seed=0):
+    """Unit-norm centroids maximizing cosine similarity to their members."""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = _nearest(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        labels, starts = np.unique(assign[order], return_index=True)
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+
+        # Empty cells restart from random rows
+        updated = vectors[rng.choice(len(vectors), n_clusters)].copy()
+        updated[labels] = sums
+        norms = np.linalg.norm(updated, axis=1, keepdims=True)
+        centroids = np.divide(updated, norms, out=updated, where=norms > 0)
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over unit-norm rows.
+
+    ``n_lists`` defaults to ~sqrt(n) when trained; ``nprobe`` is the number
+    of cells scanned per query (can also be passed per search).
+    """
+
+    kind = "ivf"
+
+    def __init__(self, n_lists=None, nprobe=DEFAULT_NPROBE, min_size=MIN_INDEX_SIZE, seed=0):
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.min_size = min_size
+        self.seed = seed
+
+        self.centroids = None
+        self.lists = []
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def train(self, vectors):
+        n = len(vectors)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(n, n_lists * SAMPLES_PER_LIST)
+        sample = vectors[np.sort(rng.choice(n, sample_size, replace=False))]
+
+        self.centroids = spherical_kmeans(sample, n_lists, seed=self.seed)
+        self.n_lists = n_lists
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self.count = 0
+        return self
+
+    def add(self, vectors):
+        """Index rows ``count..len(vectors)`` (rows are appended, never changed)."""
+        new = vectors[self.count:]
+        if not len(new):
+            return self
+
+        ids = np.arange(self.count, self.count + len(new))
+        assign = _nearest(new, self.centroids)
+        order = np.argsort(assign, kind="stable")
+        labels, starts = np.unique(assign[order], return_index=True)
+        for label, chunk in zip(labels, np.split(ids[order], starts[1:])):
+            self.lists[label] = np.concatenate([self.lists[label], chunk])
+
+        self.count = len(vectors)
+        return self
+
+    def sync(self, vectors):
+        """Train on first use, then index any rows added since."""
+        with self._lock:
+            if not self.trained:
+                self.train(vectors)
+            return self.add(vectors)
+
+    def search(self, vectors, query, k, nprobe=None):
+        """(row ids, scores) of the approximate top ``k`` for a unit-norm query."""
+        if len(vectors) < self.min_size:
+            scores = vectors @ query
+            top = top_k(scores, k)
+            return top, scores[top]
+
+        self.sync(vectors)
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        cells = top_k(self.centroids @ query, nprobe)
+        candidates = np.concatenate([self.lists[c] for c in cells])
+
+        scores = vectors[candidates] @ query
+        top = top_k(scores, k)
+        return candidates[top], scores[top]
+
+
+def make_index(config=None):
+    """
+    Index from a config dict such as {"type": "ivf", "nprobe": 16} or
+    {"type": "pq", "m": 48, "rerank": 100}. "exact" (the default) returns
+    None: the store scans every row. Keys that do not apply to the chosen
+    type (e.g. nprobe for "exact") are ignored.
+    """
+    # Imported here: quantization builds on this module's helpers
+    from quantization import QUANTIZERS, QuantizedIndex
+
+    config = dict(config or {})
+    kind = config.pop("type", "exact")
+    if kind == "exact":
+        return None
+    if kind == "ivf":
+        return IVFIndex(**{key: config[key] for key in ("n_lists", "nprobe", "min_size", "seed") if key in config})
+    if kind in QUANTIZERS:
+        options = {"m": config["m"]} if kind == "pq" and "m" in config else {}
+        return QuantizedIndex(QUANTIZERS[kind](**options), rerank=config.get("rerank", 100))
+    raise ValueError(f"Unknown vector index type '{kind}'. Use one of {INDEX_TYPES}.")
+
+
+# ---------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------
+def recall_at_k(index, vectors, queries, k=10, nprobe=None):
+    """
+    Mean recall@k of ``index`` against exact search for unit-norm
+    ``queries``, plus mean query latency (ms) of each.
+    """
+    index.sync(vectors)
+    hits, ann_time, exact_time = 0, 0.0, 0.0
+
+    for query in queries:
+        started = time.perf_counter()
+        exact = top_k(vectors @ query, k)
+        exact_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        approx, _ = index.search(vectors, query, k, nprobe=nprobe)
+        ann_time += time.perf_counter() - started
+
+        hits += len(np.intersect1d(exact, approx))
+
+    n = max(len(queries), 1)
+    return {
+        "recall": hits / (n * k),
+        "ann_ms": ann_time / n * 1000,
+        "exact_ms": exact_time / n * 1000,
+    }
@@ -0,0 +1,181 @@
+"""
+Batched anomaly scoring for monthly sales series.
+
+``AnomalyEngine`` holds a (series × months) matrix covering every slice
+(total, products, regions, product × region pairs, demographic groups)
+and scores every cell in one vectorized pass with three detectors:
+
+* z-score against the series mean / std,
+* robust z-score against the series median / MAD,
+* seasonal z-score: residual from the series' month-of-year profile,
+  scaled by the MAD of those residuals.
+
+Severity is the largest absolute score. ``top(k)`` ranks the flagged
+cells; ``extend`` appends new months and updates the running moments and
+seasonal profile instead of refitting from scratch (the retriever calls
+it after appends that add months). Medians and MADs are order statistics,
+so they are still recomputed over the matrix when scores are next read.
+"""
+
+import numpy as np
+
+Z_THRESHOLD = 2.0
+ROBUST_THRESHOLD = 3.5
+SEASONAL_THRESHOLD = 3.5
+
+# MAD -> standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+
+def _robust_scale(deviations):
+    """MAD-based scale per row (0 where the MAD is 0)."""
+    return MAD_SCALE * np.median(np.abs(deviations), axis=1, keepdims=True)
+
+
+def _safe_divide(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = num / den
+    out[~np.isfinite(out)] = 0.0
+    return out
+
+
+class AnomalyEngine:
+    """
+    Scores a (series × months) sales matrix.
+
+    ``keys`` labels each row (e.g. ("Region", "West")); ``months`` are the
+    "YYYY-MM" column labels on a contiguous axis.
+    """
+
+    def __init__(self, values, keys, months, season=12):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.keys = list(keys)
+        self.months = list(months)
+        self.season = season
+
+        # Running moments (for z-scores) and month-of-year sums (seasonal profile)
+        self.n = self.values.shape[1]
+        self.total = self.values.sum(axis=1)
+        self.total_sq = (self.values ** 2).sum(axis=1)
+        self.season_sum = np.zeros((len(self.keys), season))
+        self.season_count = np.zeros(season)
+        self._add_season(self.values, self._month_of_year(self.months))
+
+        self._scores = None
+
+    @staticmethod
+    def _month_of_year(months):
+        return np.array([int(month[5:7]) - 1 for month in months], dtype=np.int64)
+
+    def _add_season(self, values, month_of_year):
+        if values.shape[1] == 0:
+            return
+        np.add.at(self.season_sum.T, month_of_year, values.T)
+        np.add.at(self.season_count, month_of_year, 1)
+
+    def extend(self, new_values, new_months):
+        """Append months for the same series; moments and profile update in O(new cells)."""
+        new_values = np.asarray(new_values, dtype=np.float64).reshape(len(self.keys), -1)
+        if new_values.shape[1] != len(new_months):
+            raise ValueError("new_values must have one column per new month.")
+
+        self.values = np.concatenate([self.values, new_values], axis=1)
+        self.months.extend(new_months)
+        self.n += new_values.shape[1]
+        self.total += new_values.sum(axis=1)
+        self.total_sq += (new_values ** 2).sum(axis=1)
+        self._add_season(new_values, self._month_of_year(new_months))
+        self._scores = None
+        return self
+
+    # ---------------------------------------------------------
+    # Scoring (all series × months at once)
+    # ---------------------------------------------------------
+    def scores(self):
+        """{"z", "robust", "seasonal", "expected", "severity", "flagged"} matrices."""
+        if self._scores is not None:
+            return self._scores
+
+        values = self.values
+        if self.n < 2:
+            zeros = np.zeros_like(values)
+            self._scores = {
+                "z": zeros, "robust": zeros, "seasonal": zeros, "expected": values.copy(),
+                "severity": zeros, "flagged": zeros.astype(bool),
+            }
+            return self._scores
+
+        mean = (self.total / self.n)[:, None]
+        var = (self.total_sq - self.n * mean[:, 0] ** 2) / (self.n - 1)
+        std = np.sqrt(np.maximum(var, 0.0))[:, None]
+        z = _safe_divide(values - mean, std)
+
+        median = np.median(values, axis=1, keepdims=True)
+        robust = _safe_divide(values - median, _robust_scale(values - median))
+
+        month_of_year = self._month_of_year(self.months)
+        profile = _safe_divide(self.season_sum, self.season_count[None, :])
+        expected = profile[:, month_of_year]
+        residual = values - expected
+        seasonal = _safe_divide(residual, _robust_scale(residual))
+        # A month-of-year seen only once has no seasonal baseline
+        seasonal[:, self.season_count[month_of_year] < 2] = 0.0
+
+        severity = np.maximum.reduce([np.abs(z), np.abs(robust), np.abs(seasonal)])
+        flagged = (
+            (np.abs(z) >= Z_THRESHOLD)
+            | (np.abs(robust) >= ROBUST_THRESHOLD)
+            | (np.abs(seasonal) >= SEASONAL_THRESHOLD)
+        )
+
+        self._scores = {
+            "z": z,
+            "robust": robust,
+            "seasonal": seasonal,
+            "expected": np.broadcast_to(median, values.shape),
+            "severity": severity,
+            "flagged": flagged,
+        }
+        return self._scores
+
+    def top(self, k=10, flagged_only=True):
+        """The ``k`` most severe cells as records, most severe first."""
+        scores = self.scores()
+        severity = np.where(scores["flagged"], scores["severity"], -1.0) if flagged_only else scores["severity"]
+        flat = severity.ravel()
+
+        candidates = int((flat >= 0).sum()) if flagged_only else flat.size
+        k = min(k, candidates)
+        if k <= 0:
+            return []
+
+        idx = np.argpartition(-flat, k - 1)[:k]
+        idx = idx[np.argsort(-flat[idx], kind="stable")]
+
+        records = []
+        for row, col in zip(*np.unravel_index(idx, severity.shape)):
+            z = float(scores["z"][row, col])
+            records.append({
+                "slice": self.keys[row][0],
+                "label": self.keys[row][1],
+                "month": self.months[col],
+                "sales": float(self.values[row, col]),
+                "median": float(scores["expected"][row, col]),
+                "z_score": round(z, 3),
+                "robust_z": round(float(scores["robust"][row, col]), 3),
+                "seasonal_z": round(float(scores["seasonal"][row, col]), 3),
+                "severity": round(float(scores["severity"][row, col]), 3),
+                "direction": "spike" if self.values[row, col] >= scores["expected"][row, col] else "drop",
+            })
+        return records
+
+    def concentration(self):
+        """Flagged cells per slice and label, e.g. {"Region": {"West": 3}}."""
+        counts = self.scores()["flagged"].sum(axis=1)
+        result = {}
+        for (slice_name, label), count in zip(self.keys, counts.tolist()):
+            if count:
+                result.setdefault(slice_name, {})[label] = int(count)
+        for slice_name in result:
+            result[slice_name] = dict(sorted(result[slice_name].items(), key=lambda x: -x[1]))
+        return result
@@ -1,5 +1,5 @@
 import streamlit as st
-from load_data import load_data_and_kb
+from dataset_registry import get_dataset, get_retriever
 from visualization import InsightVisualizer
 from run_query import run_query  # AI Assistant integration
 
@@ -65,26 +65,27 @@ st.write(
 )
 
 # ---------------------------------------------------------
-# Load data + knowledge base
+# Load data + knowledge base (shared across sessions and reruns)
 # ---------------------------------------------------------
-df, kb = load_data_and_kb()
+df, kb = get_dataset()
 viz = InsightVisualizer(df, kb)
 
 # ---------------------------------------------------------
-# Precompute Top Insights
+# Top Insights (from the shared retriever's precomputed totals)
 # ---------------------------------------------------------
-region_totals = df.groupby("Region")["Sales"].sum()
-product_totals = df.groupby("Product")["Sales"].sum()
-monthly_sales = df.groupby("Month")["Sales"].sum()
+retriever = get_retriever()
+region_totals = retriever.region_totals
+product_totals = retriever.product_totals
+monthly_sales = retriever.monthly_sales
 
-top_region = region_totals.idxmax()
-top_region_value = float(region_totals.max())
+top_region = max(region_totals, key=region_totals.get)
+top_region_value = float(region_totals[top_region])
 
-top_product = product_totals.idxmax()
-top_product_value = float(product_totals.max())
+top_product = max(product_totals, key=product_totals.get)
+top_product_value = float(product_totals[top_product])
 
-best_month = monthly_sales.idxmax()
-best_month_value = float(monthly_sales.max())
+best_month = max(monthly_sales, key=monthly_sales.get)
+best_month_value = float(monthly_sales[best_month])
 
 # ---------------------------------------------------------
 # Sidebar Navigation
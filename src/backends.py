@@ -0,0 +1,330 @@
+"""
+Execution backends for the raw-row side of ``query_engine``.
+
+When a QuerySpec cannot be answered from the dense cube, the engine hands
+it to a backend that returns per-group partial measures (sum / count /
+max / min / sum-of-squares of Sales, satisfaction sum / count):
+
+* ``PandasBackend`` (default): one groupby over the retriever's frame.
+* ``SQLiteBackend``: the rows live in an embedded sqlite3 database (in
+  memory or a local file); filters and aggregates are pushed down as SQL.
+* ``DuckDBBackend``: same SQL on a DuckDB table, loaded from the
+  in-memory frame or from local CSV / Parquet files. Needs the optional
+  ``duckdb`` package.
+
+``make_backend(name, ...)`` builds one by name ("pandas", "sqlite",
+"duckdb"), e.g. from the ``query_backend`` config key.
+"""
+
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from query_engine import as_list
+
+BACKENDS = ["pandas", "sqlite", "duckdb"]
+
+MEASURES = [
+    "sales_sum",
+    "sales_count",
+    "sales_max",
+    "sales_min",
+    "sales_sumsq",
+    "sat_sum",
+    "sat_count",
+]
+
+# Columns mirrored into the SQL table
+SQL_COLUMNS = {
+    "Date": "TEXT",
+    "Month": "TEXT",
+    "Product": "TEXT",
+    "Region": "TEXT",
+    "Sales": "INTEGER",
+    "Customer_Age": "INTEGER",
+    "Customer_Gender": "TEXT",
+    "Customer_Satisfaction": "REAL",
+}
+
+# DuckDB's REAL is single precision; keep doubles for parity with pandas
+DUCKDB_TYPES = {"TEXT": "VARCHAR", "INTEGER": "BIGINT", "REAL": "DOUBLE"}
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _empty_columns():
+    return {name: np.array([], dtype=np.float64) for name in MEASURES}
+
+
+# ---------------------------------------------------------
+# pandas
+# ---------------------------------------------------------
+class PandasBackend:
+    """
+    Aggregates with pandas. ``rows(start, end, filters)`` supplies a frame
+    holding at least the matching rows (the filters are re-applied here).
+    """
+
+    name = "pandas"
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def append(self, batch):
+        """Nothing to do: ``rows`` always reads the retriever's current frame."""
+
+    def aggregate(self, spec):
+        frame = self.rows(spec.start, spec.end, spec.filters)
+
+        mask = np.ones(len(frame), dtype=bool)
+        if spec.start is not None:
+            mask &= (frame["Date"] >= pd.Timestamp(spec.start)).to_numpy()
+        if spec.end is not None:
+            mask &= (frame["Date"] < pd.Timestamp(spec.end)).to_numpy()
+        for dim, value in spec.filters.items():
+            column = frame[dim].astype(str) if dim == "Month" else frame[dim]
+            labels = [str(v) for v in as_list(value)] if dim == "Month" else as_list(value)
+            mask &= column.isin(labels).to_numpy()
+        frame = frame[mask]
+
+        has_sat = "Customer_Satisfaction" in frame.columns
+        work = pd.DataFrame({
+            "sales": frame["Sales"].astype("float64"),
+            "sat": frame["Customer_Satisfaction"].astype("float64") if has_sat else np.nan,
+        }, index=frame.index)
+        work["sales_sq"] = work["sales"] ** 2
+
+        aggs = dict(
+            sales_sum=("sales", "sum"),
+            sales_count=("sales", "count"),
+            sales_max=("sales", "max"),
+            sales_min=("sales", "min"),
+            sales_sumsq=("sales_sq", "sum"),
+            sat_sum=("sat", "sum"),
+            sat_count=("sat", "count"),
+        )
+
+        if spec.group_by:
+            keys = [frame[d].astype(str) if d == "Month" else frame[d] for d in spec.group_by]
+            grouped = work.groupby(keys, observed=True, sort=False).agg(**aggs)
+            grouped = grouped[grouped["sales_count"] > 0]
+            columns = {name: grouped[name].to_numpy(dtype=np.float64) for name in aggs}
+            for pos, dim in enumerate(spec.group_by):
+                columns[dim] = grouped.index.get_level_values(pos).to_numpy(dtype=object)
+            return columns
+
+        sales = work["sales"].dropna()
+        if sales.empty:
+            return _empty_columns()
+        sat = work["sat"].dropna()
+        return {
+            "sales_sum": np.array([sales.sum()]),
+            "sales_count": np.array([len(sales)], dtype=np.float64),
+            "sales_max": np.array([sales.max()]),
+            "sales_min": np.array([sales.min()]),
+            "sales_sumsq": np.array([(sales ** 2).sum()]),
+            "sat_sum": np.array([sat.sum()]),
+            "sat_count": np.array([len(sat)], dtype=np.float64),
+        }
+
+
+# ---------------------------------------------------------
+# SQL (shared by SQLite and DuckDB)
+# ---------------------------------------------------------
+def _param(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def to_sql(spec, table="sales"):
+    """(query, params) computing the backend measures for ``spec``."""
+    where, params = [], []
+
+    if spec.start is not None:
+        where.append('"Date" >= ?')
+        params.append(pd.Timestamp(spec.start).strftime(DATE_FORMAT))
+    if spec.end is not None:
+        where.append('"Date" < ?')
+        params.append(pd.Timestamp(spec.end).strftime(DATE_FORMAT))
+
+    for dim, value in spec.filters.items():
+        if dim not in SQL_COLUMNS:
+            raise ValueError(f"Column '{dim}' is not available in the SQL backend.")
+        labels = [str(v) if dim == "Month" else _param(v) for v in as_list(value)]
+        if not labels:
+            where.append("1 = 0")
+            continue
+        where.append(f'"{dim}" IN ({", ".join("?" * len(labels))})')
+        params.extend(labels)
+
+    groups = [f'"{dim}"' for dim in spec.group_by]
+    select = groups + [
+        'SUM("Sales") AS sales_sum',
+        'COUNT("Sales") AS sales_count',
+        'MAX("Sales") AS sales_max',
+        'MIN("Sales") AS sales_min',
+        'SUM(CAST("Sales" AS DOUBLE) * "Sales") AS sales_sumsq',
+        'SUM("Customer_Satisfaction") AS sat_sum',
+        'COUNT("Customer_Satisfaction") AS sat_count',
+    ]
+
+    query = f"SELECT {', '.join(select)} FROM {table}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    if groups:
+        query += " GROUP BY " + ", ".join(groups)
+        query += ' HAVING COUNT("Sales") > 0'
+    return query, params
+
+
+def _columns_from_records(spec, records):
+    """Backend column dict from SQL result tuples (group columns first)."""
+    n_groups = len(spec.group_by)
+    if not spec.group_by and (not records or not records[0][n_groups + 1]):
+        return _empty_columns()
+
+    columns = {}
+    for pos, dim in enumerate(spec.group_by):
+        columns[dim] = np.array([r[pos] for r in records], dtype=object)
+    for offset, name in enumerate(MEASURES):
+        columns[name] = np.array(
+            [np.nan if r[n_groups + offset] is None else r[n_groups + offset] for r in records],
+            dtype=np.float64,
+        )
+    return columns
+
+
+def sql_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The retriever frame reshaped to SQL_COLUMNS (text dates / months, plain dtypes)."""
+    out = pd.DataFrame(index=df.index)
+    out["Date"] = pd.to_datetime(df["Date"]).dt.strftime(DATE_FORMAT)
+    out["Month"] = df["Month"].astype(str)
+    for column in ("Product", "Region", "Customer_Gender"):
+        out[column] = df[column].astype(object)
+    out["Sales"] = df["Sales"].astype("int64")
+    out["Customer_Age"] = df["Customer_Age"].astype("int64")
+    if "Customer_Satisfaction" in df.columns:
+        out["Customer_Satisfaction"] = df["Customer_Satisfaction"].astype("float64")
+    else:
+        out["Customer_Satisfaction"] = np.nan
+    return out[list(SQL_COLUMNS)]
+
+
+class SQLiteBackend:
+    """
+    Rows mirrored into sqlite3 (``database=":memory:"`` or a file path), with
+    indexes on Date, Month, Product and Region so filters are index lookups.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, df=None, database=":memory:"):
+        self.conn = sqlite3.connect(database, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            columns = ", ".join(f'"{name}" {kind}' for name, kind in SQL_COLUMNS.items())
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS sales ({columns})")
+            for column in ("Date", "Month", "Product", "Region"):
+                self.conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_sales_{column.lower()} ON sales ("{column}")'
+                )
+            self.conn.commit()
+
+        if df is not None:
+            self.append(df)
+
+    def append(self, batch):
+        frame = sql_frame(batch)
+        records = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        with self._lock:
+            self.conn.executemany(
+                f"INSERT INTO sales VALUES ({', '.join('?' * len(SQL_COLUMNS))})", records
+            )
+            self.conn.commit()
+
+    def aggregate(self, spec):
+        query, params = to_sql(spec)
+        with self._lock:
+            records = self.conn.execute(query, params).fetchall()
+        return _columns_from_records(spec, records)
+
+    def close(self):
+        self.conn.close()
+
+
+class DuckDBBackend:
+    """
+    Rows in a native DuckDB table, loaded from the in-memory frame (``df``)
+    or from local files (``source``: a CSV / Parquet path or glob). Either
+    way ``append`` inserts into the same table. Requires ``duckdb``.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, df=None, source=None):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The duckdb backend needs the 'duckdb' package (pip install duckdb).") from e
+
+        self.conn = duckdb.connect()
+        self._lock = threading.Lock()
+
+        with self._lock:
+            columns = ", ".join(f'"{name}" {DUCKDB_TYPES[kind]}' for name, kind in SQL_COLUMNS.items())
+            self.conn.execute(f"CREATE TABLE sales ({columns})")
+
+            if source is not None:
+                source = str(source)
+                reader = "read_parquet" if source.endswith((".parquet", ".pq")) else "read_csv_auto"
+                path = source.replace("'", "''")
+                # Table functions cannot take a bound path here, so it is inlined (quoted)
+                self.conn.execute(f"""
+                    INSERT INTO sales
+                    SELECT strftime(CAST("Date" AS TIMESTAMP), '{DATE_FORMAT}'),
+                           strftime(CAST("Date" AS TIMESTAMP), '%Y-%m'),
+                           "Product", "Region", "Sales", "Customer_Age", "Customer_Gender",
+                           "Customer_Satisfaction"
+                    FROM {reader}('{path}')
+                """)
+
+        if df is not None:
+            self.append(df)
+
+    def append(self, batch):
+        """Insert ``batch`` into the table (cost proportional to the batch only)."""
+        frame = sql_frame(batch)
+        with self._lock:
+            self.conn.register("batch", frame)
+            try:
+                self.conn.execute("INSERT INTO sales SELECT * FROM batch")
+            finally:
+                self.conn.unregister("batch")
+
+    def aggregate(self, spec):
+        query, params = to_sql(spec)
+        with self._lock:
+            records = self.conn.execute(query, params).fetchall()
+        return _columns_from_records(spec, records)
+
+    def close(self):
+        self.conn.close()
+
+
+def make_backend(name, rows=None, df=None, **kwargs):
+    """
+    Build a backend by name. ``rows`` feeds the pandas backend; ``df`` seeds
+    the SQL backends (extra kwargs go to their constructors).
+    """
+    name = (name or "pandas").lower()
+    if name == "pandas":
+        return PandasBackend(rows)
+    if name == "sqlite":
+        return SQLiteBackend(df, **kwargs)
+    if name == "duckdb":
+        return DuckDBBackend(df, **kwargs)
+    raise ValueError(f"Unknown query backend '{name}'. Use one of {BACKENDS}.")
@@ -0,0 +1,80 @@
+"""
+Query latency of SimpleVectorStore from 1k to 1M chunks.
+
+    python benchmark_vector_store.py               # 1k, 10k, 100k, 1M chunks, dim 384
+    python benchmark_vector_store.py 5000 50000    # chosen sizes
+
+Embeddings are random unit vectors (the embedding model is not part of
+the measurement). For small stores the previous per-pair Python loop is
+timed too, for comparison. 1M × 384 float32 is ~1.5 GB.
+"""
+
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from vector_store import SimpleVectorStore
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DIM = 384
+K = 5
+QUERIES = 50
+LEGACY_MAX_SIZE = 100_000
+ADD_BATCH = 50_000
+
+
+class RandomEmbeddings:
+    """Deterministic stand-in for an embedding model: text -> random vector."""
+
+    def __init__(self, dim, seed=0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, texts):
+        return self.rng.standard_normal((len(texts), self.dim), dtype=np.float32)
+
+
+def legacy_search(store, q_vec, k):
+    """The previous implementation: per-pair norms, then a full sort."""
+    sims = []
+    for vec, text in zip(store.vectors, store.texts):
+        sim = np.dot(q_vec, vec) / (np.linalg.norm(q_vec) * np.linalg.norm(vec))
+        sims.append((sim, text))
+    sims.sort(reverse=True, key=lambda x: x[0])
+    return [t for _, t in sims[:k]]
+
+
+def _median_ms(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(sizes, dim=DIM):
+    print(f"{'chunks':>10} {'build s':>9} {'query ms':>9} {'legacy ms':>10}")
+    for size in sizes:
+        embed = RandomEmbeddings(dim)
+        store = SimpleVectorStore(embed)
+
+        started = time.perf_counter()
+        for offset in range(0, size, ADD_BATCH):
+            store.add_texts([f"chunk {i}" for i in range(offset, min(size, offset + ADD_BATCH))])
+        build = time.perf_counter() - started
+
+        query_ms = _median_ms(lambda: store.similarity_search("query", k=K), QUERIES)
+
+        legacy = "-"
+        if size <= LEGACY_MAX_SIZE:
+            q_vec = embed(["query"])[0]
+            legacy = f"{_median_ms(lambda: legacy_search(store, q_vec, K), 3):10.2f}"
+
+        print(f"{size:>10,} {build:>9.2f} {query_ms:>9.2f} {legacy:>10}")
+
+
+if __name__ == "__main__":
+    run([int(a) for a in sys.argv[1:]] or SIZES)
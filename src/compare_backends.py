@@ -0,0 +1,111 @@
+"""
+Benchmark for the query backends (backends.py).
+
+    python compare_backends.py                   # parity + 1M / 10M / 100M benchmark
+    python compare_backends.py 1000000 5000000   # parity + chosen row counts
+    python compare_backends.py --check           # parity only
+
+The parity check lives in test_backend_parity.py (runnable on its own);
+it runs first so timings are only reported for backends that agree.
+
+Synthetic rows with the real schema; times backend load and a fixed set
+of QuerySpecs per backend. 100M rows needs tens of GB of RAM for the
+pandas frame; pass smaller counts on a laptop.
+"""
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backends import make_backend
+from load_data import prepare_frame
+from query_engine import SUMMARY_METRICS, QueryEngine, QuerySpec
+from test_backend_parity import available_backends, check_parity
+
+ROW_COUNTS = [1_000_000, 10_000_000, 100_000_000]
+REPEATS = 3
+
+BENCH_SPECS = {
+    "product summary": QuerySpec(group_by=["Product"], metrics=SUMMARY_METRICS),
+    "region x month totals": QuerySpec(group_by=["Region", "Month"], metrics=["total_sales", "count"]),
+    "filtered partial range": QuerySpec(
+        filters={"Region": "West", "Product": ["Widget A", "Widget B"]},
+        metrics=SUMMARY_METRICS,
+        start="2022-03-15",
+        end="2022-09-10",
+    ),
+    "top-3 ages by spread": QuerySpec(
+        group_by=["Customer_Age"], metrics=["std_sales", "min_sale"], sort="std_sales", top_k=3
+    ),
+}
+
+
+# ---------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------
+def synthetic_rows(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 730, n_rows), unit="D")
+    frame = pd.DataFrame({
+        "Date": dates,
+        "Product": pd.Categorical.from_codes(
+            rng.integers(0, 4, n_rows), ["Widget A", "Widget B", "Widget C", "Widget D"]
+        ),
+        "Region": pd.Categorical.from_codes(rng.integers(0, 4, n_rows), ["East", "North", "South", "West"]),
+        "Sales": rng.integers(100, 1000, n_rows),
+        "Customer_Age": rng.integers(18, 70, n_rows),
+        "Customer_Gender": pd.Categorical.from_codes(rng.integers(0, 2, n_rows), ["Female", "Male"]),
+        "Customer_Satisfaction": rng.uniform(1, 5, n_rows),
+    })
+    return prepare_frame(frame)
+
+
+def _timed(fn):
+    best = math.inf
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark(row_counts):
+    names = available_backends()
+    for n_rows in row_counts:
+        print(f"\n--- {n_rows:,} rows ---")
+        df = synthetic_rows(n_rows)
+
+        for name in names:
+            started = time.perf_counter()
+            backend = make_backend(name, rows=lambda *_: df, df=None if name == "pandas" else df)
+            loaded = time.perf_counter() - started
+            engine = QueryEngine(None, backend)
+
+            timings = {
+                label: _timed(lambda spec=spec: engine.execute(spec)) for label, spec in BENCH_SPECS.items()
+            }
+            cells = "  ".join(f"{label}: {seconds * 1000:8.1f} ms" for label, seconds in timings.items())
+            print(f"{name:>7}  load {loaded:7.2f} s  {cells}")
+
+            if hasattr(backend, "close"):
+                backend.close()
+        del df
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parity check and benchmark for the query backends.")
+    parser.add_argument("rows", nargs="*", type=int, help=f"row counts to benchmark (default: {ROW_COUNTS})")
+    parser.add_argument("--check", action="store_true", help="run the parity check only")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    ok = check_parity()
+    if not args.check:
+        benchmark(args.rows or ROW_COUNTS)
+    sys.exit(0 if ok else 1)
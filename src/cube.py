@@ -0,0 +1,238 @@
+"""
+Dense aggregate cube over Product × Region × Month × Customer_Age × Customer_Gender.
+
+Every measure is one dense NumPy array indexed by integer codes per
+dimension, built with a single ``np.bincount`` pass over the rows. Slice
+lookups and rollups are then array reductions over the cells (O(cells))
+instead of boolean-mask scans of the raw frame (O(rows)).
+
+Codes are assigned in order of first appearance and the cube grows when a
+batch brings new labels, so it can be updated incrementally on append.
+Storage is over-allocated per dimension (doubling, like the vector store)
+and the measures are views of the used corner, so a new label rarely copies
+the arrays; an update only touches the cells its rows fall into.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ["Product", "Region", "Month", "Customer_Age", "Customer_Gender"]
+
+# Guard against cubes that would not fit in memory (6 arrays × 8 bytes per cell)
+DEFAULT_MAX_CELLS = 2_000_000
+GROWTH_FACTOR = 2
+
+# measure -> (dtype, fill value of an empty cell)
+MEASURES = {
+    "sales_sum": (np.float64, 0.0),
+    "sales_count": (np.int64, 0),
+    "sales_max": (np.float64, -np.inf),
+    "sales_sumsq": (np.float64, 0.0),
+    "sat_sum": (np.float64, 0.0),
+    "sat_count": (np.int64, 0),
+}
+
+
+def _measure(name):
+    """Read-only attribute exposing the used part of a measure's storage."""
+    return property(lambda self: self._store[name][self._used])
+
+
+class SalesCube:
+    """Dense sum / count / max / sum-of-squares cube of Sales (+ satisfaction sum / count)."""
+
+    def __init__(self, dims=None, max_cells=DEFAULT_MAX_CELLS):
+        self.dims = list(dims or DIMENSIONS)
+        self.max_cells = max_cells
+        self.labels = {dim: [] for dim in self.dims}
+        self.codes = {dim: {} for dim in self.dims}
+        self.row_count = 0
+
+        empty = (0,) * len(self.dims)
+        self._store = {
+            name: np.full(empty, fill, dtype=dtype) for name, (dtype, fill) in MEASURES.items()
+        }
+        self._used = tuple(slice(0, 0) for _ in self.dims)
+
+    sales_sum = _measure("sales_sum")
+    sales_count = _measure("sales_count")
+    sales_max = _measure("sales_max")
+    sales_sumsq = _measure("sales_sumsq")
+    sat_sum = _measure("sat_sum")
+    sat_count = _measure("sat_count")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims=None, max_cells=DEFAULT_MAX_CELLS):
+        return cls(dims, max_cells=max_cells).update(df)
+
+    @property
+    def shape(self):
+        return tuple(len(self.labels[dim]) for dim in self.dims)
+
+    @property
+    def n_cells(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def capacity(self):
+        return self._store["sales_sum"].shape
+
+    # ---------------------------------------------------------
+    # Building / incremental update
+    # ---------------------------------------------------------
+    def _encode(self, batch):
+        """Cube codes per dimension for a batch (-1 where the label is missing)."""
+        encoded = []
+        for dim in self.dims:
+            row_codes, uniques = pd.factorize(batch[dim])
+            uniques = uniques.tolist() if hasattr(uniques, "tolist") else list(uniques)
+
+            lookup = self.codes[dim]
+            mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+            mapping[-1] = -1
+            for i, label in enumerate(uniques):
+                if label not in lookup:
+                    lookup[label] = len(self.labels[dim])
+                    self.labels[dim].append(label)
+                mapping[i] = lookup[label]
+
+            encoded.append(mapping[row_codes])
+        return encoded
+
+    def _grow(self, old_shape):
+        new_shape = self.shape
+        if new_shape == old_shape:
+            return
+
+        if int(np.prod(new_shape)) > self.max_cells:
+            raise ValueError(
+                f"Cube of shape {new_shape} exceeds max_cells={self.max_cells:,}."
+            )
+        self._used = tuple(slice(0, n) for n in new_shape)
+
+        old_capacity = self.capacity
+        if all(new <= cap for new, cap in zip(new_shape, old_capacity)):
+            return
+
+        # Double each axis that overflows; fall back to the exact shape when
+        # the slack alone would break the cell budget
+        capacity = tuple(
+            max(new, cap * GROWTH_FACTOR) if new > cap else cap
+            for new, cap in zip(new_shape, old_capacity)
+        )
+        if int(np.prod(capacity)) > self.max_cells:
+            capacity = tuple(max(new, cap) for new, cap in zip(new_shape, old_capacity))
+            if int(np.prod(capacity)) > self.max_cells:
+                capacity = new_shape
+
+        kept = tuple(slice(0, min(n, cap)) for n, cap in zip(old_shape, capacity))
+        for name, (dtype, fill) in MEASURES.items():
+            grown = np.full(capacity, fill, dtype=dtype)
+            grown[kept] = self._store[name][kept]
+            self._store[name] = grown
+
+    def update(self, batch: pd.DataFrame):
+        """Fold a batch of prepared rows into the cube."""
+        if batch is None or batch.empty:
+            return self
+
+        old_shape = self.shape
+        encoded = self._encode(batch)
+        self._grow(old_shape)
+
+        valid = np.ones(len(batch), dtype=bool)
+        for codes in encoded:
+            valid &= codes >= 0
+
+        sales = batch["Sales"].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid &= ~np.isnan(sales)
+
+        flat = np.ravel_multi_index([codes[valid] for codes in encoded], self.capacity)
+        sales = sales[valid]
+
+        # Reduce the batch to the cells it touches, then scatter into storage
+        # (O(batch), not O(cells) like a full-size bincount)
+        cells, slot = np.unique(flat, return_inverse=True)
+        store = {name: array.reshape(-1) for name, array in self._store.items()}
+        n = len(cells)
+
+        store["sales_sum"][cells] += np.bincount(slot, weights=sales, minlength=n)
+        store["sales_count"][cells] += np.bincount(slot, minlength=n)
+        store["sales_sumsq"][cells] += np.bincount(slot, weights=sales * sales, minlength=n)
+        np.maximum.at(store["sales_max"], flat, sales)
+
+        if "Customer_Satisfaction" in batch.columns:
+            sat = batch["Customer_Satisfaction"].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+            has_sat = ~np.isnan(sat)
+            store["sat_sum"][cells] += np.bincount(slot[has_sat], weights=sat[has_sat], minlength=n)
+            store["sat_count"][cells] += np.bincount(slot[has_sat], minlength=n)
+
+        self.row_count += int(valid.sum())
+        return self
+
+    # ---------------------------------------------------------
+    # Lookups and rollups
+    # ---------------------------------------------------------
+    def _selector(self, filters):
+        """Index tuple for {dim: label} filters, or None if a label is unknown."""
+        selector = [slice(None)] * len(self.dims)
+        for dim, label in (filters or {}).items():
+            code = self.codes[dim].get(label)
+            if code is None:
+                return None
+            selector[self.dims.index(dim)] = code
+        return tuple(selector)
+
+    def summary(self, filters=None):
+        """
+        Totals for the rows matching ``filters`` ({dim: label}):
+        count, sum, max, sum of squares and satisfaction sum / count.
+        Returns None when nothing matches.
+        """
+        selector = self._selector(filters)
+        if selector is None:
+            return None
+
+        count = int(self.sales_count[selector].sum())
+        if count == 0:
+            return None
+
+        return {
+            "count": count,
+            "sales_sum": float(self.sales_sum[selector].sum()),
+            "sales_max": float(self.sales_max[selector].max()),
+            "sales_sumsq": float(self.sales_sumsq[selector].sum()),
+            "sat_sum": float(self.sat_sum[selector].sum()),
+            "sat_count": int(self.sat_count[selector].sum()),
+        }
+
+    def rollup(self, keep, measure="sales_sum", filters=None):
+        """
+        Reduce ``measure`` over every dimension not in ``keep``.
+        Returns (array indexed by the kept dims in ``keep`` order, labels per kept dim).
+        """
+        if any(dim in (filters or {}) for dim in keep):
+            raise ValueError("Rollup dimensions cannot also be filtered.")
+
+        selector = self._selector(filters)
+        values = getattr(self, measure)
+        if selector is None:
+            shape = tuple(0 for _ in keep)
+            return np.zeros(shape), [[] for _ in keep]
+
+        # Integer-selected dims drop out; keep the rest in cube order
+        values = values[selector]
+        remaining = [d for d, sel in zip(self.dims, selector) if isinstance(sel, slice)]
+        drop = tuple(i for i, d in enumerate(remaining) if d not in keep)
+        reduce = np.max if measure == "sales_max" else np.sum
+        values = reduce(values, axis=drop) if drop else values
+
+        kept = [d for d in remaining if d in keep]
+        values = np.moveaxis(values, [kept.index(d) for d in keep], list(range(len(keep))))
+        return values, [list(self.labels[d]) for d in keep]
+
+    def totals(self, dim, filters=None):
+        """{label: total sales} for one dimension (observed labels only)."""
+        sums, (labels,) = self.rollup([dim], "sales_sum", filters)
+        counts, _ = self.rollup([dim], "sales_count", filters)
+        return {label: float(s) for label, s, c in zip(labels, sums, counts) if c > 0}
@@ -0,0 +1,184 @@
+"""
+Process-wide dataset registry.
+
+Streamlit re-executes ``app.py`` on every rerun and for every browser
+session, while ``run_query``, ``InsightRetriever`` and ``RAGRetriever`` each
+used to load their own copy of the data. The registry loads the dataset once
+per data version and hands out views of that single copy.
+
+Data versions are keyed by the source's size/mtime (every partition file for
+a partitioned dataset). The registry opts into ``load_data_and_kb(mmap=True)``,
+so the shared frame is served straight from the read-only memory maps of its
+columnar snapshot and several server worker processes on one machine share
+the same physical pages through the OS page cache instead of each holding a
+copy.
+
+Views are shallow copies, not read-only wrappers: adding or replacing
+columns on a view is private to the caller, but values must not be edited
+in place. The numeric columns of a memory-mapped frame are read-only (the
+edit raises), and other in-place edits would write through to the shared
+frame; take a ``.copy()`` first.
+
+The retriever from ``retriever()`` is one shared object per data version.
+Add rows through ``DatasetRegistry.append``: it appends to the shared
+retriever, serves the appended frame and KB from ``get`` and bumps
+``version``. ``append`` called on the retriever directly only changes that
+retriever. Appended rows live in memory and are dropped when the source
+files change and the dataset is reloaded.
+
+A partition directory is cataloged instead: the KB is built one partition
+at a time and the shared retriever gets the ``PartitionCatalog``, so its
+queries read only the partitions they cover. The full frame is read only
+when a caller asks for it through ``get``.
+"""
+
+import os
+import threading
+import time
+
+from knowledge_base import LazyKB
+from load_data import (
+    DEFAULT_CACHE_DIR,
+    config_value,
+    load_catalog_and_kb,
+    load_data_and_kb,
+    read_partitions,
+    resolve_data_path,
+)
+from partitions import discover_partitions
+from retriever import InsightRetriever
+
+# Seconds between source-file checks for a given dataset
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+def source_version(data_path):
+    """Cheap version key for a CSV file or a partition directory (no hashing)."""
+    if os.path.isdir(data_path):
+        return tuple((p.path, p.size, p.mtime_ns) for p in discover_partitions(data_path))
+    stat = os.stat(data_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _view(df, kb):
+    """Shallow, per-caller view of the shared frame (None stays None) and KB tables."""
+    df = None if df is None else df.copy(deep=False)
+    if isinstance(kb, LazyKB):
+        return df, kb.view()
+    return df, {name: table.copy(deep=False) for name, table in kb.items()}
+
+
+class DatasetRegistry:
+    """Loads each dataset once per data version and shares it across callers."""
+
+    def __init__(self, cache_dir=None, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._entries = {}
+
+    def _entry(self, data_path=None):
+        path = resolve_data_path(data_path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            now = time.monotonic()
+
+            if entry is not None and now - entry["checked_at"] < self.check_interval:
+                return entry
+
+            version = source_version(path)
+            if entry is not None and entry["version"] == version:
+                entry["checked_at"] = now
+                return entry
+
+            if os.path.isdir(path):
+                catalog, kb = load_catalog_and_kb(path, cache_dir=self.cache_dir)
+                df = None
+            else:
+                catalog = None
+                df, kb = load_data_and_kb(path, cache_dir=self.cache_dir, mmap=True)
+
+            entry = {
+                "version": version,
+                "checked_at": now,
+                "df": df,
+                "kb": kb,
+                "catalog": catalog,
+                "retriever": None,
+                "appended": False,
+                "generation": (entry["generation"] + 1) if entry else 1,
+            }
+            self._entries[path] = entry
+            return entry
+
+    def get(self, data_path=None):
+        """Return (df, kb) views of the shared dataset (including appended rows)."""
+        entry = self._entry(data_path)
+        with self._lock:
+            if entry["df"] is None:
+                if entry["appended"]:
+                    entry["df"] = entry["retriever"].df
+                else:
+                    entry["df"] = read_partitions(entry["catalog"], cache_dir=self.cache_dir)
+            return _view(entry["df"], entry["kb"])
+
+    def version(self, data_path=None):
+        """Monotonic per-path generation; increases when the source changes or rows are appended."""
+        return self._entry(data_path)["generation"]
+
+    def retriever(self, data_path=None):
+        """One shared InsightRetriever per data version (not a copy; see module docstring)."""
+        with self._lock:
+            return self._retriever(self._entry(data_path))
+
+    def _retriever(self, entry):
+        if entry["retriever"] is None:
+            # A partitioned dataset is served through its catalog (pruned reads)
+            df, kb = _view(None if entry["catalog"] else entry["df"], entry["kb"])
+            entry["retriever"] = InsightRetriever(
+                df,
+                kb,
+                catalog=entry["catalog"],
+                backend=config_value("query_backend", "pandas"),
+                cache_dir=self.cache_dir,
+            )
+        return entry["retriever"]
+
+    def append(self, rows, data_path=None):
+        """
+        Append rows to the shared dataset: the shared retriever folds them
+        in, ``get`` serves the appended frame and KB, and the generation
+        moves. Returns the new generation.
+        """
+        with self._lock:
+            entry = self._entry(data_path)
+            retriever = self._retriever(entry)
+            retriever.append(rows)
+
+            entry["appended"] = True
+            entry["df"] = None  # concatenated from the retriever when next read
+            entry["kb"] = retriever.kb
+            entry["generation"] += 1
+            return entry["generation"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_registry = DatasetRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def get_dataset(data_path=None):
+    """(df, kb) views of the process-wide dataset."""
+    return _registry.get(data_path)
+
+
+def get_retriever(data_path=None):
+    """The process-wide InsightRetriever for the current data version."""
+    return _registry.retriever(data_path)
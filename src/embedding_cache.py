@@ -0,0 +1,156 @@
+"""
+Content-addressed cache in front of an embedding function.
+
+``EmbeddingCache(embed_fn)`` is itself a drop-in ``embed_fn``: each text is
+keyed by SHA-256 of the model id plus the whitespace/Unicode-normalized
+text, looked up in an in-memory LRU and then in an optional on-disk tier
+(one ``.npy`` per key), and only the misses are sent to ``embed_fn`` in a
+single batch. Unchanged KB chunks and repeated questions are therefore
+never re-embedded, across sessions when ``cache_dir`` is set.
+
+The disk tier needs an explicit model id: entries live under a
+per-model subdirectory of ``cache_dir``, so swapping models never reads
+another model's vectors. Without an id the cache stays in memory.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from vector_store import embedding_dim, embedding_model_id
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def normalize_text(text):
+    """NFC-normalize and collapse whitespace (the text part of the cache key)."""
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+def model_cache_dir(cache_dir, model_id):
+    """Per-model subdirectory of ``cache_dir``; None (memory only) without a model id."""
+    if not cache_dir or not model_id:
+        return None
+    return os.path.join(cache_dir, hashlib.sha256(model_id.encode("utf-8")).hexdigest()[:16])
+
+
+class EmbeddingCache:
+    """LRU (and optional disk) cache of embeddings, callable like ``embed_fn``."""
+
+    def __init__(self, embed_fn, model_id=None, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None):
+        self.embed_fn = embed_fn
+        self.model_id = embedding_model_id(embed_fn, model_id)
+        self.dim = embedding_dim(embed_fn)
+        self.max_entries = max_entries
+        self.cache_dir = model_cache_dir(cache_dir, self.model_id)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, text):
+        payload = f"{self.model_id or ''}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    # ---------------------------------------------------------
+    # Tiers
+    # ---------------------------------------------------------
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _from_memory(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def _from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            return np.load(self._path(key), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def _to_disk(self, key, vector):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as fh:
+                np.save(fh, vector, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Embedding not cached on disk: {e}")
+
+    # ---------------------------------------------------------
+    # embed_fn interface
+    # ---------------------------------------------------------
+    def __call__(self, texts):
+        texts = list(texts)
+        keys = [self.key(text) for text in texts]
+        vectors = [None] * len(texts)
+
+        # Positions per missing key (duplicates in one batch embed once)
+        missing = OrderedDict()
+        for i, key in enumerate(keys):
+            vector = self._from_memory(key)
+            if vector is None:
+                vector = self._from_disk(key)
+                if vector is not None:
+                    self.disk_hits += 1
+                    self._remember(key, vector)
+            else:
+                self.hits += 1
+
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                vectors[i] = vector
+
+        if missing:
+            batch = [texts[positions[0]] for positions in missing.values()]
+            embedded = np.asarray(self.embed_fn(batch), dtype=np.float32)
+            if len(embedded) != len(batch):
+                raise ValueError("embed_fn must return one vector per text.")
+            self.misses += len(batch)
+
+            for (key, positions), vector in zip(missing.items(), embedded):
+                vector = np.array(vector, dtype=np.float32)
+                self._remember(key, vector)
+                self._to_disk(key, vector)
+                for i in positions:
+                    vectors[i] = vector
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "cache_dir": self.cache_dir,
+        }
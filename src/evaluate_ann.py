@@ -0,0 +1,66 @@
+"""
+Recall vs. latency of the IVF index against exact search.
+
+    python evaluate_ann.py                  # 100k and 1M chunks, dim 384
+    python evaluate_ann.py 50000 200000     # chosen sizes
+
+Vectors are synthetic clustered unit vectors (topics plus noise), which is
+closer to real chunk embeddings than uniform noise; queries are perturbed
+copies of random rows. For each nprobe the table shows recall@k and the
+mean per-query latency of IVF and of the exact scan, so the config value
+("vector_index": {"type": "ivf", "nprobe": ...}) can be picked per
+collection size.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex, recall_at_k
+from vector_store import normalize_rows
+
+SIZES = [100_000, 1_000_000]
+DIM = 384
+TOPICS = 2_000
+QUERIES = 200
+K = 10
+NPROBES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def clustered_vectors(n, dim=DIM, topics=TOPICS, noise=0.6, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    rows = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(n, start + 100_000)
+        topic = rng.integers(0, topics, stop - start)
+        rows[start:stop] = centers[topic] + noise * rng.standard_normal((stop - start, dim), dtype=np.float32)
+    return normalize_rows(rows)
+
+
+def queries_for(vectors, n=QUERIES, noise=0.3, seed=1):
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), n, replace=False)]
+    return normalize_rows(picked + noise * rng.standard_normal(picked.shape, dtype=np.float32) / np.sqrt(picked.shape[1]))
+
+
+def run(sizes):
+    for size in sizes:
+        vectors = clustered_vectors(size)
+        queries = queries_for(vectors)
+
+        index = IVFIndex()
+        started = time.perf_counter()
+        index.sync(vectors)
+        built = time.perf_counter() - started
+
+        print(f"\n--- {size:,} chunks, {index.n_lists} lists (built in {built:.1f} s) ---")
+        print(f"{'nprobe':>7} {'recall@' + str(K):>10} {'ivf ms':>8} {'exact ms':>9}")
+        for nprobe in NPROBES:
+            result = recall_at_k(index, vectors, queries, k=K, nprobe=nprobe)
+            print(f"{nprobe:>7} {result['recall']:>10.3f} {result['ann_ms']:>8.2f} {result['exact_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    run([int(a) for a in sys.argv[1:]] or SIZES)
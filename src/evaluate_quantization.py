@@ -0,0 +1,72 @@
+"""
+Memory per vector and recall@k of the quantized storage modes.
+
+    python evaluate_quantization.py                # 100k and 1M chunks, dim 384
+    python evaluate_quantization.py 20000 200000   # chosen sizes
+
+The full-precision matrix is written to a temporary file and reopened as a
+read-only memmap, as ``SimpleVectorStore.load`` does, so re-ranking reads
+only the candidate rows from disk; "memory B/vec" is what each mode keeps
+in RAM per vector. Recall is measured against the exact float32 scan.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from ann_index import make_index, recall_at_k
+from evaluate_ann import clustered_vectors, queries_for
+
+SIZES = [100_000, 1_000_000]
+K = 10
+
+MODES = [
+    {"type": "int8", "rerank": 0},
+    {"type": "int8", "rerank": 100},
+    {"type": "pq", "rerank": 0},
+    {"type": "pq", "rerank": 100},
+    {"type": "pq", "rerank": 500},
+]
+
+
+def legacy_bytes(dim):
+    """The previous store: one float64 ndarray object per chunk in a list."""
+    return sys.getsizeof(np.zeros(dim)) + 8  # array object + list slot
+
+
+def label(mode):
+    return f"{mode['type']} rerank={mode['rerank']}"
+
+
+def run(sizes):
+    for size in sizes:
+        vectors = clustered_vectors(size)
+        dim = vectors.shape[1]
+        queries = queries_for(vectors)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "vectors.f32")
+            vectors.tofile(path)
+            on_disk = np.memmap(path, dtype=np.float32, mode="r", shape=vectors.shape)
+
+            print(f"\n--- {size:,} chunks, dim {dim} ---")
+            print(f"{'mode':<22} {'memory B/vec':>13} {'recall@' + str(K):>10} {'ms/query':>9}")
+            print(f"{'float64 list (old)':<22} {legacy_bytes(dim):>13} {1.0:>10.3f} {'-':>9}")
+
+            exact_ms = None
+            for mode in MODES:
+                index = make_index(mode)
+                result = recall_at_k(index, on_disk, queries, k=K)
+                exact_ms = result["exact_ms"]
+                print(
+                    f"{label(mode):<22} {index.memory(dim):>13} "
+                    f"{result['recall']:>10.3f} {result['ann_ms']:>9.2f}"
+                )
+            print(f"{'float32 exact':<22} {4 * dim:>13} {1.0:>10.3f} {exact_ms:>9.2f}")
+            del on_disk
+
+
+if __name__ == "__main__":
+    run([int(a) for a in sys.argv[1:]] or SIZES)
@@ -1,4 +1,4 @@
-from load_data import load_data_and_kb
+from load_data import load_data_and_kb, memory_report
 
 # Load dataset + knowledge base
 df, kb = load_data_and_kb()
@@ -22,4 +22,8 @@ print(kb["monthly_sales"])
 
 # Age group summary
 print("\n--- AGE GROUP SUMMARY ---")
-print(kb["age_summary"])
\ No newline at end of file
+print(kb["age_summary"])
+
+# Memory footprint per column and KB table
+print("\n--- MEMORY REPORT ---")
+print(memory_report(df, kb))
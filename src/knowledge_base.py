@@ -0,0 +1,104 @@
+"""
+Lazy knowledge-base mapping.
+
+``LazyKB`` behaves like the plain ``kb`` dict (``kb["product_summary"]``,
+``kb.items()``, ...) but only builds a table the first time it is read.
+Tables are memoized per data version and every access is counted, so
+``used_tables()`` shows which tables a page or session actually needed.
+"""
+
+import threading
+from collections import Counter
+from collections.abc import MutableMapping
+
+
+class LazyKB(MutableMapping):
+    """
+    Mapping of KB table name -> DataFrame whose values are computed on demand.
+
+    ``builders`` maps each table name to a zero-argument callable returning
+    the table. ``refresh`` swaps builders and/or bumps the data version,
+    which invalidates every memoized table without rebuilding anything.
+    """
+
+    def __init__(self, builders, version=0):
+        self._builders = dict(builders)
+        self._tables = {}
+        self._lock = threading.RLock()
+        self.version = version
+        self.usage = Counter()
+
+    # ---------------------------------------------------------
+    # Mapping protocol
+    # ---------------------------------------------------------
+    def __getitem__(self, name):
+        with self._lock:
+            memo = self._tables.get(name)
+            if memo is not None and (memo[0] == self.version or name not in self._builders):
+                self.usage[name] += 1
+                return memo[1]
+
+            if name not in self._builders:
+                raise KeyError(name)
+
+            table = self._builders[name]()
+            self._tables[name] = (self.version, table)
+            self.usage[name] += 1
+            return table
+
+    def __setitem__(self, name, table):
+        with self._lock:
+            self._tables[name] = (self.version, table)
+
+    def __delitem__(self, name):
+        with self._lock:
+            if name not in self._builders and name not in self._tables:
+                raise KeyError(name)
+            self._builders.pop(name, None)
+            self._tables.pop(name, None)
+
+    def __iter__(self):
+        return iter(dict.fromkeys([*self._builders, *self._tables]))
+
+    def __len__(self):
+        return len(dict.fromkeys([*self._builders, *self._tables]))
+
+    def __contains__(self, name):
+        return name in self._builders or name in self._tables
+
+    def __repr__(self):
+        built = sorted(self.materialized())
+        return f"LazyKB(version={self.version}, tables={list(self)}, built={built})"
+
+    # ---------------------------------------------------------
+    # Versioning and introspection
+    # ---------------------------------------------------------
+    def refresh(self, builders=None, version=None):
+        """Replace builders and/or move to a new data version."""
+        with self._lock:
+            if builders is not None:
+                self._builders.update(builders)
+            self.version = self.version + 1 if version is None else version
+
+    def materialized(self):
+        """Tables already built for the current version (never triggers a build)."""
+        with self._lock:
+            return {
+                name: table
+                for name, (version, table) in self._tables.items()
+                if version == self.version or name not in self._builders
+            }
+
+    def used_tables(self):
+        """Names of the tables read so far, most used first."""
+        return [name for name, _ in self.usage.most_common()]
+
+    def view(self):
+        """
+        Per-caller view: tables are built (once) by this KB and handed out
+        as shallow copies; access is still recorded here.
+        """
+        return LazyKB(
+            {name: (lambda name=name: self[name].copy(deep=False)) for name in self},
+            version=self.version,
+        )
@@ -1,34 +1,159 @@
+import json
 import os
+import numpy as np
 import pandas as pd
 
+from aggregates import SalesAggregates
+from knowledge_base import LazyKB
+from partitions import PartitionCatalog
+from snapshot import (
+    load_snapshot,
+    open_snapshot,
+    read_frame,
+    read_table,
+    save_snapshot,
+    source_fingerprint,
+    write_table,
+)
 
-def load_data_and_kb():
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.json")
+DEFAULT_DATA_PATH = os.path.join(BASE_DIR, "data", "sales_data.csv")
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "data", ".snapshots")
+DEFAULT_CHUNKSIZE = 500_000
+
+# ---------------------------------------------------------
+# Declared column schema
+# ---------------------------------------------------------
+# Low-cardinality strings load as categoricals (integer codes + one label
+# table) and numeric columns use the narrowest type that fits the data.
+# Month is derived in ``prepare_frame`` as an ordered categorical over a
+# contiguous month axis, so its codes are integer period offsets.
+SALES_SCHEMA = {
+    "Product": "category",
+    "Region": "category",
+    "Sales": "int32",
+    "Customer_Age": "int8",
+    "Customer_Gender": "category",
+    "Customer_Satisfaction": "float32",
+}
+
+# Bump whenever prepare_frame / SALES_SCHEMA change what a loaded frame
+# looks like, so stale snapshots are rebuilt
+SCHEMA_VERSION = 2
+
+
+def config_value(key, default=None):
+    """A top-level key from config/config.json (``default`` if unset or unreadable)."""
+    try:
+        with open(CONFIG_PATH, encoding="utf-8") as fh:
+            return json.load(fh).get(key, default)
+    except (OSError, ValueError):
+        return default
+
+
+def resolve_data_path(data_path=None):
     """
-    Loads the sales dataset and builds a structured knowledge base (KB)
-    containing product, region, monthly, and demographic summaries.
+    Explicit path > ``data_source`` in config/config.json > bundled CSV.
+    The source may be a single CSV file or a directory of monthly partitions.
     """
+    if data_path:
+        return data_path
 
-    # ---------------------------------------------------------
-    # Load dataset using a relative path (works locally + Streamlit Cloud)
-    # ---------------------------------------------------------
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_path = os.path.join(base_dir, "data", "sales_data.csv")
+    source = config_value("data_source")
+    if not source:
+        return DEFAULT_DATA_PATH
+    return os.path.normpath(os.path.join(BASE_DIR, source))
 
-    print(f"Loading dataset from: {data_path}")
-    df = pd.read_csv(data_path)
 
-    # ---------------------------------------------------------
-    # Preprocess dataset
-    # ---------------------------------------------------------
+def read_sales_csv(data_path, **kwargs):
+    """``pd.read_csv`` with the declared sales schema applied at parse time."""
+    return pd.read_csv(data_path, dtype=SALES_SCHEMA, **kwargs)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast any columns that are not already in their declared dtype."""
+    for col, dtype in SALES_SCHEMA.items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def month_codes(dates: pd.Series) -> pd.Categorical:
+    """
+    Encode dates as an ordered Month categorical. Codes are month offsets
+    from the first month in ``dates`` and labels are "YYYY-MM" strings,
+    so string comparisons and groupbys behave exactly as before.
+    """
+    ordinals = dates.to_numpy().astype("datetime64[M]").astype(np.int64)
+    if len(ordinals) == 0:
+        return pd.Categorical([], categories=[], ordered=True)
+
+    first, last = int(ordinals.min()), int(ordinals.max())
+    labels = pd.period_range(
+        pd.Period(np.datetime64(first, "M"), freq="M"),
+        periods=last - first + 1,
+        freq="M",
+    ).astype(str)
+    codes = (ordinals - first).astype(np.int32)
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates, enforce the schema and derive the Month column."""
+    df = apply_schema(df)
     df["Date"] = pd.to_datetime(df["Date"])
-    df["Month"] = df["Date"].dt.to_period("M").astype(str)
+    df["Month"] = month_codes(df["Date"])
+    return df
 
-    kb = {}
 
-    # ---------------------------------------------------------
-    # Product Summary
-    # ---------------------------------------------------------
-    product_summary = df.groupby("Product").agg({
+def prepare_rows(rows) -> pd.DataFrame:
+    """
+    Turn a batch of new sales rows (DataFrame, list of dicts or dict of
+    lists) into a prepared frame with the same schema as a loaded one.
+    """
+    batch = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+
+    missing = [col for col in ["Date", *SALES_SCHEMA] if col not in batch.columns]
+    if missing:
+        raise ValueError(f"Rows are missing required columns: {missing}")
+
+    batch = batch.drop(columns=["Month"], errors="ignore").reset_index(drop=True)
+    return prepare_frame(batch)
+
+
+def concat_frames(frames) -> pd.DataFrame:
+    """
+    Concatenate prepared frames, aligning categorical columns on the union
+    of their categories so they stay categorical (Month keeps a contiguous,
+    ordered month axis).
+    """
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    aligned = [f.copy(deep=False) for f in frames]
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+
+        labels = sorted(set().union(*(f[col].cat.categories for f in frames)))
+        if col == "Month" and labels:
+            labels = pd.period_range(labels[0], labels[-1], freq="M").astype(str)
+
+        for frame in aligned:
+            frame[col] = frame[col].cat.set_categories(labels)
+
+    return pd.concat(aligned, ignore_index=True)
+
+
+# ---------------------------------------------------------
+# KB table builders (one per table, so tables can be built lazily)
+# ---------------------------------------------------------
+def build_product_summary(df: pd.DataFrame) -> pd.DataFrame:
+    product_summary = df.groupby("Product", observed=True).agg({
         "Sales": ["sum", "mean", "max"],
         "Customer_Satisfaction": "mean"
     }).reset_index()
@@ -37,13 +162,11 @@ def load_data_and_kb():
         f"{col[0]}_{col[1]}" if col[1] else col[0]
         for col in product_summary.columns
     ]
+    return product_summary
 
-    kb["product_summary"] = product_summary
 
-    # ---------------------------------------------------------
-    # Region Summary
-    # ---------------------------------------------------------
-    region_summary = df.groupby("Region").agg({
+def build_region_summary(df: pd.DataFrame) -> pd.DataFrame:
+    region_summary = df.groupby("Region", observed=True).agg({
         "Sales": ["sum", "mean", "max"],
         "Customer_Satisfaction": "mean"
     }).reset_index()
@@ -52,39 +175,265 @@ def load_data_and_kb():
         f"{col[0]}_{col[1]}" if col[1] else col[0]
         for col in region_summary.columns
     ]
+    return region_summary
 
-    kb["region_summary"] = region_summary
 
-    # ---------------------------------------------------------
-    # Monthly Sales Summary
-    # ---------------------------------------------------------
-    monthly_sales = df.groupby("Month")["Sales"].sum().reset_index()
+def build_monthly_sales(df: pd.DataFrame) -> pd.DataFrame:
+    monthly_sales = df.groupby("Month", observed=True)["Sales"].sum().reset_index()
     monthly_sales.columns = ["Month", "Sales"]
-    kb["monthly_sales"] = monthly_sales
+    return monthly_sales
 
-    # ---------------------------------------------------------
-    # Age Summary
-    # ---------------------------------------------------------
+
+def build_age_summary(df: pd.DataFrame) -> pd.DataFrame:
     age_summary = df.groupby("Customer_Age")["Sales"].mean().reset_index()
     age_summary.columns = ["Customer_Age", "Average_Sales"]
-    kb["age_summary"] = age_summary
+    return age_summary
 
-    # ---------------------------------------------------------
-    # Gender Summary
-    # ---------------------------------------------------------
-    gender_summary = df.groupby("Customer_Gender")["Sales"].sum().reset_index()
+
+def build_gender_summary(df: pd.DataFrame) -> pd.DataFrame:
+    gender_summary = df.groupby("Customer_Gender", observed=True)["Sales"].sum().reset_index()
     gender_summary.columns = ["Customer_Gender", "Total_Sales"]
-    kb["gender_summary"] = gender_summary
+    return gender_summary
 
-    # ---------------------------------------------------------
-    # Age × Gender Matrix
-    # ---------------------------------------------------------
-    age_gender_matrix = df.pivot_table(
+
+def build_age_gender_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    return df.pivot_table(
         index="Customer_Age",
         columns="Customer_Gender",
         values="Sales",
-        aggfunc="mean"
+        aggfunc="mean",
+        observed=True,
     )
-    kb["age_gender_matrix"] = age_gender_matrix
 
-    return df, kb
\ No newline at end of file
+
+KB_BUILDERS = {
+    "product_summary": build_product_summary,
+    "region_summary": build_region_summary,
+    "monthly_sales": build_monthly_sales,
+    "age_summary": build_age_summary,
+    "gender_summary": build_gender_summary,
+    "age_gender_matrix": build_age_gender_matrix,
+}
+
+
+def build_kb(df: pd.DataFrame) -> dict:
+    """
+    Builds the structured knowledge base (KB) containing product, region,
+    monthly, and demographic summaries.
+    """
+    return {name: build(df) for name, build in KB_BUILDERS.items()}
+
+
+def lazy_kb(df: pd.DataFrame, snapshot_dir=None, mmap=False) -> LazyKB:
+    """
+    KB whose tables are built on first access. With a ``snapshot_dir`` a
+    table is read from the snapshot when present (memory-mapped and
+    read-only with ``mmap``); otherwise it is built from ``df`` and written
+    back so other processes can reuse it.
+    """
+    def builder(name, build):
+        if snapshot_dir is None:
+            return lambda: build(df)
+
+        def load():
+            table = read_table(snapshot_dir, name, mmap=mmap)
+            if table is None:
+                table = build(df)
+                try:
+                    write_table(snapshot_dir, name, table)
+                except OSError as e:
+                    print(f"Snapshot table '{name}' not written: {e}")
+            return table
+        return load
+
+    return LazyKB({name: builder(name, build) for name, build in KB_BUILDERS.items()})
+
+
+def load_data_and_kb(data_path=None, use_cache=True, cache_dir=None, lazy=True, mmap=False):
+    """
+    Loads the sales dataset and builds a structured knowledge base (KB)
+    containing product, region, monthly, and demographic summaries.
+
+    When ``use_cache`` is set, the parsed frame is stored as a columnar
+    snapshot under ``cache_dir`` (default ``data/.snapshots``). Warm loads
+    read that snapshot and skip CSV parsing; the snapshot is rebuilt
+    whenever the source file's size, mtime or content hash changes.
+
+    The returned frame is writable. Pass ``mmap=True`` to serve the numeric
+    columns straight from read-only memory maps of the snapshot instead, so
+    several processes share the same pages; in-place writes to such a frame
+    raise "assignment destination is read-only".
+
+    With ``lazy`` (the default) the KB is a ``LazyKB``: each table is built
+    (or read from the snapshot) the first time it is accessed. Pass
+    ``lazy=False`` for a plain dict with every table built up front.
+    """
+
+    # ---------------------------------------------------------
+    # Load dataset using a relative path (works locally + Streamlit Cloud)
+    # ---------------------------------------------------------
+    data_path = resolve_data_path(data_path)
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+
+    if os.path.isdir(data_path):
+        print(f"Loading partitioned dataset from: {data_path}")
+        catalog = PartitionCatalog(data_path)
+        df = read_partitions(catalog, cache_dir=cache_dir if use_cache else None, mmap=mmap)
+        return df, (lazy_kb(df) if lazy else build_kb(df))
+
+    snapshot_dir = None
+    if use_cache:
+        snapshot_dir = open_snapshot(cache_dir, data_path, tag=SCHEMA_VERSION)
+        if snapshot_dir is not None:
+            print(f"Loaded cached snapshot for: {data_path}")
+            df = read_frame(snapshot_dir, mmap=mmap)
+            kb = lazy_kb(df, snapshot_dir, mmap=mmap)
+            return df, (kb if lazy else dict(kb.items()))
+        fingerprint = source_fingerprint(data_path)
+
+    print(f"Loading dataset from: {data_path}")
+    df = read_sales_csv(data_path)
+
+    # ---------------------------------------------------------
+    # Preprocess dataset
+    # ---------------------------------------------------------
+    df = prepare_frame(df)
+    kb = lazy_kb(df) if lazy else build_kb(df)
+
+    if use_cache:
+        try:
+            snapshot_dir = save_snapshot(
+                cache_dir, data_path, df, kb.materialized() if lazy else kb,
+                fingerprint=fingerprint, tag=SCHEMA_VERSION,
+            )
+        except OSError as e:
+            # A read-only deployment should still serve the freshly parsed data
+            print(f"Snapshot cache not written: {e}")
+        else:
+            if mmap:
+                # Serve the memory-mapped copy so every process shares the same pages
+                df = read_frame(snapshot_dir, mmap=True)
+            if lazy:
+                kb = lazy_kb(df, snapshot_dir, mmap=mmap)
+
+    return df, kb
+
+
+def stream_aggregates(data_path=None, chunksize=DEFAULT_CHUNKSIZE) -> SalesAggregates:
+    """
+    Read the CSV in bounded chunks and fold each one into mergeable partial
+    aggregates. Peak memory is one chunk plus the (small) per-group partials,
+    so this works for files larger than RAM.
+    """
+    data_path = resolve_data_path(data_path)
+    aggregates = SalesAggregates()
+
+    print(f"Streaming dataset from: {data_path} (chunksize={chunksize:,})")
+    with read_sales_csv(data_path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            aggregates.update(prepare_frame(chunk))
+
+    return aggregates
+
+
+def load_kb_streaming(data_path=None, chunksize=DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Streaming counterpart of ``load_data_and_kb``: returns the same KB tables
+    without materializing the full raw frame.
+    """
+    return stream_aggregates(data_path, chunksize=chunksize).to_kb()
+
+
+# ---------------------------------------------------------
+# Month-partitioned datasets
+# ---------------------------------------------------------
+def read_partition(partition, cache_dir=None, mmap=True) -> pd.DataFrame:
+    """
+    Read and prepare one partition file. CSV partitions go through the
+    snapshot cache when ``cache_dir`` is given (a cached partition is
+    memory-mapped and read-only unless ``mmap=False``); columnar formats are
+    read directly (Parquet/Feather need pyarrow installed).
+    """
+    if partition.format == "csv":
+        if cache_dir:
+            snapshot = load_snapshot(cache_dir, partition.path, mmap=mmap, tag=SCHEMA_VERSION)
+            if snapshot is not None:
+                return snapshot[0]
+            fingerprint = source_fingerprint(partition.path)
+
+        df = prepare_frame(read_sales_csv(partition.path))
+
+        if cache_dir:
+            try:
+                save_snapshot(
+                    cache_dir, partition.path, df, {}, fingerprint=fingerprint, tag=SCHEMA_VERSION
+                )
+            except OSError as e:
+                print(f"Snapshot cache not written: {e}")
+        return df
+
+    if partition.format == "parquet":
+        return prepare_frame(pd.read_parquet(partition.path))
+    if partition.format == "feather":
+        return prepare_frame(pd.read_feather(partition.path))
+
+    raise ValueError(f"Unsupported partition format: {partition.format}")
+
+
+def read_partitions(catalog: PartitionCatalog, start=None, end=None, cache_dir=None,
+                    mmap=True) -> pd.DataFrame:
+    """Read only the partitions whose month lies in [start, end]."""
+    return concat_frames(
+        [read_partition(p, cache_dir=cache_dir, mmap=mmap) for p in catalog.prune(start, end)]
+    )
+
+
+def stream_partition_aggregates(catalog: PartitionCatalog, start=None, end=None,
+                                cache_dir=None) -> SalesAggregates:
+    """Fold partitions one at a time; the full history is never held in memory."""
+    aggregates = SalesAggregates()
+    for partition in catalog.prune(start, end):
+        aggregates.update(read_partition(partition, cache_dir=cache_dir))
+    return aggregates
+
+
+def load_catalog_and_kb(data_dir=None, cache_dir=None):
+    """
+    Partitioned counterpart of ``load_data_and_kb``: returns the partition
+    catalog and the KB built partition-by-partition. Pass both to
+    ``InsightRetriever(None, kb, catalog=catalog)`` to serve queries without
+    loading the whole history.
+    """
+    catalog = PartitionCatalog(resolve_data_path(data_dir))
+    print(f"Cataloged {len(catalog.partitions)} partitions under: {catalog.root}")
+    return catalog, stream_partition_aggregates(catalog, cache_dir=cache_dir).to_kb()
+
+
+def memory_report(df: pd.DataFrame, kb: dict = None) -> pd.DataFrame:
+    """
+    Bytes used per frame column and per KB table (deep, so object/string
+    columns are counted in full). For a ``LazyKB`` only the tables built so
+    far are reported.
+    """
+    rows = []
+
+    for col, nbytes in df.memory_usage(deep=True).items():
+        rows.append({
+            "table": "df",
+            "column": col,
+            "dtype": str(df[col].dtype) if col in df.columns else "index",
+            "bytes": int(nbytes),
+        })
+
+    tables = kb.materialized() if isinstance(kb, LazyKB) else (kb or {})
+    for name, table in tables.items():
+        rows.append({
+            "table": f"kb.{name}",
+            "column": None,
+            "dtype": None,
+            "bytes": int(table.memory_usage(deep=True).sum()),
+        })
+
+    report = pd.DataFrame(rows)
+    report["share"] = report["bytes"] / report["bytes"].sum()
+    return report
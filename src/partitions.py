@@ -0,0 +1,112 @@
+"""
+Partition catalog for month-partitioned sales datasets.
+
+A partitioned dataset is a directory holding one or more files per month.
+The month is taken from the file name (``sales_2022-01.csv``,
+``202201.parquet``) or from a Hive-style parent directory
+(``Month=2022-01/part-0.csv``). The catalog only lists and prunes files;
+reading them is handled by ``load_data.read_partitions``.
+"""
+
+import os
+import re
+import warnings
+from collections import namedtuple
+
+PARTITION_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+}
+
+MONTH_PATTERN = re.compile(r"(?<!\d)(\d{4})[-_]?(0[1-9]|1[0-2])(?!\d)")
+
+Partition = namedtuple("Partition", ["month", "path", "format", "size", "mtime_ns"])
+
+
+def partition_month(path):
+    """Return the "YYYY-MM" month a partition file belongs to, or None."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parent = os.path.basename(os.path.dirname(path))
+
+    for name in (stem, parent):
+        match = MONTH_PATTERN.search(name)
+        if match:
+            return f"{match.group(1)}-{match.group(2)}"
+    return None
+
+
+def discover_partitions(root, skipped=None):
+    """
+    Walk ``root`` and return every readable monthly partition, sorted by month.
+    Data files without a month in their path are skipped with a warning and
+    appended to ``skipped`` when a list is given.
+    """
+    partitions = []
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Skip hidden dirs such as the snapshot cache
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+
+        for filename in sorted(filenames):
+            fmt = PARTITION_FORMATS.get(os.path.splitext(filename)[1].lower())
+            if fmt is None:
+                continue
+
+            path = os.path.join(dirpath, filename)
+            month = partition_month(path)
+            if month is None:
+                warnings.warn(f"Skipping file without a month in its name: {path}", stacklevel=2)
+                if skipped is not None:
+                    skipped.append(path)
+                continue
+
+            stat = os.stat(path)
+            partitions.append(Partition(month, path, fmt, stat.st_size, stat.st_mtime_ns))
+
+    partitions.sort(key=lambda p: (p.month, p.path))
+    return partitions
+
+
+class PartitionCatalog:
+    """
+    In-memory catalog of a month-partitioned dataset directory.
+    Use ``prune`` to select the partitions covering a month range.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.skipped = []
+        self.partitions = discover_partitions(self.root, self.skipped)
+
+        if not self.partitions:
+            raise ValueError(f"No monthly partitions found under '{root}'.")
+
+    def refresh(self):
+        """Re-scan the directory (e.g. after a new month has landed)."""
+        self.skipped = []
+        self.partitions = discover_partitions(self.root, self.skipped)
+        return self
+
+    def months(self):
+        return sorted({p.month for p in self.partitions})
+
+    def prune(self, start=None, end=None):
+        """Partitions whose month lies in [start, end] ("YYYY-MM", both optional)."""
+        return [
+            p for p in self.partitions
+            if (start is None or p.month >= start) and (end is None or p.month <= end)
+        ]
+
+    def get(self, month):
+        return self.prune(month, month)
+
+    def to_dict(self):
+        return {
+            "root": self.root,
+            "months": self.months(),
+            "partitions": [p._asdict() for p in self.partitions],
+            "total_bytes": sum(p.size for p in self.partitions),
+            "skipped": list(self.skipped),
+        }
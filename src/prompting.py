@@ -36,38 +36,83 @@ User Question: "{question}"
 # ---------------------------------------------------------
 # 2. Forecasting Prompt
 # ---------------------------------------------------------
-def build_forecast_prompt(question: str, stats: dict) -> str:
-    monthly_sales = stats.get("monthly_sales", {})
+def _format_forecast(forecast: dict) -> str:
+    """One "month: point (low–high)" line per forecast month."""
+    rows = zip(
+        forecast.get("months", []),
+        forecast.get("point", []),
+        forecast.get("low", []),
+        forecast.get("high", []),
+    )
+    lines = [f"- {month}: {point:,.0f} ({low:,.0f}–{high:,.0f})" for month, point, low, high in rows]
+    if not lines:
+        return "Not available."
+    return "\n".join(lines + [f"(method: {forecast.get('method', 'unknown')})"])
+
+
+def _format_series_forecasts(series: dict) -> str:
+    """One "label: total (low–high)" line per series, largest forecast first."""
+    ranked = sorted(series.items(), key=lambda item: item[1].get("next_total", 0), reverse=True)
+    lines = [
+        f"- {label}: {fc['next_total']:,.0f} ({fc['low']:,.0f}–{fc['high']:,.0f})"
+        for label, fc in ranked
+    ]
+    return "\n".join(lines) or "Not available."
+
+
+def build_forecast_prompt(question: str, stats: dict, summary_text: str = "", history_text: str = "") -> str:
+    monthly_sales = "\n".join(
+        f"- {month}: {value:,.0f}" for month, value in stats.get("monthly_sales", {}).items()
+    )
     horizon = stats.get("horizon_months", 3)
+    level = stats.get("meta", {}).get("interval_level", 0.8)
+    forecast = _format_forecast(stats.get("forecast", {}))
+    products = _format_series_forecasts(stats.get("product_forecast", {}))
+    regions = _format_series_forecasts(stats.get("region_forecast", {}))
+    excluded = stats.get("meta", {}).get("excluded_partial_month")
+    if excluded:
+        monthly_sales += f"\n({excluded} is still in progress and is not part of the history.)"
 
     return f"""
 You are InsightForge, an AI business intelligence analyst.
 
-Your task is to generate a grounded, data-driven sales forecast based ONLY on the historical monthly sales provided below.
-Do NOT invent or assume any additional data. If the historical data is sparse or inconsistent, explicitly state the uncertainty.
+Your task is to explain a sales forecast that has ALREADY been computed from the historical data below.
+Do NOT invent or assume any additional data, and do NOT produce your own numbers.
+
+Conversation summary:
+{summary_text}
+
+Recent conversation:
+{history_text}
 
 ---
 
-### Historical Monthly Sales (Chronological)
+### Recent Monthly Sales (Chronological)
 {monthly_sales}
 
-### Forecasting Horizon
-Project the next {horizon} months.
+### Computed Forecast (next {horizon} months, {level:.0%} intervals)
+{forecast}
+
+### Forecast by Product (total over the horizon)
+{products}
+
+### Forecast by Region (total over the horizon)
+{regions}
 
 ---
 
 ### Instructions for the Forecast
-1. Summarize the historical trend.
-2. Assess data quality and uncertainty.
-3. Generate a month-by-month forecast with low–medium–high ranges.
+1. Summarize the recent trend.
+2. Present the month-by-month forecast with its low–high range.
+3. Call out products or regions expected to grow or decline.
 4. Provide a BI-style narrative with risks and opportunities.
 
 ---
 
 ### Critical Rules
+- Use ONLY the computed forecast figures; do not recalculate them.
 - Do NOT fabricate historical data.
 - Do NOT assume seasonality unless visible.
-- Base all reasoning strictly on the provided monthly_sales dictionary.
 
 ---
 
@@ -0,0 +1,208 @@
+"""
+Compressed vector codes with exact re-ranking.
+
+Two quantizers shrink each unit-norm float32 row for the candidate scan:
+
+* ``ScalarQuantizer`` (int8): per-dimension min / max mapped onto 256
+  levels, 1 byte per dimension (4x smaller than float32).
+* ``ProductQuantizer``: the vector is cut into ``m`` sub-vectors, each
+  replaced by the id of its nearest of 256 k-means centroids, ``m`` bytes
+  per vector. Queries score codes with per-subspace lookup tables.
+
+``QuantizedIndex`` plugs into ``SimpleVectorStore(index=...)`` like
+``ann_index.IVFIndex``: the codes stay in memory, a query ranks all of them
+and only the best ``rerank`` candidates are rescored against the store's
+full-precision matrix (a read-only memmap once the store is saved and
+reloaded, so only those rows are paged in from disk).
+"""
+
+import threading
+
+import numpy as np
+
+from ann_index import top_k
+
+DEFAULT_RERANK = 100
+PQ_CENTROIDS = 256
+PQ_ITERATIONS = 10
+PQ_SAMPLES_PER_CENTROID = 40
+SCORE_BLOCK = 65_536
+
+
+def _blocks(vectors):
+    """(start, float32 block) over the rows, so a memmapped matrix is never copied whole."""
+    for start in range(0, len(vectors), SCORE_BLOCK):
+        yield start, np.asarray(vectors[start: start + SCORE_BLOCK], dtype=np.float32)
+
+
+def kmeans(vectors, n_clusters, iterations=PQ_ITERATIONS, seed=0):
+    """Euclidean k-means centroids (small inputs: PQ sub-vectors)."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        distances = (centroids ** 2).sum(axis=1) - 2 * vectors @ centroids.T
+        assign = np.argmin(distances, axis=1)
+        counts = np.bincount(assign, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+
+        empty = counts == 0
+        centroids = sums / np.maximum(counts, 1)[:, None]
+        # Empty clusters restart from random rows
+        centroids[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+
+    return centroids.astype(np.float32)
+
+
+class ScalarQuantizer:
+    """int8 codes: 256 evenly spaced levels between each dimension's min and max."""
+
+    kind = "int8"
+
+    def __init__(self):
+        self.low = None
+        self.scale = None
+
+    def train(self, vectors):
+        low = high = None
+        for _, block in _blocks(vectors):
+            block_low, block_high = block.min(axis=0), block.max(axis=0)
+            low = block_low if low is None else np.minimum(low, block_low)
+            high = block_high if high is None else np.maximum(high, block_high)
+        self.low = low
+        self.scale = np.maximum(high - low, 1e-12) / 255
+        return self
+
+    def encode(self, vectors):
+        codes = np.empty((len(vectors), len(self.low)), dtype=np.int8)
+        for start, block in _blocks(vectors):
+            levels = np.rint((block - self.low) / self.scale)
+            codes[start: start + len(block)] = np.clip(levels, 0, 255) - 128
+        return codes
+
+    def scores(self, codes, query):
+        """Approximate inner products of ``query`` with every encoded row."""
+        weights = (query * self.scale).astype(np.float32)
+        offset = float(weights.sum() * 128 + query @ self.low)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK):
+            block = codes[start: start + SCORE_BLOCK]
+            out[start: start + len(block)] = block.astype(np.float32) @ weights
+        return out + offset
+
+    def bytes_per_vector(self, dim):
+        return dim
+
+
+class ProductQuantizer:
+    """
+    ``m`` sub-quantizers of 256 centroids each; ``m`` must divide the
+    dimension (default: 8 dimensions per sub-vector where possible).
+    """
+
+    kind = "pq"
+
+    def __init__(self, m=None, seed=0):
+        self.m = m
+        self.seed = seed
+        self.codebooks = None
+
+    def train(self, vectors):
+        dim = vectors.shape[1]
+        if self.m is None:
+            self.m = next(dim // sub for sub in (8, 4, 2, 1) if dim % sub == 0)
+        if dim % self.m:
+            raise ValueError(f"PQ m={self.m} must divide the embedding dimension {dim}.")
+
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), PQ_CENTROIDS * PQ_SAMPLES_PER_CENTROID)
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32
+        )
+
+        subs = sample.reshape(len(sample), self.m, -1)
+        self.codebooks = np.stack([
+            kmeans(subs[:, j], PQ_CENTROIDS, seed=self.seed + j) for j in range(self.m)
+        ])
+        return self
+
+    def encode(self, vectors):
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        norms = (self.codebooks ** 2).sum(axis=2)
+        for start, block in _blocks(vectors):
+            subs = block.reshape(len(block), self.m, -1)
+            for j, codebook in enumerate(self.codebooks):
+                distances = norms[j] - 2 * subs[:, j] @ codebook.T
+                codes[start: start + len(block), j] = np.argmin(distances, axis=1)
+        return codes
+
+    def scores(self, codes, query):
+        """Asymmetric inner products: one lookup table per sub-vector."""
+        tables = np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.m, -1))
+        flat = tables.ravel()
+        offsets = np.arange(self.m) * tables.shape[1]
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK):
+            block = codes[start: start + SCORE_BLOCK].astype(np.int64) + offsets
+            out[start: start + len(block)] = flat[block].sum(axis=1)
+        return out
+
+    def bytes_per_vector(self, dim):
+        return self.m
+
+
+QUANTIZERS = {
+    "int8": ScalarQuantizer,
+    "pq": ProductQuantizer,
+}
+
+
+class QuantizedIndex:
+    """
+    Candidate search on quantized codes, exact re-ranking of the top
+    ``rerank`` rows against the full-precision vectors (0: codes only).
+    """
+
+    def __init__(self, quantizer, rerank=DEFAULT_RERANK):
+        self.quantizer = quantizer
+        self.rerank = rerank
+        self.codes = None
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def kind(self):
+        return self.quantizer.kind
+
+    def sync(self, vectors):
+        """Train on first use, then encode any rows added since."""
+        with self._lock:
+            # Quantizers read the (possibly memmapped) rows block by block
+            if self.codes is None:
+                self.quantizer.train(vectors)
+                self.codes = self.quantizer.encode(vectors)
+            elif len(vectors) > self.count:
+                new = self.quantizer.encode(vectors[self.count:])
+                self.codes = np.concatenate([self.codes, new])
+            self.count = len(vectors)
+        return self
+
+    def search(self, vectors, query, k, nprobe=None):
+        """(row ids, scores) of the top ``k``; scores are exact after re-ranking."""
+        self.sync(vectors)
+        approx = self.quantizer.scores(self.codes, query)
+        if not self.rerank:
+            top = top_k(approx, k)
+            return top, approx[top]
+
+        # Sorted ids keep reads from a memmapped matrix sequential
+        candidates = np.sort(top_k(approx, max(self.rerank, k)))
+        exact = np.asarray(vectors[candidates], dtype=np.float32) @ query
+        top = top_k(exact, k)
+        return candidates[top], exact[top]
+
+    def memory(self, dim):
+        """Bytes per vector held in memory (codes only; shared tables excluded)."""
+        return self.quantizer.bytes_per_vector(dim)
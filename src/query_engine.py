@@ -0,0 +1,266 @@
+"""
+Declarative filter / group-by / metric queries over the sales data.
+
+A ``QuerySpec`` says what to compute (filters, group-by dimensions,
+metrics, sort, top-k, optional date range); ``QueryEngine`` decides how.
+Queries whose dimensions and metrics are all in the dense ``SalesCube``
+are answered from its arrays (O(cells)); a date range that covers whole
+months becomes a Month filter so it can stay on the cube. Anything else
+(partial-month ranges, ``min_sale``, columns outside the cube) goes to an
+execution backend over the raw rows (``backends``).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# metric -> cube measures it needs (None: raw rows only)
+METRICS = {
+    "count": ["sales_count"],
+    "total_sales": ["sales_sum", "sales_count"],
+    "avg_sales": ["sales_sum", "sales_count"],
+    "max_sale": ["sales_max", "sales_count"],
+    "std_sales": ["sales_sum", "sales_sumsq", "sales_count"],
+    "avg_satisfaction": ["sat_sum", "sat_count", "sales_count"],
+    "min_sale": None,
+}
+
+SUMMARY_METRICS = ["total_sales", "avg_sales", "max_sale", "avg_satisfaction"]
+
+QueryResult = namedtuple("QueryResult", ["rows", "plan"])
+
+
+class QuerySpec:
+    """
+    filters:  {dimension: label or list of labels}
+    group_by: dimensions to break the result down by (in output order)
+    metrics:  names from METRICS
+    sort:     metric to order by (descending unless ``ascending``); by default
+              rows come in ascending group-label order
+    top_k:    keep only the first k rows after sorting
+    start / end: optional [start, end) Date range
+    """
+
+    def __init__(self, filters=None, group_by=None, metrics=None, sort=None,
+                 ascending=False, top_k=None, start=None, end=None):
+        self.filters = dict(filters or {})
+        self.group_by = list(group_by or [])
+        self.metrics = list(metrics or ["total_sales"])
+        self.sort = sort
+        self.ascending = ascending
+        self.top_k = top_k
+        self.start = start
+        self.end = end
+
+        unknown = [m for m in self.metrics if m not in METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics {unknown}. Use any of {list(METRICS)}.")
+        if sort is not None and sort not in self.metrics and sort not in self.group_by:
+            raise ValueError(f"Sort key '{sort}' must be one of the metrics or group-by dimensions.")
+        overlap = [d for d in self.group_by if d in self.filters]
+        if overlap:
+            raise ValueError(f"Dimensions {overlap} cannot be both filtered and grouped.")
+
+    def __repr__(self):
+        return (
+            f"QuerySpec(filters={self.filters}, group_by={self.group_by}, metrics={self.metrics}, "
+            f"sort={self.sort}, top_k={self.top_k}, start={self.start}, end={self.end})"
+        )
+
+
+def as_list(value):
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray, pd.Index)):
+        return list(value)
+    return [value]
+
+
+def _whole_months(start, end):
+    """"YYYY-MM" labels for a [start, end) range on month boundaries, else None."""
+    if start is None or end is None:
+        return None
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    for stamp in (start, end):
+        if stamp != stamp.normalize() or stamp.day != 1:
+            return None
+    if end <= start:
+        return []
+    return [str(p) for p in pd.period_range(start, end - pd.DateOffset(months=1), freq="M")]
+
+
+def _finish(values, metric):
+    """Metric column from the aggregated measures (dict of arrays)."""
+    count = values["sales_count"].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if metric == "count":
+            return count
+        if metric == "total_sales":
+            return values["sales_sum"]
+        if metric == "avg_sales":
+            return values["sales_sum"] / count
+        if metric == "max_sale":
+            return values["sales_max"]
+        if metric == "std_sales":
+            var = (values["sales_sumsq"] - values["sales_sum"] ** 2 / count) / (count - 1)
+            return np.sqrt(np.maximum(var, 0.0))
+        if metric == "avg_satisfaction":
+            return np.where(values["sat_count"] > 0, values["sat_sum"] / values["sat_count"], np.nan)
+        if metric == "min_sale":
+            return values["sales_min"]
+    raise ValueError(f"Unknown metric '{metric}'.")
+
+
+def _scalar(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class QueryEngine:
+    """
+    Executes QuerySpecs against a SalesCube, falling back to a raw-row
+    execution backend (see ``backends``: pandas, SQLite or DuckDB).
+    """
+
+    def __init__(self, cube=None, backend=None):
+        self.cube = cube
+        self.backend = backend
+
+    # ---------------------------------------------------------
+    # Planning
+    # ---------------------------------------------------------
+    def plan(self, spec):
+        """"cube" when the cube can answer ``spec`` exactly, else the backend's name."""
+        fallback = self.backend.name if self.backend is not None else "none"
+        if self.cube is None:
+            return fallback
+        if any(METRICS[m] is None for m in spec.metrics):
+            return fallback
+        dims = set(spec.filters) | set(spec.group_by)
+        if not dims.issubset(self.cube.dims):
+            return fallback
+        if (spec.start is not None or spec.end is not None) and _whole_months(spec.start, spec.end) is None:
+            return fallback
+        return "cube"
+
+    def execute(self, spec):
+        columns, plan = self.columns(spec)
+        return QueryResult(self._rows(spec, columns), plan)
+
+    def columns(self, spec):
+        """
+        (columns, plan): group labels and metric values as parallel arrays,
+        in no particular order (sort / top_k are not applied). For callers
+        that rank or page the groups themselves.
+        """
+        plan = self.plan(spec)
+        if plan == "cube":
+            columns = self._from_cube(spec)
+        else:
+            if self.backend is None:
+                raise ValueError(f"{spec} needs raw rows but no backend is configured.")
+            columns = self.backend.aggregate(spec)
+        for metric in spec.metrics:
+            columns[metric] = _finish(columns, metric)
+        return columns, plan
+
+    # ---------------------------------------------------------
+    # Cube path
+    # ---------------------------------------------------------
+    def _from_cube(self, spec):
+        cube = self.cube
+        filters = dict(spec.filters)
+
+        months = _whole_months(spec.start, spec.end)
+        if months is not None:
+            if "Month" in filters:
+                wanted = {str(m) for m in as_list(filters["Month"])}
+                months = [m for m in months if m in wanted]
+            filters["Month"] = months
+        elif spec.start is not None or spec.end is not None:
+            raise ValueError("Partial-month ranges cannot be answered from the cube.")
+
+        # Integer index per filtered axis (unknown labels simply match nothing)
+        selectors = []
+        for dim in cube.dims:
+            if dim in filters:
+                codes = [cube.codes[dim].get(label) for label in as_list(filters[dim])]
+                selectors.append(np.array([c for c in codes if c is not None], dtype=np.int64))
+            else:
+                selectors.append(None)
+
+        needed = sorted({m for metric in spec.metrics for m in METRICS[metric]} | {"sales_count"})
+        keep_axes = [cube.dims.index(d) for d in spec.group_by]
+        drop_axes = tuple(i for i in range(len(cube.dims)) if i not in keep_axes)
+
+        values = {}
+        for measure in needed:
+            array = getattr(cube, measure)
+            for axis, index in enumerate(selectors):
+                if index is not None:
+                    array = np.take(array, index, axis=axis)
+            reduce = np.max if measure == "sales_max" else np.sum
+            if 0 in array.shape and drop_axes:
+                shape = [array.shape[i] for i in sorted(keep_axes)]
+                array = np.full(shape, -np.inf if measure == "sales_max" else 0.0)
+            elif drop_axes:
+                array = reduce(array, axis=drop_axes)
+            # Remaining axes are in cube order; reorder to group_by order
+            order = sorted(keep_axes)
+            array = np.moveaxis(array, [order.index(a) for a in keep_axes], list(range(len(keep_axes))))
+            array = np.asarray(array, dtype=np.float64)
+            values[measure] = array if keep_axes else array.reshape(1)
+
+        present = np.nonzero(values["sales_count"] > 0)
+        columns = {measure: array[present] for measure, array in values.items()}
+
+        for pos, dim in enumerate(spec.group_by):
+            axis = cube.dims.index(dim)
+            labels = np.array(cube.labels[dim], dtype=object)
+            if selectors[axis] is not None:
+                labels = labels[selectors[axis]]
+            columns[dim] = labels[present[pos]]
+        return columns
+
+    # ---------------------------------------------------------
+    # Output: metrics, ordering, top-k
+    # ---------------------------------------------------------
+    def _rows(self, spec, columns):
+        n = len(columns["sales_count"])
+        if n == 0:
+            return []
+
+        metrics = {metric: columns[metric] for metric in spec.metrics}
+
+        if spec.sort is not None:
+            key = metrics[spec.sort] if spec.sort in metrics else columns[spec.sort]
+            key = np.asarray(key, dtype=np.float64 if spec.sort in metrics else object)
+            if spec.sort in metrics:
+                key = np.where(np.isnan(key), -np.inf if not spec.ascending else np.inf, key)
+                key = key if spec.ascending else -key
+                if spec.top_k is not None and spec.top_k < n:
+                    top = np.argpartition(key, spec.top_k - 1)[: spec.top_k]
+                    order = top[np.argsort(key[top], kind="stable")]
+                else:
+                    order = np.argsort(key, kind="stable")
+            else:
+                order = np.array(sorted(range(n), key=lambda i: key[i], reverse=not spec.ascending))
+        else:
+            label_keys = [columns[d] for d in spec.group_by]
+            order = np.array(sorted(range(n), key=lambda i: tuple(k[i] for k in label_keys)))
+
+        if spec.top_k is not None:
+            order = order[: spec.top_k]
+
+        return [
+            {
+                **{dim: _scalar(columns[dim][i]) for dim in spec.group_by},
+                **{
+                    metric: int(metrics[metric][i]) if metric == "count" else _scalar(metrics[metric][i])
+                    for metric in spec.metrics
+                },
+            }
+            for i in order.tolist()
+        ]
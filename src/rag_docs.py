@@ -3,17 +3,21 @@ def kb_to_text_chunks(kb):
 
     for _, row in kb["product_summary"].iterrows():
         chunks.append(
-            f"Product {row['Product']} has total sales {row[('Sales','sum')]:.2f}, "
-            f"average sales {row[('Sales','mean')]:.2f}, max sale {row[('Sales','max')]:.2f}, "
-            f"and average satisfaction {row[('Customer_Satisfaction','mean')]:.2f}."
+            f"Product {row['Product']} has total sales {row['Sales_sum']:.2f}, "
+            f"average sales {row['Sales_mean']:.2f}, max sale {row['Sales_max']:.2f}, "
+            f"and average satisfaction {row['Customer_Satisfaction_mean']:.2f}."
         )
 
     for _, row in kb["region_summary"].iterrows():
         chunks.append(
-            f"In region {row['Region']}, total sales are {row[('Sales','sum')]:.2f}, "
-            f"average sales {row[('Sales','mean')]:.2f}, and average satisfaction "
-            f"{row[('Customer_Satisfaction','mean')]:.2f}."
+            f"In region {row['Region']}, total sales are {row['Sales_sum']:.2f}, "
+            f"average sales {row['Sales_mean']:.2f}, and average satisfaction "
+            f"{row['Customer_Satisfaction_mean']:.2f}."
         )
 
-    # You can add similar chunks for monthly_sales, age_summary, etc.
-    return chunks
\ No newline at end of file
+    # One chunk per month: a data refresh only changes the months it touches
+    for _, row in kb["monthly_sales"].iterrows():
+        chunks.append(f"In {row['Month']}, total sales were {row['Sales']:.2f}.")
+
+    # You can add similar chunks for age_summary, etc.
+    return chunks
@@ -1,15 +1,87 @@
-from vector_store import SimpleVectorStore
+import os
+
+from dataset_registry import get_dataset
+from ann_index import make_index
+from embedding_cache import EmbeddingCache
+from load_data import DEFAULT_CACHE_DIR, config_value
+from vector_store import SimpleVectorStore, embedding_model_id
 from rag_docs import kb_to_text_chunks
 
+DEFAULT_INDEX_DIR = os.path.join(DEFAULT_CACHE_DIR, "vector_index")
+DEFAULT_EMBEDDING_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "embeddings")
+
+
 class RAGRetriever:
-    def __init__(self, embed_fn):
-        df, kb = load_data_and_kb()
+    def __init__(self, embed_fn, index_dir=DEFAULT_INDEX_DIR, model_id=None,
+                 embedding_cache_dir=DEFAULT_EMBEDDING_CACHE_DIR, search_index=None):
+        """
+        The chunk index is saved under ``index_dir`` and reopened (memory
+        mapped, no embedding calls) while the KB chunks and embedding model
+        are unchanged. The model is identified only by an explicit
+        ``model_id`` (or ``embed_fn.model_id``); without one the index is
+        built in memory and never saved or reused. Pass ``index_dir=None``
+        to always embed in memory.
+
+        ``embed_fn`` is wrapped in an EmbeddingCache (disk tier under
+        ``embedding_cache_dir``, per model id, only when the id is explicit;
+        None keeps it in memory), so a rebuilt index only embeds chunks
+        whose text changed, and repeated questions are embedded once.
+
+        ``search_index`` picks exact or approximate search: a config dict
+        for ann_index.make_index (default: "vector_index" in config.json,
+        e.g. {"type": "ivf", "nprobe": 8}) or an index instance.
+        """
+        if not isinstance(embed_fn, EmbeddingCache):
+            embed_fn = EmbeddingCache(embed_fn, model_id=model_id, cache_dir=embedding_cache_dir)
+        self.embeddings = embed_fn
+
+        df, kb = get_dataset()
         self.df = df
         self.kb = kb
 
+        if search_index is None or isinstance(search_index, dict):
+            search_index = make_index(search_index or config_value("vector_index"))
+
         chunks = kb_to_text_chunks(kb)
-        self.vstore = SimpleVectorStore(embed_fn)
-        self.vstore.add_texts(chunks)
+        self.vstore = self._open_store(embed_fn, chunks, index_dir, model_id, search_index)
+
+    @staticmethod
+    def _open_store(embed_fn, chunks, index_dir, model_id, search_index=None):
+        model_id = embedding_model_id(embed_fn, model_id)
+        if not model_id:
+            index_dir = None
+
+        if index_dir:
+            try:
+                store = SimpleVectorStore.load(
+                    index_dir, embed_fn, model_id=model_id, index=search_index
+                )
+                if store.texts == chunks:
+                    return store
+            except (OSError, ValueError, KeyError):
+                pass
+
+        store = SimpleVectorStore(embed_fn, model_id=model_id, index=search_index)
+        store.add_texts(chunks)
+
+        if index_dir:
+            try:
+                store.save(index_dir)
+            except OSError as e:
+                print(f"Vector index not written: {e}")
+                return store
+
+            # Serve the memory-mapped copy, as a restarted process would, so
+            # full-precision rows stay on disk (another writer may have won)
+            try:
+                saved = SimpleVectorStore.load(
+                    index_dir, embed_fn, model_id=model_id, index=search_index
+                )
+                if saved.texts == chunks:
+                    return saved
+            except (OSError, ValueError, KeyError):
+                pass
+        return store
 
-    def retrieve(self, query, k=5):
-        return self.vstore.similarity_search(query, k=k)
\ No newline at end of file
+    def retrieve(self, query, k=5, nprobe=None):
+        return self.vstore.similarity_search(query, k=k, nprobe=nprobe)
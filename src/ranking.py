@@ -0,0 +1,117 @@
+"""
+Partial top-k / bottom-k ranking over {label: value} totals.
+
+``Ranking`` keeps labels and values as arrays and only ever orders the
+slice it returns: ``np.argpartition`` picks the k best entries in O(n),
+and only those k are sorted. Pages continue from an opaque cursor (the
+sort key and position of the last entry shown), so each page is another
+O(n) partition rather than a full sort. Entries outside a page are rolled
+up into an "others" bucket (count and total).
+
+Order is by value (largest first unless ``ascending``); ties keep the
+original label order, matching a stable sort of the source dict.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Page = namedtuple("Page", ["items", "next_cursor", "others"])
+
+DEFAULT_LIMIT = 20
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class Ranking:
+    """Labels ranked by value; ``page`` / ``top`` / ``bottom`` materialize only k entries."""
+
+    def __init__(self, labels, values):
+        self.labels = np.asarray(labels, dtype=object)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.labels.shape != self.values.shape:
+            raise ValueError("labels and values must have the same length.")
+        self.total = float(np.nansum(self.values))
+
+    @classmethod
+    def from_dict(cls, totals):
+        return cls(
+            np.fromiter(totals.keys(), dtype=object, count=len(totals)),
+            np.fromiter(totals.values(), dtype=np.float64, count=len(totals)),
+        )
+
+    def __len__(self):
+        return len(self.values)
+
+    # ---------------------------------------------------------
+    # Cursors
+    # ---------------------------------------------------------
+    @staticmethod
+    def _direction(ascending):
+        return "asc" if ascending else "desc"
+
+    def _encode(self, key, index, ascending):
+        return f"{self._direction(ascending)}:{float(key)!r}:{int(index)}"
+
+    def _decode(self, cursor, ascending):
+        try:
+            direction, key, index = cursor.split(":")
+            key, index = float(key), int(index)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid ranking cursor {cursor!r}.") from None
+        if direction != self._direction(ascending):
+            raise ValueError(f"Cursor {cursor!r} belongs to a {direction} ranking.")
+        return key, index
+
+    # ---------------------------------------------------------
+    # Selection
+    # ---------------------------------------------------------
+    def _keys(self, ascending):
+        """Ascending sort key (NaN last in either direction)."""
+        keys = self.values if ascending else -self.values
+        return np.where(np.isnan(keys), np.inf, keys)
+
+    def page(self, limit=DEFAULT_LIMIT, cursor=None, ascending=False):
+        """
+        Up to ``limit`` (label, value) pairs after ``cursor`` (None: from the
+        start), the cursor for the next page (None on the last page), and
+        the {"count", "total"} of everything not in this page.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+
+        keys = self._keys(ascending)
+        candidates = np.arange(len(keys))
+        if cursor is not None:
+            after_key, after_index = self._decode(cursor, ascending)
+            mask = (keys > after_key) | ((keys == after_key) & (candidates > after_index))
+            candidates = np.flatnonzero(mask)
+
+        if limit < len(candidates):
+            cand_keys = keys[candidates]
+            boundary = cand_keys[np.argpartition(cand_keys, limit - 1)[limit - 1]]
+            below = candidates[cand_keys < boundary]
+            # Ties at the boundary: lowest positions first (candidates are ascending)
+            ties = candidates[cand_keys == boundary][: limit - len(below)]
+            chosen = np.concatenate([below, ties])
+        else:
+            chosen = candidates
+
+        chosen = chosen[np.lexsort((chosen, keys[chosen]))]
+
+        items = [(_scalar(self.labels[i]), float(self.values[i])) for i in chosen]
+        next_cursor = None
+        if len(chosen) and len(chosen) < len(candidates):
+            next_cursor = self._encode(keys[chosen[-1]], chosen[-1], ascending)
+
+        shown = float(np.nansum(self.values[chosen]))
+        others = {"count": len(self) - len(chosen), "total": self.total - shown}
+        return Page(items, next_cursor, others)
+
+    def top(self, k):
+        return self.page(k).items if k > 0 else []
+
+    def bottom(self, k):
+        return self.page(k, ascending=True).items if k > 0 else []
@@ -0,0 +1,107 @@
+"""
+Versioned LRU cache for InsightRetriever results.
+
+Entries are keyed on the resolved call (``get_*`` method name plus its
+entity arguments), never on raw question text, so "Widget A sales?" and
+"how did widget a do" share one entry. Every entry belongs to a data
+version; moving to a new version drops the whole cache. Results are
+deep-copied on the way in and out, so callers that edit a result (e.g.
+``compress_stats``) cannot corrupt the cached copy.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ResultCache:
+    """Bounded LRU of result dicts, stamped with a data version."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, version, compute):
+        """Cached result for ``key`` at ``version``; ``compute()`` on a miss."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            if version == self.version and self.max_entries > 0:
+                self._entries[key] = copy.deepcopy(result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def cached_result(method):
+    """
+    Cache a retriever ``get_*`` method in ``self.result_cache``,
+    keyed on (method name, arguments) and ``self.data_version``.
+    Arguments are bound to the signature with defaults applied, so
+    ``get_growth_stats(1)``, ``get_growth_stats(lag=1)`` and
+    ``get_growth_stats()`` (lag defaults to 1) share one key.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, "result_cache", None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        try:
+            bound = signature.bind(self, *args, **kwargs)
+        except TypeError:
+            return method(self, *args, **kwargs)  # let the call raise as usual
+        bound.apply_defaults()
+        arguments = list(bound.arguments.items())[1:]  # drop self
+
+        key = (method.__name__, tuple(arguments))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+
+        return cache.get_or_compute(
+            key, self.data_version, lambda: method(self, *args, **kwargs)
+        )
+
+    return wrapper
@@ -1,34 +1,316 @@
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from aggregates import SalesAggregates
+from anomaly import AnomalyEngine
+from backends import PandasBackend, make_backend
+from cube import SalesCube
+from knowledge_base import LazyKB
+from forecasting import DEFAULT_LEVEL, forecast
+from load_data import concat_frames, prepare_rows, read_partition, read_partitions
+from query_engine import SUMMARY_METRICS, QueryEngine, QuerySpec
+from ranking import DEFAULT_LIMIT, Ranking
+from result_cache import ResultCache, cached_result
+from router import ENTITY_DIMENSIONS, QueryRouter
+from streaming_stats import StreamingStats
+from time_index import TimeIndex, mentions_period, resolve_period
+from windows import WindowEngine
+
+
+# Partition frames kept in memory for pruned reads (LRU)
+PARTITION_CACHE_SIZE = 24
+
+# Months of actual history shipped alongside a forecast
+FORECAST_HISTORY_MONTHS = 12
+
+# Customer_Age bands for anomaly slices
+AGE_BANDS = [0, 24, 34, 44, 54, 64, 200]
+AGE_BAND_LABELS = ["18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+
+# retrieve() routes -> (get_* method, args)
+INTENT_METHODS = {
+    "region_performance": ("get_region_performance", ()),
+    "product_performance": ("get_product_performance", ()),
+    "region_bottom": ("get_region_performance", (None, None, DEFAULT_LIMIT, None, True)),
+    "product_bottom": ("get_product_performance", (None, None, DEFAULT_LIMIT, None, True)),
+    "trend": ("get_trend_stats", ()),
+    "anomaly": ("get_anomaly_stats", ()),
+    "forecast": ("get_forecast_context", (3,)),
+    "product_region_month": ("get_product_region_month_stats", ()),
+    "region_consistency": ("get_region_consistency", ()),
+    "region_distribution": ("get_distribution_stats", ("Region",)),
+    "product_distribution": ("get_distribution_stats", ("Product",)),
+    "momentum": ("get_momentum_stats", ()),
+    "growth_yoy": ("get_growth_stats", (12,)),
+    "growth_mom": ("get_growth_stats", (1,)),
+    "rolling": ("get_rolling_stats", ()),
+    "age_summary": ("get_age_sales_summary", ()),
+}
+
+# Intents whose answer can be narrowed to a date range
+PERIOD_INTENTS = {"region_performance", "product_performance", "region_bottom", "product_bottom"}
+
+ENTITY_METHODS = {
+    "Product": "get_product_stats",
+    "Region": "get_region_stats",
+    "Customer_Age": "get_age_stats",
+    "Customer_Gender": "get_gender_stats",
+    "Month": "get_monthly_stats",
+}
+
 
 class InsightRetriever:
-    def __init__(self, df: pd.DataFrame, kb):
+    def __init__(self, df: pd.DataFrame, kb, catalog=None, backend="pandas", cache_dir=None):
+        """
+        ``df`` may be None when a ``catalog`` (partitions.PartitionCatalog)
+        is given: aggregates are then built one partition at a time and the
+        full frame is only read if a row-level query needs it. Partition
+        reads go through the snapshot cache under ``cache_dir``, and the
+        most recently read partitions are kept in memory.
+
+        ``backend`` executes queries the cube cannot answer: "pandas",
+        "sqlite", "duckdb" or a backends.* instance (see backends.py).
+        """
+        if df is None and catalog is None:
+            raise ValueError("InsightRetriever needs a DataFrame or a partition catalog.")
+
+        self.catalog = catalog
+        self.cache_dir = cache_dir
+        self._partition_frames = OrderedDict()
+        self._partition_lock = threading.Lock()
         self.df = df
         self.kb = kb
 
-        # Ensure Month exists for all time-based logic
-        self._ensure_month_column()
+        # Bumped on every append; downstream caches key on it
+        self.data_version = 0
+
+        # KB partials are only needed once rows are appended (see append)
+        self._kb_aggregates = None
+
+        # Dense aggregate cube behind the get_*_stats lookups
+        self.cube = SalesCube()
+        self._has_satisfaction = True
+
+        # Mergeable per-Region / per-Product moments and quantile sketches
+        self.stream_stats = StreamingStats()
+
+        self._router = None
+        self._time_index = None
+        self._windows = None
+        self._anomalies = None
+        self._prm_table = None
+        # Earliest month touched by appends since the anomaly engine was built
+        self._anomaly_changed_from = None
+
+        # Raw-row query backend (SQL backends are loaded on first use)
+        self._backend = backend if not isinstance(backend, str) else None
+        self.backend_name = backend if isinstance(backend, str) else backend.name
+
+        # Results of the get_* methods, per data version
+        self.result_cache = ResultCache()
 
         # -------------------------------------------------
         # Precomputed aggregates (for fast, consistent stats)
         # -------------------------------------------------
+        if self._df is None:
+            self.region_totals = {}
+            self.product_totals = {}
+            self.monthly_sales = {}
+            self._prm_sales = {}
+
+            for partition in self.catalog.partitions:
+                batch = read_partition(partition, cache_dir=self.cache_dir)
+                self._fold_batch(batch)
+                self._fold_cube(batch)
+                self.stream_stats.update(batch)
+            return
+
+        # Ensure Month exists for all time-based logic
+        self._ensure_month_column()
+        self._has_satisfaction = "Customer_Satisfaction" in self.df.columns
+        self._fold_cube(self.df)
+        self.stream_stats.update(self.df)
+
         self.region_totals = (
-            self.df.groupby("Region")["Sales"].sum().sort_values(ascending=False).to_dict()
+            self.df.groupby("Region", observed=True)["Sales"].sum().sort_values(ascending=False).to_dict()
         )
 
         self.product_totals = (
-            self.df.groupby("Product")["Sales"].sum().sort_values(ascending=False).to_dict()
+            self.df.groupby("Product", observed=True)["Sales"].sum().sort_values(ascending=False).to_dict()
         )
 
         self.monthly_sales = (
-            self.df.groupby("Month")["Sales"].sum().sort_index().to_dict()
+            self.df.groupby("Month", observed=True)["Sales"].sum().sort_index().to_dict()
         )
 
-        self.product_region_month = (
-            self.df.groupby(["Product", "Region", "Month"])["Sales"]
-            .sum()
-            .reset_index()
-        )
+        self._prm_sales = self._grouped_sales(self.df, ["Product", "Region", "Month"])
+
+    # ---------------------------------------------------------
+    # Raw frame (appended batches are concatenated lazily;
+    # a partitioned dataset is only read in full on demand)
+    # ---------------------------------------------------------
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None and self.catalog is not None:
+            self._df = read_partitions(self.catalog, cache_dir=self.cache_dir)
+        if self._pending:
+            self._df = concat_frames([self._df] + self._pending)
+            self._pending = []
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame):
+        self._df = value
+        self._pending = []
+
+    def _read_partition(self, partition):
+        """
+        One partition's prepared frame, memoized by file path, size and
+        mtime (so a rewritten file is read again). Callers must not modify
+        the returned frame.
+        """
+        key = (partition.path, partition.size, partition.mtime_ns)
+        with self._partition_lock:
+            frame = self._partition_frames.get(key)
+            if frame is not None:
+                self._partition_frames.move_to_end(key)
+                return frame
+
+        frame = read_partition(partition, cache_dir=self.cache_dir)
+        with self._partition_lock:
+            self._partition_frames[key] = frame
+            while len(self._partition_frames) > PARTITION_CACHE_SIZE:
+                self._partition_frames.popitem(last=False)
+        return frame
+
+    def _month_rows(self, month, end=None):
+        """
+        Rows for one month (or the inclusive range month..end). A partitioned
+        dataset that is not loaded in memory reads only those partitions.
+        """
+        end = end or month
+        labels = [m for m in self.monthly_sales if month <= str(m) <= end]
+
+        if self._df is None and self.catalog is not None:
+            frames = [self._read_partition(p) for p in self.catalog.prune(month, end)]
+            frames += [b[b["Month"].isin(labels)] for b in self._pending]
+            return concat_frames(frames)
+
+        return self.df[self.df["Month"].isin(labels)]
+
+    # ---------------------------------------------------------
+    # Incremental append
+    # ---------------------------------------------------------
+    def append(self, rows):
+        """
+        Add a batch of new sales rows. The precomputed aggregates and the KB
+        tables are updated from the batch alone; the raw frame is only
+        concatenated when a row-level query next needs it.
+        Returns the new data version.
+        """
+        batch = prepare_rows(rows)
+        if batch.empty:
+            return self.data_version
+
+        # One-time cost: partials for the KB history before the first delta
+        if self._kb_aggregates is None:
+            self._kb_aggregates = self._history_aggregates()
+
+        self._pending.append(batch)
+        first_month = min(str(m) for m in batch["Month"].unique())
+        if self._anomaly_changed_from is None or first_month < self._anomaly_changed_from:
+            self._anomaly_changed_from = first_month
+        self._fold_batch(batch)
+        self._fold_cube(batch)
+        self.stream_stats.update(batch)
+        if self._backend is not None:
+            self._backend.append(batch)
+
+        self._kb_aggregates.update(batch)
+        if isinstance(self.kb, LazyKB):
+            # Tables are rebuilt from the partials only when next read
+            self.kb.refresh(self._kb_aggregates.table_builders())
+        else:
+            self.kb.update(self._kb_aggregates.to_kb())
+
+        self.data_version += 1
+        return self.data_version
+
+    def _history_aggregates(self):
+        if self._df is None and self.catalog is not None:
+            aggregates = SalesAggregates()
+            for partition in self.catalog.partitions:
+                aggregates.update(read_partition(partition, cache_dir=self.cache_dir))
+            for batch in self._pending:
+                aggregates.update(batch)
+            return aggregates
+        return SalesAggregates.from_frame(self.df)
+
+    def _fold_batch(self, batch):
+        """
+        Fold a prepared batch into the precomputed aggregates. Each total is
+        updated per key, so the cost depends on the batch's groups only.
+        """
+        self._add_totals(self.region_totals, batch, "Region")
+        self._add_totals(self.product_totals, batch, "Product")
+
+        monthly = self.monthly_sales
+        last = next(reversed(monthly), None)
+        for month, sales in self._grouped_sales(batch, ["Month"]).items():
+            if month not in monthly and last is not None and month < last:
+                last = None  # a month before the latest: restore order below
+            monthly[month] = monthly.get(month, 0) + sales
+        if last is None:
+            self.monthly_sales = dict(sorted(monthly.items()))
+
+        prm = self._prm_sales
+        for key, sales in self._grouped_sales(batch, ["Product", "Region", "Month"]).items():
+            prm[key] = prm.get(key, 0) + sales
+
+    @staticmethod
+    def _grouped_sales(frame, keys):
+        """{label (tuple for several keys): total Sales} for one frame."""
+        sums = frame.groupby(keys, observed=True)["Sales"].sum()
+        if len(keys) == 1:
+            return {str(label) if keys == ["Month"] else label: value for label, value in sums.items()}
+        labels = zip(*(sums.index.get_level_values(k).astype(object) for k in keys))
+        return {
+            tuple(str(part) if k == "Month" else part for k, part in zip(keys, label)): value
+            for label, value in zip(labels, sums.to_numpy())
+        }
+
+    @property
+    def product_region_month(self) -> pd.DataFrame:
+        """Long (Product, Region, Month, Sales) table, sorted; rebuilt once per data version."""
+        if self._prm_table is None or self._prm_table[0] != self.data_version:
+            items = sorted(self._prm_sales.items())
+            table = pd.DataFrame(
+                [key for key, _ in items], columns=["Product", "Region", "Month"], dtype=object
+            )
+            table["Sales"] = np.array([sales for _, sales in items])
+            self._prm_table = (self.data_version, table)
+        return self._prm_table[1]
+
+    def _fold_cube(self, batch):
+        """Fold a batch into the cube; drop it (mask scans) if it grows too large."""
+        if self.cube is None:
+            return
+        try:
+            self.cube.update(batch)
+        except ValueError as e:
+            print(f"Aggregate cube disabled: {e}")
+            self.cube = None
+
+    @staticmethod
+    def _add_totals(totals, batch, key):
+        """Fold a batch into a {label: total} dict in place (rankings sort on read)."""
+        for label, sales in batch.groupby(key, observed=True)["Sales"].sum().items():
+            totals[label] = totals.get(label, 0) + sales
 
     # ---------------------------------------------------------
     # Core helpers
@@ -39,58 +321,154 @@ class InsightRetriever:
             self.df["Date"] = pd.to_datetime(self.df["Date"])
             self.df["Month"] = self.df["Date"].dt.to_period("M").astype(str)
 
+    # ---------------------------------------------------------
+    # Slice summaries (cube lookup, raw-frame scan as fallback)
+    # ---------------------------------------------------------
+    def _slice_summary(self, column, value, start=None, end=None):
+        """
+        total / avg / max / avg satisfaction for rows where ``column == value``
+        (and start <= Date < end when a range is given), or None if no rows match.
+        """
+        spec = QuerySpec(filters={column: value}, metrics=SUMMARY_METRICS, start=start, end=end)
+        rows = self.query(spec).rows
+        return rows[0] if rows else None
+
+    # ---------------------------------------------------------
+    # Declarative queries (cube first, raw rows as fallback)
+    # ---------------------------------------------------------
+    def query(self, spec):
+        """Run a query_engine.QuerySpec; returns QueryResult(rows, plan)."""
+        return QueryEngine(self.cube, self._get_backend()).execute(spec)
+
+    def _get_backend(self):
+        if self._backend is None:
+            if self.backend_name == "pandas":
+                self._backend = PandasBackend(self._query_rows)
+            elif self._df is None and self.catalog is not None:
+                # Load a partitioned dataset one partition at a time
+                self._backend = make_backend(self.backend_name)
+                for partition in self.catalog.partitions:
+                    self._backend.append(read_partition(partition, cache_dir=self.cache_dir))
+                for batch in self._pending:
+                    self._backend.append(batch)
+            else:
+                self._backend = make_backend(self.backend_name, df=self.df)
+        return self._backend
+
+    def _query_rows(self, start=None, end=None, filters=None):
+        """Raw rows for the pandas backend, narrowed by date range or month where cheap."""
+        if start is not None or end is not None:
+            return self._period_rows(start, end)
+
+        months = (filters or {}).get("Month")
+        if months is not None and not isinstance(months, (list, tuple, set)):
+            return self._month_rows(str(months))
+        return self.df
+
+    # ---------------------------------------------------------
+    # Date ranges (sorted time index, rebuilt per data version)
+    # ---------------------------------------------------------
+    def _get_time_index(self):
+        if self._time_index is None or self._time_index[0] != self.data_version:
+            self._time_index = (self.data_version, TimeIndex(self.df["Date"]))
+        return self._time_index[1]
+
+    def _period_rows(self, start=None, end=None):
+        """
+        Rows with start <= Date < end. A partitioned dataset that is not
+        loaded in memory reads only the partitions overlapping the range.
+        """
+        if self._df is None and self.catalog is not None:
+            first = None if start is None else f"{pd.Timestamp(start):%Y-%m}"
+            last = None if end is None else f"{pd.Timestamp(end) - pd.Timedelta(1, 'ns'):%Y-%m}"
+            frames = [self._read_partition(p) for p in self.catalog.prune(first, last)]
+            rows = concat_frames(frames + list(self._pending))
+            mask = pd.Series(True, index=rows.index)
+            if start is not None:
+                mask &= rows["Date"] >= pd.Timestamp(start)
+            if end is not None:
+                mask &= rows["Date"] < pd.Timestamp(end)
+            return rows[mask]
+
+        return self._get_time_index().rows(self.df, start, end)
+
+    def reference_date(self):
+        """Latest date in the data; relative periods ("this year") resolve against it."""
+        if self._df is None and self.catalog is not None:
+            latest = self.catalog.months()[-1]
+            rows = concat_frames(
+                [self._read_partition(p) for p in self.catalog.get(latest)] + list(self._pending)
+            )
+            return rows["Date"].max()
+        return self._get_time_index().max_date
+
+    @staticmethod
+    def _period_info(start, end):
+        """Readable bounds of a [start, end) range (end shown inclusive)."""
+        return {
+            "start": None if start is None else f"{pd.Timestamp(start):%Y-%m-%d}",
+            "end": None if end is None else f"{pd.Timestamp(end) - pd.Timedelta(days=1):%Y-%m-%d}",
+        }
+
     # ---------------------------------------------------------
     # Product-level statistics
     # ---------------------------------------------------------
-    def get_product_stats(self, product):
-        subset = self.df[self.df["Product"] == product]
+    @cached_result
+    def get_product_stats(self, product, start=None, end=None):
+        summary = self._slice_summary("Product", product, start, end)
+        bounded = start is not None or end is not None
 
-        if subset.empty:
+        if summary is None:
             return {
                 "type": "product_stats",
-                "message": f"No data found for product '{product}'.",
+                "message": f"No data found for product '{product}'{' in this period' if bounded else ''}.",
             }
 
-        return {
+        result = {
             "type": "product_stats",
             "product": product,
-            "total_sales": float(subset["Sales"].sum()),
-            "avg_sales": float(subset["Sales"].mean()),
-            "max_sale": float(subset["Sales"].max()),
-            "avg_satisfaction": float(subset["Customer_Satisfaction"].mean())
-            if "Customer_Satisfaction" in subset.columns
-            else None,
+            "total_sales": summary["total_sales"],
+            "avg_sales": summary["avg_sales"],
+            "max_sale": summary["max_sale"],
+            "avg_satisfaction": summary["avg_satisfaction"],
         }
+        if bounded:
+            result["period"] = self._period_info(start, end)
+        return result
 
     # ---------------------------------------------------------
     # Region-level statistics
     # ---------------------------------------------------------
-    def get_region_stats(self, region):
-        subset = self.df[self.df["Region"] == region]
+    @cached_result
+    def get_region_stats(self, region, start=None, end=None):
+        summary = self._slice_summary("Region", region, start, end)
+        bounded = start is not None or end is not None
 
-        if subset.empty:
+        if summary is None:
             return {
                 "type": "region_stats",
-                "message": f"No data found for region '{region}'.",
+                "message": f"No data found for region '{region}'{' in this period' if bounded else ''}.",
             }
 
-        return {
+        result = {
             "type": "region_stats",
             "region": region,
-            "total_sales": float(subset["Sales"].sum()),
-            "avg_sales": float(subset["Sales"].mean()),
-            "avg_satisfaction": float(subset["Customer_Satisfaction"].mean())
-            if "Customer_Satisfaction" in subset.columns
-            else None,
+            "total_sales": summary["total_sales"],
+            "avg_sales": summary["avg_sales"],
+            "avg_satisfaction": summary["avg_satisfaction"],
         }
+        if bounded:
+            result["period"] = self._period_info(start, end)
+        return result
 
     # ---------------------------------------------------------
     # Month-level statistics
     # ---------------------------------------------------------
+    @cached_result
     def get_monthly_stats(self, month):
-        subset = self.df[self.df["Month"] == month]
+        summary = self._slice_summary("Month", str(month))
 
-        if subset.empty:
+        if summary is None:
             return {
                 "type": "month_stats",
                 "message": f"No data found for month '{month}'.",
@@ -99,102 +477,312 @@ class InsightRetriever:
         return {
             "type": "month_stats",
             "month": str(month),
-            "total_sales": float(subset["Sales"].sum()),
-            "avg_sales": float(subset["Sales"].mean()),
-            "avg_satisfaction": float(subset["Customer_Satisfaction"].mean())
-            if "Customer_Satisfaction" in subset.columns
-            else None,
+            "total_sales": summary["total_sales"],
+            "avg_sales": summary["avg_sales"],
+            "avg_satisfaction": summary["avg_satisfaction"],
         }
 
     # ---------------------------------------------------------
     # Demographic statistics (Customer_Age)
     # ---------------------------------------------------------
-    def get_age_stats(self, age_value):
-        subset = self.df[self.df["Customer_Age"] == age_value]
+    @cached_result
+    def get_age_stats(self, age_value, start=None, end=None):
+        summary = self._slice_summary("Customer_Age", age_value, start, end)
+        bounded = start is not None or end is not None
 
-        if subset.empty:
+        if summary is None:
             return {
                 "type": "age_stats",
-                "message": f"No data found for age '{age_value}'.",
+                "message": f"No data found for age '{age_value}'{' in this period' if bounded else ''}.",
             }
 
-        return {
+        result = {
             "type": "age_stats",
             "age": age_value,
-            "total_sales": float(subset["Sales"].sum()),
-            "avg_sales": float(subset["Sales"].mean()),
-            "avg_satisfaction": float(subset["Customer_Satisfaction"].mean())
-            if "Customer_Satisfaction" in subset.columns
-            else None,
+            "total_sales": summary["total_sales"],
+            "avg_sales": summary["avg_sales"],
+            "avg_satisfaction": summary["avg_satisfaction"],
         }
+        if bounded:
+            result["period"] = self._period_info(start, end)
+        return result
 
     # ---------------------------------------------------------
     # Demographic statistics (Customer_Gender)
     # ---------------------------------------------------------
-    def get_gender_stats(self, gender_value):
-        subset = self.df[self.df["Customer_Gender"] == gender_value]
+    @cached_result
+    def get_gender_stats(self, gender_value, start=None, end=None):
+        summary = self._slice_summary("Customer_Gender", gender_value, start, end)
+        bounded = start is not None or end is not None
 
-        if subset.empty:
+        if summary is None:
             return {
                 "type": "gender_stats",
-                "message": f"No data found for gender '{gender_value}'.",
+                "message": f"No data found for gender '{gender_value}'{' in this period' if bounded else ''}.",
             }
 
-        return {
+        result = {
             "type": "gender_stats",
             "gender": gender_value,
-            "total_sales": float(subset["Sales"].sum()),
-            "avg_sales": float(subset["Sales"].mean()),
-            "avg_satisfaction": float(subset["Customer_Satisfaction"].mean())
-            if "Customer_Satisfaction" in subset.columns
-            else None,
+            "total_sales": summary["total_sales"],
+            "avg_sales": summary["avg_sales"],
+            "avg_satisfaction": summary["avg_satisfaction"],
+        }
+        if bounded:
+            result["period"] = self._period_info(start, end)
+        return result
+
+    # ---------------------------------------------------------
+    # Date-range statistics (optionally narrowed by entity filters)
+    # ---------------------------------------------------------
+    @cached_result
+    def get_period_stats(self, start=None, end=None, product=None, region=None,
+                         gender=None, age=None, label=None):
+        filters = {
+            "Product": product,
+            "Region": region,
+            "Customer_Gender": gender,
+            "Customer_Age": age,
+        }
+        filters = {column: value for column, value in filters.items() if value is not None}
+
+        period = self._period_info(start, end)
+        if label:
+            period["label"] = label
+
+        summary = self.query(QuerySpec(
+            filters=filters, metrics=["count", *SUMMARY_METRICS], start=start, end=end
+        )).rows
+        if not summary:
+            return {
+                "type": "period_stats",
+                "period": period,
+                "filters": filters,
+                "message": "No data found for the requested period.",
+            }
+        summary = summary[0]
+
+        monthly = self.query(QuerySpec(
+            filters=filters, group_by=["Month"], start=start, end=end
+        )).rows
+
+        return {
+            "type": "period_stats",
+            "period": period,
+            "filters": filters,
+            "transactions": summary["count"],
+            "total_sales": summary["total_sales"],
+            "avg_sales": summary["avg_sales"],
+            "max_sale": summary["max_sale"],
+            "avg_satisfaction": summary["avg_satisfaction"],
+            "monthly_sales": {row["Month"]: row["total_sales"] for row in monthly},
+            "region_totals": self._ranked_totals("Region", filters, start, end),
+            "product_totals": self._ranked_totals("Product", filters, start, end),
+        }
+
+    def _ranked_totals(self, column, filters=None, start=None, end=None):
+        """{label: total sales} for ``column``, largest first."""
+        filters = dict(filters or {})
+        only = filters.pop(column, None)
+        rows = self.query(QuerySpec(
+            filters=filters, group_by=[column], sort="total_sales", start=start, end=end
+        )).rows
+        return {
+            row[column]: row["total_sales"]
+            for row in rows
+            if only is None or row[column] == only
         }
 
     # ---------------------------------------------------------
     # Product × Region × Month analysis
     # ---------------------------------------------------------
-    def get_product_region_month_stats(self):
-        grouped = (
-            self.df.groupby(["Product", "Region", "Month"])["Sales"]
-            .sum()
-            .reset_index()
-        )
+    @cached_result
+    def get_product_region_month_stats(self, columnar=False):
+        """
+        Product × Region × Month sales, served from the precomputed
+        ``product_region_month`` table.
 
-        result = {}
-        for _, row in grouped.iterrows():
-            product = row["Product"]
-            region = row["Region"]
-            month = row["Month"]
-            sales = row["Sales"]
+        By default the result is nested {product: {region: {month: sales}}}.
+        ``columnar=True`` returns parallel lists instead
+        (``product_region_month_columns``), skipping the dict building.
+        """
+        table = self.product_region_month
 
-            result.setdefault(product, {})
-            result[product].setdefault(region, {})
-            result[product][region][month] = float(sales)
+        if columnar:
+            return {
+                "type": "product_region_month_stats",
+                "product_region_month_columns": {
+                    "Product": table["Product"].astype(object).tolist(),
+                    "Region": table["Region"].astype(object).tolist(),
+                    "Month": table["Month"].astype(str).tolist(),
+                    "Sales": table["Sales"].astype("float64").tolist(),
+                },
+            }
 
         return {
             "type": "product_region_month_stats",
-            "product_region_month_sales": result,
+            "product_region_month_sales": self._nested_sales(table),
+        }
+
+    @staticmethod
+    def _nested_sales(table):
+        """
+        {product: {region: {month: sales}}} from a (Product, Region, Month, Sales)
+        table. Rows are sorted once; each (product, region) run then becomes
+        one ``dict(zip(...))`` instead of a Python step per row.
+        """
+        if table.empty:
+            return {}
+
+        table = table.sort_values(["Product", "Region", "Month"], kind="stable")
+        products = table["Product"].astype(object).to_numpy()
+        regions = table["Region"].astype(object).to_numpy()
+        months = table["Month"].astype(str).tolist()
+        sales = table["Sales"].astype("float64").tolist()
+
+        # Start of every (product, region) run
+        changed = (products[1:] != products[:-1]) | (regions[1:] != regions[:-1])
+        starts = np.flatnonzero(np.concatenate(([True], changed)))
+        ends = np.append(starts[1:], len(table))
+
+        result = {}
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            by_region = result.setdefault(products[start], {})
+            by_region[regions[start]] = dict(zip(months[start:end], sales[start:end]))
+        return result
+
+    # ---------------------------------------------------------
+    # Windowed metrics (prefix sums over every Product × Region series)
+    # ---------------------------------------------------------
+    def _get_windows(self):
+        """Product × Region window engine plus its product / region / total rollups."""
+        if self._windows is None or self._windows[0] != self.data_version:
+            engine = WindowEngine.from_table(self.product_region_month, ["Product", "Region"])
+            views = {
+                "product_region": engine,
+                "product": engine.collapse(["Product"]),
+                "region": engine.collapse(["Region"]),
+                "total": engine.collapse([]),
+            }
+            self._windows = (self.data_version, views)
+        return self._windows[1]
+
+    def _get_complete_windows(self):
+        """
+        ``_get_windows`` views without a trailing month that is still in
+        progress (it would read as a collapse), plus that month or None.
+        """
+        views = self._get_windows()
+        months = views["total"].months
+        if not months or self._month_complete(months[-1]):
+            return views, None
+        return {name: engine.head(len(months) - 1) for name, engine in views.items()}, months[-1]
+
+    @cached_result
+    def get_growth_stats(self, lag: int = 1):
+        """Latest complete month-over-month (lag=1) or year-over-year (lag=12) growth per series."""
+        views, excluded = self._get_complete_windows()
+        total = views["total"]
+        metric = {1: "mom", 12: "yoy"}.get(lag, f"{lag}m")
+
+        if len(total.months) <= lag:
+            return {
+                "type": "growth_stats",
+                "metric": metric,
+                "message": f"Need more than {lag} months of data for this comparison.",
+            }
+
+        return {
+            "type": "growth_stats",
+            "metric": metric,
+            "lag_months": lag,
+            "latest_month": total.months[-1],
+            "excluded_partial_month": excluded,
+            "total_growth": total.latest(total.growth(lag))["Total"],
+            "total_growth_by_month": total.series(total.growth(lag), last=12),
+            "product_growth": views["product"].latest(views["product"].growth(lag)),
+            "region_growth": views["region"].latest(views["region"].growth(lag)),
+            "product_region_growth": views["product_region"].latest(
+                views["product_region"].growth(lag)
+            ),
+        }
+
+    @cached_result
+    def get_rolling_stats(self, window: int = 3):
+        """Trailing ``window``-month average and volatility per series."""
+        views, excluded = self._get_complete_windows()
+        total = views["total"]
+
+        if len(total.months) < window:
+            return {
+                "type": "rolling_stats",
+                "window_months": window,
+                "message": f"Need at least {window} months of data.",
+            }
+
+        return {
+            "type": "rolling_stats",
+            "window_months": window,
+            "latest_month": total.months[-1],
+            "excluded_partial_month": excluded,
+            "total_rolling_mean": total.series(total.rolling_mean(window), last=12),
+            "product_rolling_mean": views["product"].latest(views["product"].rolling_mean(window)),
+            "region_rolling_mean": views["region"].latest(views["region"].rolling_mean(window)),
+            "product_rolling_std": views["product"].latest(views["product"].rolling_std(window)),
+            "region_rolling_std": views["region"].latest(views["region"].rolling_std(window)),
+            "product_region_rolling_mean": views["product_region"].latest(
+                views["product_region"].rolling_mean(window)
+            ),
+        }
+
+    @cached_result
+    def get_momentum_stats(self, window: int = 3):
+        """Last ``window`` months versus the ``window`` months before, ranked."""
+        views, excluded = self._get_complete_windows()
+        total = views["total"]
+
+        if len(total.months) < 2 * window:
+            return {
+                "type": "momentum_stats",
+                "window_months": window,
+                "message": f"Need at least {2 * window} months of data.",
+            }
+
+        def ranked(engine):
+            values = {
+                engine.label(key): (None if np.isnan(v) else float(v))
+                for key, v in zip(engine.keys, engine.momentum(window))
+            }
+            return dict(sorted(values.items(), key=lambda x: -np.inf if x[1] is None else x[1], reverse=True))
+
+        return {
+            "type": "momentum_stats",
+            "window_months": window,
+            "latest_month": total.months[-1],
+            "excluded_partial_month": excluded,
+            "total_momentum": ranked(total)["Total"],
+            "product_momentum": ranked(views["product"]),
+            "region_momentum": ranked(views["region"]),
+            "product_region_momentum": ranked(views["product_region"]),
         }
 
     # ---------------------------------------------------------
     # Trend detection (increasing / decreasing / flat)
     # ---------------------------------------------------------
+    @cached_result
     def get_trend_stats(self):
-        monthly = (
-            self.df.groupby("Month")["Sales"]
-            .sum()
-            .sort_index()
-        )
+        # Precomputed and kept in month order, so no partition is read
+        monthly = self.monthly_sales
 
         if len(monthly) < 2:
             return {
                 "type": "trend_stats",
                 "trend": "insufficient_data",
-                "monthly_sales": monthly.to_dict(),
+                "monthly_sales": dict(monthly),
             }
 
-        first = float(monthly.iloc[0])
-        last = float(monthly.iloc[-1])
+        first = float(next(iter(monthly.values())))
+        last = float(next(reversed(monthly.values())))
 
         if last > first * 1.05:
             trend = "increasing"
@@ -206,27 +794,28 @@ class InsightRetriever:
         return {
             "type": "trend_stats",
             "trend": trend,
-            "monthly_sales": {k: float(v) for k, v in monthly.to_dict().items()},
+            "monthly_sales": {k: float(v) for k, v in monthly.items()},
         }
 
     # ---------------------------------------------------------
     # Anomaly detection (simple z-score on monthly totals)
     # ---------------------------------------------------------
-    def get_anomaly_stats(self):
-        monthly = (
-            self.df.groupby("Month")["Sales"]
-            .sum()
-            .sort_index()
-        )
+    @cached_result
+    def get_anomaly_stats(self, top_k: int = 10):
+        """
+        Overall monthly z-score anomalies (as before) plus the ``top_k`` most
+        severe anomalies across every product, region, product × region,
+        gender and age-band series, and where the flagged months concentrate.
+        """
+        series = pd.Series(self.monthly_sales, dtype=float).sort_index()
 
-        if len(monthly) < 3:
+        if len(series) < 3:
             return {
                 "type": "anomaly_stats",
                 "anomalies": [],
-                "monthly_sales": {k: float(v) for k, v in monthly.to_dict().items()},
+                "monthly_sales": {k: float(v) for k, v in series.to_dict().items()},
             }
 
-        series = monthly.astype(float)
         mean = float(series.mean())
         std = float(series.std())
 
@@ -240,80 +829,257 @@ class InsightRetriever:
                 if abs(z) >= 2.0
             ]
 
+        engine = self._get_anomaly_engine()
+
         return {
             "type": "anomaly_stats",
             "anomalies": anomalies,
+            "top_anomalies": engine.top(top_k),
+            "anomaly_concentration": engine.concentration(),
             "monthly_sales": {k: float(v) for k, v in series.to_dict().items()},
         }
 
-    # ---------------------------------------------------------
-    # Forecasting hook (for Groq-powered forecasting)
-    # ---------------------------------------------------------
-    def get_forecast_context(self, horizon_months: int = 3):
+    def _get_anomaly_engine(self):
+        """
+        Anomaly engine over every slice series, refreshed once per data
+        version. When the appends since the last refresh only touched months
+        after the scored ones, the engine is extended with the new complete
+        months (AnomalyEngine.extend); otherwise it is rebuilt.
+        """
+        if self._anomalies is not None and self._anomalies[0] == self.data_version:
+            return self._anomalies[1]
+
+        engine = self._extend_anomaly_engine() if self._anomalies is not None else None
+        if engine is None:
+            keys, values, months = self._slice_month_matrix()
+            engine = AnomalyEngine(values, keys, months)
+
+        self._anomalies = (self.data_version, engine)
+        self._anomaly_changed_from = None
+        return engine
+
+    def _extend_anomaly_engine(self):
+        """The cached engine plus the months appended since, or None to rebuild."""
+        engine = self._anomalies[1]
+        changed = self._anomaly_changed_from
+        if changed is None:
+            return engine
+        if not engine.months or changed <= engine.months[-1]:
+            return None
+
+        first_new = str(pd.Period(engine.months[-1], freq="M") + 1)
+        keys, values, months = self._slice_month_matrix(start=first_new)
+        if not months:
+            return engine
+        if months[0] != first_new:
+            return None
+
+        rows = {key: i for i, key in enumerate(engine.keys)}
+        if any(key not in rows for key in keys):
+            return None  # a new series: rebuild so it gets a full history
+
+        new_values = np.zeros((len(engine.keys), len(months)))
+        new_values[[rows[key] for key in keys]] = values
+        return engine.extend(new_values, months)
+
+    def _slice_month_matrix(self, start=None):
+        """(keys, values, months) of every slice series from month ``start`` on."""
+        windows = WindowEngine.from_table(self._slice_month_table(start), ["slice", "label"])
+        values, months = windows.values, windows.months
+
+        # A month still in progress would be flagged as a drop everywhere
+        if months and not self._month_complete(months[-1]):
+            values, months = values[:, :-1], months[:-1]
+        return windows.keys, values, months
+
+    def _dim_month_sales(self, dim, start=None):
+        """Long (label, Month, Sales) table of monthly sales per ``dim`` label."""
+        if start is None:
+            spec = QuerySpec(group_by=[dim, "Month"])
+        else:
+            # Whole-month range, so the cube can still answer it
+            last = max(str(m) for m in self.monthly_sales)
+            end = (pd.Period(last, freq="M") + 1).start_time
+            spec = QuerySpec(group_by=[dim, "Month"], start=pd.Period(start, freq="M").start_time, end=end)
+        rows = self.query(spec).rows
+        table = pd.DataFrame(rows, columns=[dim, "Month", "total_sales"])
+        return table.rename(columns={dim: "label", "total_sales": "Sales"})
+
+    def _slice_month_table(self, start=None):
         """
-        Returns structured monthly sales history that the LLM can use
-        to generate a natural-language forecast.
+        (slice, label, Month, Sales) for every series the anomaly engine
+        scores, optionally only for months from ``start`` ("YYYY-MM") on.
         """
-        monthly = (
-            self.df.groupby("Month")["Sales"]
-            .sum()
-            .reset_index()
+        monthly = {
+            str(m): float(v) for m, v in self.monthly_sales.items() if start is None or str(m) >= start
+        }
+        frames = [pd.DataFrame({
+            "slice": "Total",
+            "label": "All",
+            "Month": list(monthly),
+            "Sales": list(monthly.values()),
+        })]
+
+        for dim, name in (("Product", "Product"), ("Region", "Region"), ("Customer_Gender", "Gender")):
+            frames.append(self._dim_month_sales(dim, start).assign(slice=name))
+
+        ages = self._dim_month_sales("Customer_Age", start)
+        ages["label"] = pd.cut(
+            ages["label"].astype(float), bins=AGE_BANDS, labels=AGE_BAND_LABELS
+        ).astype(object)
+        frames.append(
+            ages.groupby(["label", "Month"], observed=True)["Sales"].sum().reset_index().assign(slice="Age")
         )
 
-        monthly["Month"] = pd.PeriodIndex(monthly["Month"], freq="M").astype(str)
-        monthly = monthly.sort_values("Month")
+        prm = self.product_region_month
+        if start is not None:
+            prm = prm[prm["Month"].astype(str) >= start]
+        frames.append(pd.DataFrame({
+            "slice": "Product × Region",
+            "label": prm["Product"].astype(str) + " | " + prm["Region"].astype(str),
+            "Month": prm["Month"].astype(str),
+            "Sales": prm["Sales"].astype(float),
+        }))
 
-        series = monthly.set_index("Month")["Sales"].astype(float)
+        table = pd.concat(frames, ignore_index=True)
+        table["Month"] = table["Month"].astype(str)
+        return table[["slice", "label", "Month", "Sales"]]
 
-        return {
+    # ---------------------------------------------------------
+    # Forecasting hook (for Groq-powered forecasting)
+    # ---------------------------------------------------------
+    @cached_result
+    def get_forecast_context(self, horizon_months: int = 3, start=None, end=None, method="auto"):
+        """
+        Monthly history plus in-process forecasts with prediction intervals
+        for the total and every product / region series, so the LLM only has
+        to narrate reproducible numbers. ``start`` / ``end`` ("YYYY-MM",
+        inclusive) restrict the history window. All series are forecast in
+        one batched pass over the window engine's month matrix.
+        """
+        views = self._get_windows()
+        months = views["total"].months
+        keep = [
+            i for i, month in enumerate(months)
+            if (start is None or month >= start) and (end is None or month <= end)
+        ]
+
+        # A trailing month that is still in progress would read as a collapse
+        excluded = None
+        if keep and not self._month_complete(months[keep[-1]]):
+            excluded = months[keep[-1]]
+            keep = keep[:-1]
+
+        series = {months[i]: float(views["total"].values[0, i]) for i in keep}
+
+        result = {
             "type": "forecast_context",
-            "monthly_sales": series.to_dict(),
+            "monthly_sales": dict(list(series.items())[-FORECAST_HISTORY_MONTHS:]),
             "horizon_months": horizon_months,
             "meta": {
                 "num_months": len(series),
+                "history_months_shown": min(len(series), FORECAST_HISTORY_MONTHS),
+                "interval_level": DEFAULT_LEVEL,
+                "excluded_partial_month": excluded,
             },
         }
 
-    # ---------------------------------------------------------
-    # Region performance (ranking regions by total sales)
-    # ---------------------------------------------------------
-    def get_region_performance(self):
-        ranked = sorted(
-            self.region_totals.items(), key=lambda x: x[1], reverse=True
-        )
-        top_region = ranked[0][0] if ranked else None
-
-        return {
-            "type": "region_performance",
-            "region_totals": {k: float(v) for k, v in self.region_totals.items()},
-            "ranked": [(r, float(v)) for r, v in ranked],
-            "top_region": top_region,
+        if len(keep) < 2:
+            result["message"] = "Not enough history to forecast."
+            return result
+
+        future = [
+            str(p) for p in pd.period_range(months[keep[-1]], periods=horizon_months + 1, freq="M")[1:]
+        ]
+        window = slice(keep[0], keep[-1] + 1)
+
+        fit = forecast(views["total"].values[:, window], horizon_months, method=method, floor=0.0)
+        result["forecast"] = {
+            "method": fit.method[0],
+            "months": future,
+            "point": [round(float(v), 2) for v in fit.point[0]],
+            "low": [round(float(v), 2) for v in fit.lower[0]],
+            "high": [round(float(v), 2) for v in fit.upper[0]],
         }
 
+        # Per-series horizon totals; low / high add up the monthly bounds,
+        # which is conservative (forecast errors are positively correlated)
+        for name in ("product", "region", "product_region"):
+            engine = views[name]
+            fit = forecast(engine.values[:, window], horizon_months, method=method, floor=0.0)
+            result[f"{name}_forecast"] = {
+                engine.label(key): {
+                    "method": fit.method[i],
+                    "next_total": round(float(fit.point[i].sum()), 2),
+                    "low": round(float(fit.lower[i].sum()), 2),
+                    "high": round(float(fit.upper[i].sum()), 2),
+                }
+                for i, key in enumerate(engine.keys)
+            }
+
+        return result
+
+    def _month_complete(self, month):
+        """False when the data stops before the end of ``month``."""
+        last_day = pd.Period(month, freq="M").end_time.normalize()
+        reference = self.reference_date()
+        return reference is None or reference >= last_day
+
     # ---------------------------------------------------------
-    # Product performance (ranking products by total sales)
+    # Region / product performance (partial ranking by total sales)
     # ---------------------------------------------------------
-    def get_product_performance(self):
-        ranked = sorted(
-            self.product_totals.items(), key=lambda x: x[1], reverse=True
-        )
-        top_product = ranked[0][0] if ranked else None
+    @cached_result
+    def get_region_performance(self, start=None, end=None, limit=DEFAULT_LIMIT,
+                               cursor=None, ascending=False):
+        return self._performance("Region", "region", start, end, limit, cursor, ascending)
 
-        return {
-            "type": "product_performance",
-            "product_totals": {k: float(v) for k, v in self.product_totals.items()},
-            "ranked": [(p, float(v)) for p, v in ranked],
-            "top_product": top_product,
+    @cached_result
+    def get_product_performance(self, start=None, end=None, limit=DEFAULT_LIMIT,
+                                cursor=None, ascending=False):
+        return self._performance("Product", "product", start, end, limit, cursor, ascending)
+
+    def _performance(self, column, noun, start, end, limit, cursor, ascending):
+        """
+        One page of ``column`` ranked by total sales: the top ``limit``
+        (bottom with ``ascending``), the cursor for the next page and an
+        "others" bucket for everything not shown.
+        """
+        bounded = start is not None or end is not None
+        ranking = self._ranking(column, start, end)
+        page = ranking.page(limit, cursor, ascending)
+        top = ranking.top(1)
+
+        result = {
+            "type": f"{noun}_performance",
+            f"{noun}_totals": dict(page.items),
+            "ranked": page.items,
+            f"top_{noun}": top[0][0] if top else None,
+            f"{noun}_count": len(ranking),
+            "others": page.others,
+            "next_cursor": page.next_cursor,
         }
+        if ascending:
+            result["order"] = "ascending"
+        if bounded:
+            result["period"] = self._period_info(start, end)
+        return result
+
+    def _ranking(self, column, start=None, end=None):
+        """Ranking of total sales per ``column`` label, optionally within [start, end)."""
+        if start is None and end is None:
+            totals = self.region_totals if column == "Region" else self.product_totals
+            return Ranking.from_dict(totals)
+
+        spec = QuerySpec(group_by=[column], start=start, end=end)
+        columns, _ = QueryEngine(self.cube, self._get_backend()).columns(spec)
+        return Ranking(columns[column], columns["total_sales"])
 
     # ---------------------------------------------------------
-    # Region consistency / volatility
+    # Region consistency / volatility (streaming moments, no row scan)
     # ---------------------------------------------------------
+    @cached_result
     def get_region_consistency(self):
-        region_volatility = (
-            self.df.groupby("Region")["Sales"].std().sort_values().to_dict()
-        )
-        volatility = {k: float(v) for k, v in region_volatility.items()}
+        volatility = dict(sorted(self.stream_stats.std("Region").items(), key=lambda x: x[1]))
 
         if not volatility:
             return {
@@ -329,151 +1095,132 @@ class InsightRetriever:
         return {
             "type": "region_consistency",
             "volatility": volatility,
+            "percentiles": self.stream_stats.percentiles("Region"),
             "most_consistent": most_consistent,
             "most_volatile": most_volatile,
         }
 
     # ---------------------------------------------------------
-    # Generic retrieval for LLM queries (new, clean routing)
+    # Sales distribution per Region / Product (quantile sketches)
     # ---------------------------------------------------------
-    def retrieve(self, query: str):
-        q = query.lower().strip()
+    @cached_result
+    def get_distribution_stats(self, dimension="Product"):
+        """Per-label std and approximate percentiles of single-sale amounts."""
+        if dimension not in self.stream_stats.dimensions:
+            raise ValueError(
+                f"No streaming statistics for '{dimension}'. Use one of {self.stream_stats.dimensions}."
+            )
 
-        # 1. Region performance (recommended questions)
-        if "region" in q and (
-            "best" in q
-            or "top" in q
-            or "strongest" in q
-            or "performing" in q
-            or "leader" in q
-        ):
-            return self.get_region_performance()
-
-        # 2. Product performance
-        if "product" in q and (
-            "best" in q
-            or "top" in q
-            or "strongest" in q
-            or "performing" in q
-            or "leader" in q
-        ):
-            return self.get_product_performance()
-
-        # 3. Trend questions
-        if (
-            "trend" in q
-            or "over time" in q
-            or "how has" in q
-            or "trajectory" in q
-            or "increasing" in q
-            or "decreasing" in q
-            or ("sales" in q and "history" in q)
-        ):
-            return self.get_trend_stats()
-
-        # 4. Anomaly detection
-        if (
-            "anomaly" in q
-            or "anomalies" in q
-            or "outlier" in q
-            or "outliers" in q
-            or "unusual" in q
-            or "unexpected" in q
-            or "spike" in q
-            or "drop" in q
-        ):
-            return self.get_anomaly_stats()
-
-        # 5. Forecasting
-        if (
-            "forecast" in q
-            or "predict" in q
-            or "projection" in q
-            or "project" in q
-            or "next month" in q
-            or "next quarter" in q
-            or ("future" in q and "sales" in q)
-            or ("expected" in q and "sales" in q)
-            or ("outlook" in q and "sales" in q)
-        ):
-            return self.get_forecast_context(horizon_months=3)
-
-        # 6. Product × Region × Month analysis
-        if (
-            "product-region" in q
-            or "product region" in q
-            or "product–region" in q
-            or "product by region" in q
-            or "region by product" in q
-            or ("product" in q and "region" in q and "performance" in q)
-            or ("product" in q and "region" in q and "over time" in q)
-            or ("product" in q and "region" in q and "trend" in q)
-            or ("shift" in q and "region" in q)
-            or ("shifts" in q and "region" in q)
-            or ("month-to-month" in q and "region" in q)
-            or ("month to month" in q and "region" in q)
-            or ("strongest" in q and "region" in q)
-            or ("weakest" in q and "region" in q)
-            or ("compare" in q and "region" in q and "product" in q)
-        ):
-            return self.get_product_region_month_stats()
-
-        # 7. Region consistency / stability
-        if (
-            "consistent" in q
-            or "consistency" in q
-            or "month-to-month" in q
-            or "month to month" in q
-            or ("stable" in q and "region" in q)
-            or ("stability" in q and "region" in q)
-            or ("region" in q and "over time" in q)
-            or ("region" in q and "variance" in q)
-            or ("region" in q and "volatility" in q)
-        ):
-            return self.get_region_consistency()
-
-        # 8. Age summary queries (no specific age mentioned)
-        if "age" in q or "ages" in q or "age group" in q:
-            if "Customer_Age" in self.df.columns:
-                age_stats = {}
-                for age in self.df["Customer_Age"].dropna().unique():
-                    subset = self.df[self.df["Customer_Age"] == age]
-                    age_stats[age] = float(subset["Sales"].sum())
-                return {
-                    "type": "age_sales_summary",
-                    "age_sales_summary": age_stats,
-                }
+        percentiles = self.stream_stats.percentiles(dimension)
+        medians = {label: p["p50"] for label, p in percentiles.items()}
 
-        # 9. Product queries (specific product mention)
-        for product in self.df["Product"].unique():
-            if product.lower() in q:
-                return self.get_product_stats(product)
-
-        # 10. Region queries (specific region mention)
-        for region in self.df["Region"].unique():
-            if region.lower() in q:
-                return self.get_region_stats(region)
-
-        # 11. Age queries (specific age)
-        if "Customer_Age" in self.df.columns:
-            for age in self.df["Customer_Age"].dropna().unique():
-                if str(age).lower() in q:
-                    return self.get_age_stats(age)
-
-        # 12. Gender queries
-        if "Customer_Gender" in self.df.columns:
-            for gender in self.df["Customer_Gender"].dropna().unique():
-                if str(gender).lower() in q:
-                    return self.get_gender_stats(gender)
-
-        # 13. Month queries (explicit month mention)
-        for month in self.df["Month"].unique():
-            m_str = str(month).lower()
-            if m_str in q:
-                return self.get_monthly_stats(month)
-
-        # 14. Fallback
         return {
-            "type": "no_stats",
-            "message": "No matching statistics found for your query.",
-        }
\ No newline at end of file
+            "type": "distribution_stats",
+            "dimension": dimension,
+            "std_sales": self.stream_stats.std(dimension),
+            "percentiles": percentiles,
+            "highest_median": max(medians, key=medians.get) if medians else None,
+            "lowest_median": min(medians, key=medians.get) if medians else None,
+        }
+
+    # ---------------------------------------------------------
+    # Query routing (compiled once per data version)
+    # ---------------------------------------------------------
+    def _entity_labels(self):
+        """Labels per routable dimension, in first-appearance order."""
+        if self.cube is not None:
+            return {dim: list(labels) for dim, labels in self.cube.labels.items()}
+
+        df = self.df
+        return {
+            dim: list(df[dim].dropna().unique())
+            for dim in ENTITY_DIMENSIONS
+            if dim in df.columns
+        }
+
+    def _get_router(self):
+        if self._router is None or self._router.version != self.data_version:
+            self._router = QueryRouter(self._entity_labels(), version=self.data_version)
+        return self._router
+
+    @cached_result
+    def get_age_sales_summary(self):
+        """Total sales per customer age (youngest first)."""
+        rows = self.query(QuerySpec(group_by=["Customer_Age"])).rows
+        age_stats = {row["Customer_Age"]: row["total_sales"] for row in rows}
+        return {
+            "type": "age_sales_summary",
+            "age_sales_summary": age_stats,
+        }
+
+    def _resolve(self, query: str):
+        """Route a question to the (get_* method name, args) that answers it, or None."""
+        q = query.lower().strip()
+        router = self._get_router()
+        route = router.route(q)
+
+        period = None
+        if mentions_period(q) and (route is None or route[0] == "entity" or route[1] in PERIOD_INTENTS):
+            period = resolve_period(q, self.reference_date())
+
+        if route is not None and route[0] == "intent":
+            name, args = INTENT_METHODS[route[1]]
+            if period is not None and route[1] in PERIOD_INTENTS:
+                return (name, (period.start, period.end, *args[2:]))
+            return (name, args)
+
+        if period is not None:
+            # Entity filters narrow the range; ages are skipped because year
+            # digits ("2024") would otherwise match ages 20 and 24.
+            entities = router.entities(q)
+            return ("get_period_stats", (
+                period.start,
+                period.end,
+                entities.get("Product"),
+                entities.get("Region"),
+                entities.get("Customer_Gender"),
+                None,
+                period.label,
+            ))
+
+        if route is None:
+            return None
+
+        dim, label = route[1], route[2]
+        return (ENTITY_METHODS[dim], (label,))
+
+    def _answer(self, call):
+        if call is None:
+            return {
+                "type": "no_stats",
+                "message": "No matching statistics found for your query.",
+            }
+        name, args = call
+        return getattr(self, name)(*args)
+
+    def retrieve(self, query: str):
+        return self._answer(self._resolve(query))
+
+    def retrieve_many(self, queries, max_workers=None):
+        """
+        Answer a batch of questions. Every question is routed first and each
+        distinct (method, entity) pair is computed once; results come back
+        in input order, one independent copy per question.
+        ``max_workers`` > 1 computes the distinct calls on a thread pool.
+        """
+        calls = [self._resolve(query) for query in queries]
+        distinct = list(dict.fromkeys(calls))
+
+        if max_workers and max_workers > 1 and len(distinct) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                answers = dict(zip(distinct, pool.map(self._answer, distinct)))
+        else:
+            answers = {call: self._answer(call) for call in distinct}
+
+        results = []
+        seen = set()
+        for call in calls:
+            # First occurrence gets the computed dict, repeats get copies
+            results.append(copy.deepcopy(answers[call]) if call in seen else answers[call])
+            seen.add(call)
+        return results
@@ -0,0 +1,187 @@
+"""
+Compiled query router for ``InsightRetriever.retrieve``.
+
+Every intent keyword and every entity label (products, regions, ages,
+genders, months) is compiled once into a single Aho-Corasick automaton, so
+routing a question is one pass over its characters no matter how many
+keywords or catalog entries exist. Matching keeps plain substring
+semantics (overlapping hits included), so routes are the same as the
+original chain of ``in`` checks.
+"""
+
+from collections import deque
+
+# Ordered intent rules. Each rule is a list of alternatives; an alternative
+# matches when all of its keywords occur in the (lower-cased) question.
+INTENT_RULES = [
+    ("region_bottom", [
+        ("region", kw) for kw in ("worst", "lowest", "bottom", "underperforming")
+    ]),
+    ("product_bottom", [
+        ("product", kw) for kw in ("worst", "lowest", "bottom", "underperforming")
+    ]),
+    ("region_performance", [
+        ("region", kw) for kw in ("best", "top", "strongest", "performing", "leader")
+    ]),
+    ("product_performance", [
+        ("product", kw) for kw in ("best", "top", "strongest", "performing", "leader")
+    ]),
+    ("region_distribution", [
+        ("region", kw) for kw in ("median", "percentile", "quartile", "distribution")
+    ]),
+    ("product_distribution", [
+        ("product", kw) for kw in ("median", "percentile", "quartile", "distribution")
+    ]),
+    ("trend", [
+        ("trend",), ("over time",), ("how has",), ("trajectory",),
+        ("increasing",), ("decreasing",), ("sales", "history"),
+    ]),
+    ("anomaly", [
+        ("anomaly",), ("anomalies",), ("outlier",), ("outliers",),
+        ("unusual",), ("unexpected",), ("spike",), ("drop",),
+    ]),
+    ("forecast", [
+        ("forecast",), ("predict",), ("projection",), ("project",),
+        ("next month",), ("next quarter",),
+        ("future", "sales"), ("expected", "sales"), ("outlook", "sales"),
+    ]),
+    ("product_region_month", [
+        ("product-region",), ("product region",), ("product–region",),
+        ("product by region",), ("region by product",),
+        ("product", "region", "performance"),
+        ("product", "region", "over time"),
+        ("product", "region", "trend"),
+        ("shift", "region"), ("shifts", "region"),
+        ("month-to-month", "region"), ("month to month", "region"),
+        ("strongest", "region"), ("weakest", "region"),
+        ("compare", "region", "product"),
+    ]),
+    ("region_consistency", [
+        ("consistent",), ("consistency",), ("month-to-month",), ("month to month",),
+        ("stable", "region"), ("stability", "region"),
+        ("region", "over time"), ("region", "variance"), ("region", "volatility"),
+    ]),
+    ("momentum", [("momentum",), ("accelerating",), ("slowing",)]),
+    ("growth_yoy", [("yoy",), ("year-over-year",), ("year over year",)]),
+    ("growth_mom", [
+        ("month-over-month",), ("month over month",), ("mom growth",), ("growth",),
+    ]),
+    ("rolling", [
+        ("rolling",), ("moving average",), ("moving avg",), ("trailing",),
+    ]),
+    ("age_summary", [("age",), ("ages",), ("age group",)]),
+]
+
+# Entity lookups run after the intent rules, in this order
+ENTITY_DIMENSIONS = ["Product", "Region", "Customer_Age", "Customer_Gender", "Month"]
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher reporting every (overlapping) hit."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self.goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append(payload)
+
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                if self.fail[nxt] == nxt:
+                    self.fail[nxt] = 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def matches(self, text):
+        """Payloads of every pattern occurring in ``text``."""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        found = []
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.extend(output[node])
+        return found
+
+
+class QueryRouter:
+    """
+    Maps a question to an intent or an entity lookup.
+
+    ``entities`` maps each dimension to its labels in first-appearance order
+    (the order the original ``unique()`` loops used); the earliest label
+    mentioned in the question wins, as before.
+    """
+
+    def __init__(self, entities, version=None):
+        self.version = version
+        self.rules = INTENT_RULES
+
+        patterns = []
+        for _, alternatives in self.rules:
+            for alternative in alternatives:
+                patterns.extend((kw, ("kw", kw)) for kw in alternative)
+
+        for dim in ENTITY_DIMENSIONS:
+            for rank, label in enumerate(entities.get(dim) or []):
+                patterns.append((str(label).lower(), ("entity", dim, rank, label)))
+
+        self.matcher = AhoCorasick(patterns)
+
+    def _scan(self, question):
+        """(intent keywords found, {dimension: earliest-ranked label}) for a question."""
+        keywords = set()
+        entities = {}
+        for payload in self.matcher.matches(question):
+            if payload[0] == "kw":
+                keywords.add(payload[1])
+                continue
+            _, dim, rank, label = payload
+            best = entities.get(dim)
+            if best is None or rank < best[0]:
+                entities[dim] = (rank, label)
+        return keywords, {dim: label for dim, (_, label) in entities.items()}
+
+    def entities(self, question):
+        """Every dimension mentioned in the (lower-cased) question -> its label."""
+        return self._scan(question)[1]
+
+    def route(self, question):
+        """
+        Return ("intent", name), ("entity", dimension, label) or None.
+        ``question`` must already be lower-cased.
+        """
+        keywords, entities = self._scan(question)
+
+        for intent, alternatives in self.rules:
+            if any(all(kw in keywords for kw in alternative) for alternative in alternatives):
+                return ("intent", intent)
+
+        for dim in ENTITY_DIMENSIONS:
+            if dim in entities:
+                return ("entity", dim, entities[dim])
+
+        return None
@@ -1,7 +1,7 @@
 import streamlit as st
 from groq import Groq
-from load_data import load_data_and_kb
-from retriever import InsightRetriever
+from dataset_registry import get_retriever
+from prompting import build_forecast_prompt
 
 # ---------------------------------------------------------
 # Initialization
@@ -12,10 +12,6 @@ if "chat_history" not in st.session_state:
 if "conversation_summary" not in st.session_state:
     st.session_state.conversation_summary = ""
 
-# Load data + KB once at startup
-df, kb = load_data_and_kb()
-retriever = InsightRetriever(df, kb)
-
 # ---------------------------------------------------------
 # Lazy Groq client creation (safe for Streamlit Cloud)
 # ---------------------------------------------------------
@@ -102,12 +98,17 @@ Conversation to summarize:
 # ---------------------------------------------------------
 # Unified prompt builder
 # ---------------------------------------------------------
-def build_unified_prompt(question: str, stats, analytical_mode: bool) -> str:
+def conversation_context():
+    """(summary_text, history_text) for the prompt: the running summary and the last 6 turns."""
     history_text = ""
     for turn in st.session_state.chat_history[-6:]:
         history_text += f"User: {turn['user']}\nAssistant: {turn['assistant']}\n\n"
 
-    summary_text = st.session_state.conversation_summary
+    return st.session_state.conversation_summary, history_text
+
+
+def build_unified_prompt(question: str, stats, analytical_mode: bool) -> str:
+    summary_text, history_text = conversation_context()
 
     if not analytical_mode:
         return f"""
@@ -157,7 +158,7 @@ def run_query(question: str) -> str:
 
     try:
         # Step 1 — Retrieve stats
-        stats = retriever.retrieve(question)
+        stats = get_retriever().retrieve(question)
         print("Stats retrieved")
 
         # -----------------------------------------------------
@@ -188,6 +189,10 @@ def run_query(question: str) -> str:
                 "region_consistency",
                 "region_performance",
                 "product_performance",
+                "growth_stats",
+                "rolling_stats",
+                "momentum_stats",
+                "distribution_stats",
             }
             if stats_type in complex_types:
                 analytical = True
@@ -198,8 +203,12 @@ def run_query(question: str) -> str:
         # Step 4 — Summarize history
         summarize_history_if_needed()
 
-        # Step 5 — Build prompt
-        prompt = build_unified_prompt(question, stats, analytical_mode=analytical)
+        # Step 5 — Build prompt (forecasts narrate the precomputed numbers)
+        if isinstance(stats, dict) and stats.get("type") == "forecast_context":
+            summary_text, history_text = conversation_context()
+            prompt = build_forecast_prompt(question, stats, summary_text, history_text)
+        else:
+            prompt = build_unified_prompt(question, stats, analytical_mode=analytical)
 
         # Step 6 — Call Groq LLM
         client = get_groq_client()
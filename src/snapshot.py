@@ -0,0 +1,327 @@
+"""
+Columnar on-disk snapshots of the parsed sales frame and its knowledge base.
+
+A snapshot is a directory of one ``.npy`` file per column plus a small JSON
+layout file per table. Numeric and datetime columns are reopened with
+``np.load(mmap_mode="r")`` so warm loads skip CSV parsing and aggregation
+entirely and only page in the columns that are actually touched.
+String columns are stored as integer codes plus a category list.
+
+Snapshots are keyed by the source file's size, modification time and
+content hash (see ``source_fingerprint``).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_FORMAT = 2
+# Superseded snapshots are only removed once they are this old (seconds),
+# so readers that opened one just before a manifest swap can still map it
+STALE_SNAPSHOT_AGE = 3600
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+# ---------------------------------------------------------
+# Source fingerprinting
+# ---------------------------------------------------------
+def content_hash(path):
+    """SHA-256 of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path, with_hash=True):
+    """Return the size / mtime / content-hash key for a source file."""
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = content_hash(path)
+    return fingerprint
+
+
+def _source_key(path):
+    """Stable directory name for a source path inside the cache dir."""
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+def _is_fresh(recorded, path):
+    """
+    Check a recorded fingerprint against the current source file.
+    Size and mtime are checked first; the content hash is only recomputed
+    when the size matches but the mtime moved (e.g. a touch or re-copy).
+    """
+    current = source_fingerprint(path, with_hash=False)
+    if current["size"] != recorded.get("size"):
+        return False
+    if current["mtime_ns"] == recorded.get("mtime_ns"):
+        return True
+    return content_hash(path) == recorded.get("sha256")
+
+
+# ---------------------------------------------------------
+# Frame <-> column files
+# ---------------------------------------------------------
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _axis_layout(index: pd.Index):
+    """dtype (and categories) of one index level or of the column axis."""
+    entry = {"dtype": str(index.dtype)}
+    if isinstance(index.dtype, pd.CategoricalDtype):
+        entry["categories"] = [_json_value(c) for c in index.dtype.categories]
+        entry["ordered"] = bool(index.dtype.ordered)
+    return entry
+
+
+def _axis_dtype(entry):
+    if "categories" in entry:
+        return pd.CategoricalDtype(entry["categories"], ordered=entry["ordered"])
+    return entry["dtype"]
+
+
+def _write_frame(frame: pd.DataFrame, table_dir):
+    """Write a DataFrame as one .npy file per column plus a layout file."""
+    os.makedirs(table_dir, exist_ok=True)
+
+    layout = {
+        "index": None,
+        "index_levels": None,
+        "columns_name": _json_value(frame.columns.name),
+        "columns_axis": _axis_layout(frame.columns),
+        "columns": [],
+    }
+
+    if not isinstance(frame.index, pd.RangeIndex):
+        index = frame.index
+        levels = [index.get_level_values(i) for i in range(index.nlevels)]
+        layout["index"] = list(index.names)
+        layout["index_levels"] = [_axis_layout(level) for level in levels]
+        # reset_index would coerce a categorical column axis to object
+        frame = frame.set_axis(pd.Index(list(frame.columns), dtype=object), axis=1).reset_index()
+
+    for i, name in enumerate(frame.columns):
+        col = frame[name]
+        entry = {"name": _json_value(name), "file": f"col_{i}.npy", "dtype": str(col.dtype)}
+
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            entry["kind"] = "category"
+            entry["categories"] = [_json_value(c) for c in col.cat.categories]
+            entry["ordered"] = bool(col.cat.ordered)
+            codes = col.cat.codes.to_numpy()
+        elif col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            entry["kind"] = "strings"
+            codes, uniques = pd.factorize(col, use_na_sentinel=True)
+            entry["categories"] = [_json_value(c) for c in uniques]
+            codes = codes.astype(np.int32)
+        else:
+            entry["kind"] = "array"
+            codes = col.to_numpy()
+
+        np.save(os.path.join(table_dir, entry["file"]), codes, allow_pickle=False)
+        layout["columns"].append(entry)
+
+    with open(os.path.join(table_dir, "layout.json"), "w", encoding="utf-8") as fh:
+        json.dump(layout, fh)
+
+
+def _read_frame(table_dir, mmap=True):
+    """Rebuild a DataFrame written by ``_write_frame``."""
+    with open(os.path.join(table_dir, "layout.json"), encoding="utf-8") as fh:
+        layout = json.load(fh)
+
+    mmap_mode = "r" if mmap else None
+    data = {}
+    for entry in layout["columns"]:
+        # asarray drops the np.memmap subclass but keeps the mapped buffer
+        values = np.asarray(np.load(os.path.join(table_dir, entry["file"]), mmap_mode=mmap_mode))
+
+        if entry["kind"] == "category":
+            data[entry["name"]] = pd.Categorical.from_codes(
+                values, categories=entry["categories"], ordered=entry["ordered"]
+            )
+        elif entry["kind"] == "strings":
+            labels = np.asarray(entry["categories"] + [None], dtype=object)
+            data[entry["name"]] = pd.Series(labels[values]).astype(entry["dtype"])
+        else:
+            data[entry["name"]] = values
+
+    # copy=False keeps numeric columns backed by the memory map
+    frame = pd.DataFrame(data, columns=[e["name"] for e in layout["columns"]], copy=False)
+
+    if layout["index"]:
+        frame = frame.set_index(layout["index"])
+        levels = [
+            frame.index.get_level_values(i).astype(_axis_dtype(entry))
+            for i, entry in enumerate(layout["index_levels"])
+        ]
+        if len(levels) == 1:
+            frame.index = levels[0]
+        else:
+            frame.index = pd.MultiIndex.from_arrays(levels, names=layout["index"])
+
+    frame.columns = pd.Index(
+        list(frame.columns), dtype=_axis_dtype(layout["columns_axis"]), name=layout["columns_name"]
+    )
+    return frame
+
+
+# ---------------------------------------------------------
+# Public API
+# ---------------------------------------------------------
+def open_snapshot(cache_dir, source_path, tag=None):
+    """
+    Return the directory of a fresh snapshot of ``source_path``, or None if
+    no snapshot exists, the source has changed, or the snapshot was written
+    with a different ``tag`` (e.g. an older schema version).
+    """
+    source_dir = os.path.join(cache_dir, _source_key(source_path))
+    manifest_path = os.path.join(source_dir, MANIFEST_NAME)
+
+    try:
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("tag") != tag:
+        return None
+    if not _is_fresh(manifest["fingerprint"], source_path):
+        return None
+
+    snapshot_dir = os.path.join(source_dir, manifest["snapshot"])
+    return snapshot_dir if os.path.isdir(snapshot_dir) else None
+
+
+def read_frame(snapshot_dir, mmap=True):
+    """The snapshotted sales frame."""
+    return _read_frame(os.path.join(snapshot_dir, "df"), mmap=mmap)
+
+
+def table_names(snapshot_dir):
+    kb_dir = os.path.join(snapshot_dir, "kb")
+    if not os.path.isdir(kb_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(kb_dir)
+        if os.path.isfile(os.path.join(kb_dir, name, "layout.json"))
+    )
+
+
+def read_table(snapshot_dir, name, mmap=True):
+    """One snapshotted KB table, or None if it has not been written yet."""
+    table_dir = os.path.join(snapshot_dir, "kb", name)
+    if not os.path.isfile(os.path.join(table_dir, "layout.json")):
+        return None
+    try:
+        return _read_frame(table_dir, mmap=mmap)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_table(snapshot_dir, name, table: pd.DataFrame):
+    """
+    Add a KB table to an existing snapshot. The table is written to a
+    temporary directory and renamed into place, so readers never see a
+    partial table; if another process got there first its copy is kept.
+    """
+    kb_dir = os.path.join(snapshot_dir, "kb")
+    os.makedirs(kb_dir, exist_ok=True)
+
+    tmp_dir = os.path.join(kb_dir, f".{name}.{uuid.uuid4().hex[:8]}")
+    _write_frame(table, tmp_dir)
+    try:
+        os.rename(tmp_dir, os.path.join(kb_dir, name))
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_snapshot(cache_dir, source_path, mmap=True, tag=None):
+    """
+    Return (df, kb) with every stored KB table from a fresh snapshot of
+    ``source_path``, or None (see ``open_snapshot``).
+    """
+    snapshot_dir = open_snapshot(cache_dir, source_path, tag=tag)
+    if snapshot_dir is None:
+        return None
+
+    try:
+        df = read_frame(snapshot_dir, mmap=mmap)
+        kb = {name: read_table(snapshot_dir, name, mmap=mmap) for name in table_names(snapshot_dir)}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return df, kb
+
+
+def save_snapshot(cache_dir, source_path, df: pd.DataFrame, kb: dict, fingerprint=None, tag=None):
+    """
+    Persist ``df`` and every ``kb`` table for ``source_path``; more tables
+    can be added later with ``write_table``.
+    Pass the ``fingerprint`` taken before the source was read so a file
+    that changes mid-load is never recorded as fresh.
+    The manifest is swapped atomically, so concurrent readers always see
+    either the previous snapshot or the complete new one. The previous
+    snapshot is kept; older ones are removed by age (``STALE_SNAPSHOT_AGE``).
+    """
+    if fingerprint is None:
+        fingerprint = source_fingerprint(source_path)
+    source_dir = os.path.join(cache_dir, _source_key(source_path))
+    snapshot_name = f"{fingerprint['sha256'][:16]}-{uuid.uuid4().hex[:8]}"
+    snapshot_dir = os.path.join(source_dir, snapshot_name)
+
+    _write_frame(df, os.path.join(snapshot_dir, "df"))
+    for name, table in kb.items():
+        _write_frame(table, os.path.join(snapshot_dir, "kb", name))
+    os.makedirs(os.path.join(snapshot_dir, "kb"), exist_ok=True)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "tag": tag,
+        "source": os.path.abspath(source_path),
+        "fingerprint": fingerprint,
+        "snapshot": snapshot_name,
+    }
+    manifest_path = os.path.join(source_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding="utf-8") as fh:
+            previous = json.load(fh).get("snapshot")
+    except (OSError, ValueError):
+        previous = None
+
+    tmp_path = os.path.join(source_dir, f".{MANIFEST_NAME}.{uuid.uuid4().hex[:8]}")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    _remove_stale_snapshots(source_dir, keep={snapshot_name, previous})
+    return snapshot_dir
+
+
+def _remove_stale_snapshots(source_dir, keep):
+    """
+    Best effort: delete superseded snapshot directories that are older than
+    ``STALE_SNAPSHOT_AGE``. A process may have opened (but not yet mapped)
+    a recent one, and already-mapped files stay valid after unlinking.
+    """
+    cutoff = time.time() - STALE_SNAPSHOT_AGE
+    for entry in os.listdir(source_dir):
+        path = os.path.join(source_dir, entry)
+        if entry in keep or not os.path.isdir(path):
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            continue
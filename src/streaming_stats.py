@@ -0,0 +1,217 @@
+"""
+Mergeable streaming statistics per dimension label.
+
+Two accumulators, both small and combinable across chunks or partitions:
+
+* ``Moments``: count / mean / M2 per label. A chunk's moments come from
+  one stable two-pass reduction, and two sets merge with Chan's parallel
+  update (Welford generalised to batches), so the variance never needs
+  the raw rows again and does not suffer from sum-of-squares cancellation.
+* ``TDigest``: a merging t-digest (k1 scale function) for quantiles.
+  Points and centroids are folded with one sort and a vectorized
+  bucketing pass; tails keep small centroids, so p1 / p99 stay accurate.
+
+``StreamingStats`` keeps both for every label of each dimension in
+STAT_DIMENSIONS (Sales values) and is updated as rows are ingested.
+"""
+
+import numpy as np
+import pandas as pd
+
+STAT_DIMENSIONS = ["Region", "Product"]
+
+DEFAULT_COMPRESSION = 200
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+# ---------------------------------------------------------
+# Moments (Welford / Chan)
+# ---------------------------------------------------------
+class Moments:
+    """Per-label count, mean and M2 (sum of squared deviations from the mean)."""
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else pd.DataFrame(
+            {"count": [], "mean": [], "m2": []}, dtype=np.float64
+        )
+
+    @classmethod
+    def from_values(cls, codes, uniques, values):
+        """Moments of ``values`` grouped by integer ``codes`` into ``uniques``."""
+        count = np.bincount(codes, minlength=len(uniques)).astype(np.float64)
+        mean = np.bincount(codes, weights=values, minlength=len(uniques)) / np.maximum(count, 1)
+        m2 = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=len(uniques))
+        index = pd.Index(np.asarray(uniques, dtype=object))
+        return cls(pd.DataFrame({"count": count, "mean": mean, "m2": m2}, index=index))
+
+    def merge(self, other):
+        """Chan et al. pairwise combination, label by label."""
+        if other.table.empty:
+            return self
+        if self.table.empty:
+            self.table = other.table.copy()
+            return self
+
+        index = self.table.index.union(other.table.index, sort=False)
+        a = self.table.reindex(index, fill_value=0.0)
+        b = other.table.reindex(index, fill_value=0.0)
+
+        count = a["count"] + b["count"]
+        delta = b["mean"] - a["mean"]
+        safe = count.where(count > 0, 1.0)
+        self.table = pd.DataFrame({
+            "count": count,
+            "mean": a["mean"] + delta * b["count"] / safe,
+            "m2": a["m2"] + b["m2"] + delta ** 2 * a["count"] * b["count"] / safe,
+        }, index=index)
+        return self
+
+    def variance(self, ddof=1):
+        count = self.table["count"]
+        return (self.table["m2"] / (count - ddof)).where(count > ddof)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
+
+
+# ---------------------------------------------------------
+# Quantile sketch (merging t-digest)
+# ---------------------------------------------------------
+class TDigest:
+    """
+    Merging t-digest over float values. ``update`` folds a batch, ``merge``
+    another digest; ``quantile`` interpolates between centroid centers.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def __len__(self):
+        return len(self.means)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._fold(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other):
+        if len(other):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._fold(other.means, other.weights)
+        return self
+
+    def _fold(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # Bucket by the k1 scale of each centroid's centre quantile: one
+        # bucket per unit of k, so centroids shrink towards both tails
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(k).astype(np.int64)
+
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Value at quantile ``q`` (scalar or array in [0, 1]); NaN when empty."""
+        q = np.asarray(q, dtype=np.float64)
+        if not len(self):
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, total]
+        values = np.r_[self.min, self.means, self.max]
+        result = np.interp(np.clip(q, 0, 1) * total, positions, values)
+        return result if q.ndim else float(result)
+
+
+# ---------------------------------------------------------
+# Per-dimension accumulators
+# ---------------------------------------------------------
+class StreamingStats:
+    """
+    Moments and a t-digest of Sales for every label of each dimension.
+    Fold chunks in with ``update``; combine instances with ``merge``.
+    """
+
+    def __init__(self, dimensions=None, compression=DEFAULT_COMPRESSION):
+        self.dimensions = list(dimensions or STAT_DIMENSIONS)
+        self.compression = compression
+        self.moments = {dim: Moments() for dim in self.dimensions}
+        self.digests = {dim: {} for dim in self.dimensions}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs):
+        return cls(**kwargs).update(df)
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold one prepared chunk of rows."""
+        if chunk.empty:
+            return self
+        values = chunk["Sales"].to_numpy(dtype=np.float64)
+
+        for dim in self.dimensions:
+            codes, uniques = pd.factorize(chunk[dim].to_numpy(dtype=object))
+            valid = codes >= 0
+            codes, dim_values = codes[valid], values[valid]
+
+            self.moments[dim].merge(Moments.from_values(codes, uniques, dim_values))
+
+            # One sort splits the chunk into per-label runs
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            sorted_values = dim_values[order]
+            digests = self.digests[dim]
+            for i, label in enumerate(uniques):
+                digest = digests.get(label)
+                if digest is None:
+                    digest = digests[label] = TDigest(self.compression)
+                digest.update(sorted_values[bounds[i]:bounds[i + 1]])
+        return self
+
+    def merge(self, other: "StreamingStats"):
+        """Fold another StreamingStats (e.g. from a different partition) into this one."""
+        for dim in self.dimensions:
+            self.moments[dim].merge(other.moments[dim])
+            digests = self.digests[dim]
+            for label, digest in other.digests[dim].items():
+                if label not in digests:
+                    digests[label] = TDigest(self.compression)
+                digests[label].merge(digest)
+        return self
+
+    # ---------------------------------------------------------
+    # Answers
+    # ---------------------------------------------------------
+    def std(self, dim, ddof=1):
+        """{label: standard deviation of Sales} (labels with too few rows omitted)."""
+        std = self.moments[dim].std(ddof).dropna()
+        return {label: float(value) for label, value in std.items()}
+
+    def percentiles(self, dim, qs=DEFAULT_PERCENTILES):
+        """{label: {"p50": value, ...}} from the t-digests."""
+        names = [f"p{round(q * 100):g}" for q in qs]
+        return {
+            label: dict(zip(names, (float(v) for v in digest.quantile(np.asarray(qs)))))
+            for label, digest in self.digests[dim].items()
+        }
@@ -0,0 +1,107 @@
+"""
+Backend parity: every non-pandas query backend (backends.py) must return
+the same stats dicts as the pandas backend for the retriever API on the
+bundled dataset (cube disabled so every query reaches the backend).
+
+    python test_backend_parity.py     # exit status 1 on any mismatch
+    python -m pytest test_backend_parity.py
+
+Floats are compared with a relative tolerance of 1e-9, since SQL engines
+sum in a different order. Backends whose package is missing are skipped.
+"""
+
+import math
+import sys
+
+import numpy as np
+
+from backends import BACKENDS, make_backend
+from load_data import load_data_and_kb
+from retriever import InsightRetriever
+
+
+def available_backends():
+    names = []
+    for name in BACKENDS:
+        try:
+            make_backend(name, rows=lambda *_: None, df=None)
+        except ImportError:
+            print(f"[skip] {name}: not installed")
+            continue
+        names.append(name)
+    return names
+
+
+def _same(a, b, path="result"):
+    if isinstance(a, dict) and isinstance(b, dict):
+        if list(a) != list(b):
+            return [f"{path}: keys {list(a)} != {list(b)}"]
+        return [d for key in a for d in _same(a[key], b[key], f"{path}[{key!r}]")]
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return [f"{path}: length {len(a)} != {len(b)}"]
+        return [d for i, (x, y) in enumerate(zip(a, b)) for d in _same(x, y, f"{path}[{i}]")]
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)):
+        if math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-9):
+            return []
+        return [f"{path}: {a} != {b}"]
+    return [] if a == b else [f"{path}: {a!r} != {b!r}"]
+
+
+def parity_calls(df):
+    calls = []
+    for product in df["Product"].unique():
+        calls.append(("get_product_stats", (product,)))
+        calls.append(("get_product_stats", (product, "2022-02-10", "2022-11-20")))
+    for region in df["Region"].unique():
+        calls.append(("get_region_stats", (region,)))
+        calls.append(("get_region_stats", (region, "2023-01-01", "2023-06-15")))
+    for month in sorted(df["Month"].astype(str).unique())[:6]:
+        calls.append(("get_monthly_stats", (month,)))
+    for age in sorted(df["Customer_Age"].unique())[:5]:
+        calls.append(("get_age_stats", (age,)))
+    for gender in df["Customer_Gender"].unique():
+        calls.append(("get_gender_stats", (gender, "2022-05-03", "2023-02-17")))
+    calls += [
+        ("get_period_stats", ("2022-04-12", "2022-10-01")),
+        ("get_period_stats", ("2022-04-12", "2022-10-01", "Widget A", "West")),
+        ("get_region_performance", ("2022-07-19", "2023-03-02")),
+        ("get_product_performance", ()),
+        ("get_age_sales_summary", ()),
+    ]
+    return calls
+
+
+def check_parity():
+    df, kb = load_data_and_kb(lazy=False)
+    retrievers = {}
+    for name in available_backends():
+        retriever = InsightRetriever(df.copy(), kb, backend=name)
+        retriever.cube = None  # force every query onto the backend
+        retrievers[name] = retriever
+
+    reference = retrievers.pop("pandas")
+    calls = parity_calls(df)
+    failures = 0
+    for name, retriever in retrievers.items():
+        for method, args in calls:
+            expected = getattr(reference, method)(*args)
+            actual = getattr(retriever, method)(*args)
+            diffs = _same(expected, actual)
+            if diffs:
+                failures += 1
+                print(f"[{name}] {method}{args}:")
+                for diff in diffs[:5]:
+                    print("   ", diff)
+        print(f"[{name}] {len(calls)} calls checked against pandas")
+
+    print("Parity OK" if not failures else f"Parity FAILED for {failures} calls")
+    return failures == 0
+
+
+def test_backend_parity():
+    assert check_parity()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_parity() else 1)
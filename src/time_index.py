@@ -0,0 +1,197 @@
+"""
+Date-range filtering for the sales rows.
+
+``TimeIndex`` keeps a Date-sorted permutation of the rows, so a date range
+is two ``searchsorted`` calls plus a take of the k matching rows
+(O(log n + k)) instead of a boolean mask over the whole frame.
+
+``resolve_period`` turns phrases such as "Q3", "Q3 2024", "this year",
+"last quarter", "last 90 days", "2025" or "from 2024-01 to 2024-06" into
+a half-open [start, end) timestamp range. Relative phrases are resolved
+against the latest date in the data, not the wall clock.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Half-open [start, end) range plus a readable label
+Period = namedtuple("Period", ["start", "end", "label"])
+
+_DATE = r"\d{4}-\d{2}(?:-\d{2})?"
+RANGE_PATTERN = re.compile(
+    rf"(?:from|between)\s+({_DATE})\s+(?:to|and|until|through)\s+({_DATE})"
+)
+QUARTER_PATTERN = re.compile(
+    r"\bq([1-4])(?:\s*(?:of\s+)?((?:19|20)\d{2}))?\b|\b((?:19|20)\d{2})\s*-?\s*q([1-4])\b"
+)
+ORDINAL_QUARTER_PATTERN = re.compile(
+    r"\b(first|second|third|fourth|1st|2nd|3rd|4th)\s+quarter(?:\s+(?:of\s+)?((?:19|20)\d{2}))?"
+)
+RELATIVE_PATTERN = re.compile(
+    r"\b(this|current|last|previous|past)\s+(year|quarter|month)\b|\b(year to date|ytd)\b"
+)
+WINDOW_PATTERN = re.compile(r"\b(?:last|past|previous)\s+(\d+)\s+(day|week|month|year)s?\b")
+YEAR_PATTERN = re.compile(r"(?<![\d-])((?:19|20)\d{2})(?![\d-])")
+
+ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "1st": 1, "2nd": 2, "3rd": 3, "4th": 4}
+
+
+class TimeIndex:
+    """Date-sorted row positions for O(log n + k) range slicing."""
+
+    def __init__(self, dates):
+        values = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+        # NaT sorts last, so it never falls inside a finite range
+        self.order = np.argsort(values, kind="stable")
+        self.dates = values[self.order]
+        self.valid = int((~np.isnat(self.dates)).sum())
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def min_date(self):
+        return pd.Timestamp(self.dates[0]) if self.valid else None
+
+    @property
+    def max_date(self):
+        return pd.Timestamp(self.dates[self.valid - 1]) if self.valid else None
+
+    def bounds(self, start=None, end=None):
+        """(lo, hi) offsets into the sorted dates for [start, end)."""
+        dates = self.dates[: self.valid]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start), "ns"), "left"))
+        hi = self.valid if end is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end), "ns"), "left"))
+        return lo, max(lo, hi)
+
+    def positions(self, start=None, end=None):
+        """Row positions (in date order) with start <= Date < end."""
+        lo, hi = self.bounds(start, end)
+        return self.order[lo:hi]
+
+    def count(self, start=None, end=None):
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def rows(self, df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+        """The rows of ``df`` (the frame this index was built on) in [start, end)."""
+        return df.take(self.positions(start, end))
+
+
+# ---------------------------------------------------------
+# Period resolution
+# ---------------------------------------------------------
+def _quarter(year, quarter):
+    start = pd.Timestamp(year=year, month=3 * (quarter - 1) + 1, day=1)
+    return Period(start, start + pd.DateOffset(months=3), f"Q{quarter} {year}")
+
+
+def _inclusive_end(text):
+    """Exclusive end for an inclusive "YYYY-MM" or "YYYY-MM-DD" bound."""
+    stamp = pd.Timestamp(text)
+    if len(text) == 7:
+        return stamp + pd.DateOffset(months=1)
+    return stamp + pd.Timedelta(days=1)
+
+
+def mentions_period(text):
+    """Cheap check: does the (lower-cased) text contain a period phrase?"""
+    return any(
+        pattern.search(text)
+        for pattern in (RANGE_PATTERN, QUARTER_PATTERN, ORDINAL_QUARTER_PATTERN,
+                        RELATIVE_PATTERN, WINDOW_PATTERN, YEAR_PATTERN)
+    )
+
+
+def resolve_period(text, reference):
+    """
+    Resolve the first period phrase in ``text`` (lower-cased) to a Period,
+    or None. ``reference`` is the latest date in the data; relative phrases
+    ("this year", "last 30 days") and quarters without a year use it.
+    A range whose end precedes its start resolves to an empty Period
+    (start == end).
+    """
+    reference = pd.Timestamp(reference).normalize()
+
+    match = RANGE_PATTERN.search(text)
+    if match:
+        start, end = pd.Timestamp(match.group(1)), _inclusive_end(match.group(2))
+        # A reversed range is empty, not "no period": returning None would
+        # let the year digits be routed as something else (e.g. age 25)
+        return Period(start, max(start, end), f"{match.group(1)} to {match.group(2)}")
+
+    match = QUARTER_PATTERN.search(text)
+    if match:
+        if match.group(1):
+            quarter, year = int(match.group(1)), match.group(2)
+        else:
+            quarter, year = int(match.group(4)), match.group(3)
+        return _quarter_of(quarter, year, reference)
+
+    match = ORDINAL_QUARTER_PATTERN.search(text)
+    if match:
+        return _quarter_of(ORDINALS[match.group(1)], match.group(2), reference)
+
+    match = WINDOW_PATTERN.search(text)
+    if match:
+        n, unit = int(match.group(1)), match.group(2)
+        end = reference + pd.Timedelta(days=1)
+        if unit == "day":
+            start = end - pd.Timedelta(days=n)
+        elif unit == "week":
+            start = end - pd.Timedelta(weeks=n)
+        elif unit == "month":
+            start = end - pd.DateOffset(months=n)
+        else:
+            start = end - pd.DateOffset(years=n)
+        return Period(start, end, f"last {n} {unit}{'s' if n != 1 else ''}")
+
+    match = RELATIVE_PATTERN.search(text)
+    if match:
+        if match.group(3):
+            which, unit = "this", "year"
+        else:
+            which = "this" if match.group(1) in ("this", "current") else "last"
+            unit = match.group(2)
+        return _relative(which, unit, reference)
+
+    match = YEAR_PATTERN.search(text)
+    if match:
+        year = int(match.group(1))
+        return Period(pd.Timestamp(year=year, month=1, day=1),
+                      pd.Timestamp(year=year + 1, month=1, day=1), str(year))
+
+    return None
+
+
+def _quarter_of(quarter, year, reference):
+    if year is not None:
+        return _quarter(int(year), quarter)
+    # Most recent such quarter that has started by the reference date
+    period = _quarter(reference.year, quarter)
+    if period.start > reference:
+        period = _quarter(reference.year - 1, quarter)
+    return period
+
+
+def _relative(which, unit, reference):
+    if unit == "year":
+        year = reference.year if which == "this" else reference.year - 1
+        return Period(pd.Timestamp(year=year, month=1, day=1),
+                      pd.Timestamp(year=year + 1, month=1, day=1),
+                      f"{which} year ({year})")
+
+    if unit == "quarter":
+        period = _quarter(reference.year, (reference.month - 1) // 3 + 1)
+        if which == "last":
+            start = period.start - pd.DateOffset(months=3)
+            period = _quarter(start.year, (start.month - 1) // 3 + 1)
+        return Period(period.start, period.end, f"{which} quarter ({period.label})")
+
+    start = reference.replace(day=1)
+    if which == "last":
+        start = start - pd.DateOffset(months=1)
+    return Period(start, start + pd.DateOffset(months=1), f"{which} month ({start:%Y-%m})")
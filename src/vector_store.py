@@ -1,23 +1,234 @@
+import json
+import os
+import uuid
+
 import numpy as np
 
+from ann_index import top_k
+
+INITIAL_CAPACITY = 1024
+GROWTH_FACTOR = 2
+
+MANIFEST_NAME = "manifest.json"
+INDEX_FORMAT = 1
+
+
+def embedding_model_id(embed_fn, model_id=None):
+    """
+    ``model_id`` if given, else ``embed_fn.model_id``, else None. There is
+    no fallback derived from the function: two instances of one model class
+    share an import path, so only an explicit id can key a saved index.
+    """
+    model_id = model_id or getattr(embed_fn, "model_id", None)
+    return str(model_id) if model_id else None
+
+
+def embedding_dim(embed_fn, dim=None):
+    """``dim`` if given, else ``embed_fn.dim`` / ``embed_fn.embedding_dim``, else None."""
+    dim = dim or getattr(embed_fn, "dim", None) or getattr(embed_fn, "embedding_dim", None)
+    return int(dim) if dim else None
+
+
+def normalize_rows(vectors):
+    """float32 copy of ``vectors`` with unit L2 norm per row (zero rows stay zero)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
 class SimpleVectorStore:
-    def __init__(self, embed_fn):
+    """
+    Texts and their embeddings in one contiguous float32 matrix.
+
+    Rows are L2-normalized once when added, so cosine similarity against a
+    query is a single matrix-vector product, and the top k come from
+    ``np.argpartition`` (only those k are sorted). The matrix grows by
+    doubling its capacity, so appends are amortized O(1) per row.
+
+    ``save`` / ``load`` persist the index: the matrix as a raw float32 file
+    reopened with ``np.memmap``, texts and metadata in a JSON side file,
+    and a manifest recording the embedding model id and dimension. Both
+    require an explicit model id (``model_id=`` or ``embed_fn.model_id``).
+
+    ``index`` (e.g. ann_index.IVFIndex) replaces the exact scan with an
+    approximate search for large collections; None scans every row.
+    """
+
+    def __init__(self, embed_fn, model_id=None, index=None):
         self.embed_fn = embed_fn
-        self.vectors = []
+        self.model_id = embedding_model_id(embed_fn, model_id)
+        self.index = index
         self.texts = []
+        self.metadatas = []
+        self._matrix = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
 
-    def add_texts(self, texts):
-        embeddings = self.embed_fn(texts)
-        self.vectors.extend(embeddings)
+    @property
+    def vectors(self):
+        """Normalized embeddings, one row per text (a view, not a copy)."""
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[: self._size]
+
+    @property
+    def dim(self):
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def _reserve(self, extra, dim):
+        if self._matrix is None:
+            capacity = max(INITIAL_CAPACITY, extra)
+            self._matrix = np.empty((capacity, dim), dtype=np.float32)
+            return
+        if dim != self._matrix.shape[1]:
+            raise ValueError(f"Embedding dimension {dim} does not match the store ({self._matrix.shape[1]}).")
+
+        needed = self._size + extra
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= GROWTH_FACTOR
+        grown = np.empty((capacity, dim), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    def add_texts(self, texts, metadatas=None):
+        texts = list(texts)
+        if not texts:
+            return
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        if len(metadatas) != len(texts):
+            raise ValueError("metadatas must have one entry per text.")
+
+        embeddings = normalize_rows(self.embed_fn(texts))
+        if len(embeddings) != len(texts):
+            raise ValueError("embed_fn must return one vector per text.")
+
+        self._reserve(len(texts), embeddings.shape[1])
+        self._matrix[self._size: self._size + len(texts)] = embeddings
+        self._size += len(texts)
         self.texts.extend(texts)
+        self.metadatas.extend(metadatas)
+
+    def similarity_search_with_scores(self, query, k=5, nprobe=None):
+        """
+        [(text, cosine similarity)] for the ``k`` closest texts, best first.
+        ``nprobe`` overrides the IVF index's cells-per-query for this search
+        (ignored by exact search and indexes without cells).
+        """
+        if self._size == 0 or k <= 0:
+            return []
+
+        q_vec = normalize_rows(self.embed_fn([query]))[0]
+        if len(q_vec) != self.dim:
+            raise ValueError(f"Query embedding dimension {len(q_vec)} does not match the store ({self.dim}).")
+        if self.index is None:
+            scores = self.vectors @ q_vec
+            top = top_k(scores, k)
+            scores = scores[top]
+        else:
+            top, scores = self.index.search(self.vectors, q_vec, k, nprobe=nprobe)
+        return [(self.texts[i], float(score)) for i, score in zip(top, scores)]
+
+    def similarity_search(self, query, k=5, nprobe=None):
+        return [text for text, _ in self.similarity_search_with_scores(query, k, nprobe=nprobe)]
+
+    # ---------------------------------------------------------
+    # Persistence (memory-mapped matrix + manifest)
+    # ---------------------------------------------------------
+    def save(self, index_dir):
+        """
+        Write the index under ``index_dir``. Data files get unique names and
+        the manifest is swapped in last, so a reader sees either the old or
+        the complete new index. Raises ValueError without a model id.
+        """
+        if not self.model_id:
+            raise ValueError("Saving a vector index requires an explicit model_id.")
+        os.makedirs(index_dir, exist_ok=True)
+        token = uuid.uuid4().hex[:8]
+        vectors_file = f"vectors-{token}.f32"
+        texts_file = f"texts-{token}.json"
+
+        np.ascontiguousarray(self.vectors, dtype=np.float32).tofile(os.path.join(index_dir, vectors_file))
+        with open(os.path.join(index_dir, texts_file), "w", encoding="utf-8") as fh:
+            json.dump({"texts": self.texts, "metadatas": self.metadatas}, fh)
+
+        manifest = {
+            "format": INDEX_FORMAT,
+            "model_id": self.model_id,
+            "dim": self.dim,
+            "count": self._size,
+            "dtype": "float32",
+            "vectors": vectors_file,
+            "texts": texts_file,
+        }
+        tmp_path = os.path.join(index_dir, f".{MANIFEST_NAME}.{token}")
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp_path, os.path.join(index_dir, MANIFEST_NAME))
+
+        # Best effort: older files may still be mapped by another process
+        for entry in os.listdir(index_dir):
+            if entry.startswith(("vectors-", "texts-")) and token not in entry:
+                try:
+                    os.remove(os.path.join(index_dir, entry))
+                except OSError:
+                    pass
+        return index_dir
+
+    @staticmethod
+    def read_manifest(index_dir):
+        """The saved index manifest, or None if there is no readable index."""
+        try:
+            with open(os.path.join(index_dir, MANIFEST_NAME), encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("format") == INDEX_FORMAT else None
+
+    @classmethod
+    def load(cls, index_dir, embed_fn, model_id=None, index=None, dim=None):
+        """
+        Reopen a saved index without calling ``embed_fn``. Raises ValueError
+        if there is no index, no explicit model id, or the index was built
+        with a different model id or embedding dimension (``dim`` or
+        ``embed_fn.dim`` when known; otherwise checked at the first query).
+        """
+        manifest = cls.read_manifest(index_dir)
+        if manifest is None:
+            raise ValueError(f"No vector index under {index_dir}.")
 
-    def similarity_search(self, query, k=5):
-        q_vec = self.embed_fn([query])[0]
-        sims = []
+        store = cls(embed_fn, model_id=model_id, index=index)
+        if not store.model_id:
+            raise ValueError("Reusing a saved vector index requires an explicit model_id.")
+        if manifest["model_id"] != store.model_id:
+            raise ValueError(
+                f"Index at {index_dir} was built with '{manifest['model_id']}', not '{store.model_id}'."
+            )
+        dim = embedding_dim(embed_fn, dim)
+        if dim and manifest["count"] and manifest["dim"] != dim:
+            raise ValueError(f"Index at {index_dir} has dimension {manifest['dim']}, not {dim}.")
 
-        for vec, text in zip(self.vectors, self.texts):
-            sim = np.dot(q_vec, vec) / (np.linalg.norm(q_vec) * np.linalg.norm(vec))
-            sims.append((sim, text))
+        with open(os.path.join(index_dir, manifest["texts"]), encoding="utf-8") as fh:
+            side = json.load(fh)
+        if len(side["texts"]) != manifest["count"]:
+            raise ValueError(f"Index at {index_dir} is inconsistent with its manifest.")
 
-        sims.sort(reverse=True, key=lambda x: x[0])
-        return [t for _, t in sims[:k]]
\ No newline at end of file
+        store.texts = side["texts"]
+        store.metadatas = side["metadatas"]
+        store._size = manifest["count"]
+        if store._size:
+            vectors_path = os.path.join(index_dir, manifest["vectors"])
+            if os.path.getsize(vectors_path) != 4 * manifest["count"] * manifest["dim"]:
+                raise ValueError(f"Index at {index_dir} is inconsistent with its manifest.")
+            # Read-only map; the first add_texts copies it into a growable array
+            store._matrix = np.memmap(
+                vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(manifest["count"], manifest["dim"]),
+            )
+        return store
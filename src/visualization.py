@@ -75,7 +75,8 @@ class InsightVisualizer:
             index="Product",
             columns="Region",
             values="Sales",
-            aggfunc="sum"
+            aggfunc="sum",
+            observed=True,
         )
 
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -0,0 +1,180 @@
+"""
+Windowed metrics over monthly sales series.
+
+``WindowEngine`` lays every series (e.g. each Product × Region pair) out on
+one contiguous month axis and keeps cumulative sums of the values and of
+their squares. Any window sum, mean or variance is then a difference of two
+prefix entries (O(1) per series), and a metric for all series and all
+months is one vectorized array expression.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _month_axis(months):
+    """Contiguous "YYYY-MM" axis covering ``months`` plus each label's offset on it."""
+    periods = pd.PeriodIndex(pd.Index(months).astype(str), freq="M")
+    first, last = periods.min(), periods.max()
+    axis = pd.period_range(first, last, freq="M")
+    offsets = (periods - first).map(lambda offset: offset.n)
+    return [str(p) for p in axis], np.asarray(offsets, dtype=np.int64)
+
+
+class WindowEngine:
+    """
+    Prefix-sum engine for a (series × month) matrix of sales.
+
+    ``keys`` holds one tuple of labels per series (row); ``months`` is the
+    contiguous month axis (columns). Months without sales are zero.
+    """
+
+    def __init__(self, values, keys, months, key_names):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.keys = list(keys)
+        self.months = list(months)
+        self.key_names = list(key_names)
+
+        n_series, n_months = self.values.shape
+        self.csum = np.zeros((n_series, n_months + 1))
+        self.csum2 = np.zeros((n_series, n_months + 1))
+        np.cumsum(self.values, axis=1, out=self.csum[:, 1:])
+        np.cumsum(self.values ** 2, axis=1, out=self.csum2[:, 1:])
+
+    @classmethod
+    def from_table(cls, table: pd.DataFrame, keys, month="Month", value="Sales"):
+        """Build from a long (keys..., Month, Sales) table such as ``product_region_month``."""
+        keys = list(keys)
+        if table.empty:
+            return cls(np.zeros((0, 0)), [], [], keys)
+
+        months, month_idx = _month_axis(table[month])
+
+        if keys:
+            codes, uniques = pd.MultiIndex.from_frame(
+                table[keys].astype(object)
+            ).factorize(sort=True)
+            series_keys = list(uniques)
+        else:
+            codes = np.zeros(len(table), dtype=np.int64)
+            series_keys = [()]
+
+        values = np.zeros((len(series_keys), len(months)))
+        np.add.at(values, (codes, month_idx), table[value].to_numpy(dtype=np.float64))
+        return cls(values, series_keys, months, keys)
+
+    def collapse(self, keep):
+        """Engine over coarser series (a subset of the key names), by summing rows."""
+        keep = list(keep)
+        if not keep:
+            return WindowEngine(self.values.sum(axis=0, keepdims=True), [()], self.months, [])
+
+        positions = [self.key_names.index(name) for name in keep]
+        grouped = [tuple(key[i] for i in positions) for key in self.keys]
+        codes, uniques = pd.factorize(pd.Index(grouped, tupleize_cols=False), sort=True)
+
+        values = np.zeros((len(uniques), len(self.months)))
+        np.add.at(values, codes, self.values)
+        return WindowEngine(values, list(uniques), self.months, keep)
+
+    def head(self, n_months):
+        """Engine over the first ``n_months`` months (same series)."""
+        return WindowEngine(self.values[:, :n_months], self.keys, self.months[:n_months], self.key_names)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ---------------------------------------------------------
+    # O(1)-per-series window queries (vectorized over series)
+    # ---------------------------------------------------------
+    def _bounds(self, end, length):
+        end = len(self.months) - 1 if end is None else end
+        if length < 1 or length > end + 1:
+            raise ValueError(f"Window of {length} months does not fit before month index {end}.")
+        return end + 1 - length, end + 1
+
+    def window_sum(self, length, end=None):
+        """Sum over the ``length`` months ending at month index ``end`` (default: last)."""
+        lo, hi = self._bounds(end, length)
+        return self.csum[:, hi] - self.csum[:, lo]
+
+    def window_mean(self, length, end=None):
+        return self.window_sum(length, end) / length
+
+    def window_var(self, length, end=None):
+        """Population variance of the monthly values inside the window."""
+        lo, hi = self._bounds(end, length)
+        mean = (self.csum[:, hi] - self.csum[:, lo]) / length
+        sq = (self.csum2[:, hi] - self.csum2[:, lo]) / length
+        return np.maximum(sq - mean ** 2, 0.0)
+
+    # ---------------------------------------------------------
+    # Full (series × month) metric matrices in one pass
+    # ---------------------------------------------------------
+    def rolling_sum(self, length):
+        """Trailing ``length``-month sums; NaN until a full window is available."""
+        out = np.full(self.values.shape, np.nan)
+        if length <= len(self.months):
+            out[:, length - 1:] = self.csum[:, length:] - self.csum[:, :-length]
+        return out
+
+    def rolling_mean(self, length):
+        return self.rolling_sum(length) / length
+
+    def rolling_std(self, length):
+        out = np.full(self.values.shape, np.nan)
+        if length <= len(self.months):
+            mean = (self.csum[:, length:] - self.csum[:, :-length]) / length
+            sq = (self.csum2[:, length:] - self.csum2[:, :-length]) / length
+            out[:, length - 1:] = np.sqrt(np.maximum(sq - mean ** 2, 0.0))
+        return out
+
+    def growth(self, lag=1, length=1):
+        """
+        Relative change of each ``length``-month window versus the window
+        ``lag`` months earlier (lag=1: MoM, lag=12: YoY). NaN where the
+        earlier window is missing or zero.
+        """
+        current = self.rolling_sum(length)
+        previous = np.full(self.values.shape, np.nan)
+        if lag < len(self.months):
+            previous[:, lag:] = current[:, :-lag]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (current - previous) / previous
+        change[~np.isfinite(change)] = np.nan
+        return change
+
+    def momentum(self, length=3):
+        """Latest ``length``-month sum versus the ``length`` months before it."""
+        if 2 * length > len(self.months):
+            return np.full(len(self.keys), np.nan)
+
+        recent = self.window_sum(length)
+        prior = self.window_sum(length, end=len(self.months) - 1 - length)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (recent - prior) / prior
+        change[~np.isfinite(change)] = np.nan
+        return change
+
+    # ---------------------------------------------------------
+    # Output helpers
+    # ---------------------------------------------------------
+    def label(self, key):
+        return " | ".join(str(part) for part in key) if key else "Total"
+
+    def latest(self, matrix):
+        """{series label: value in the last month} (None for NaN)."""
+        return {
+            self.label(key): (None if np.isnan(value) else float(value))
+            for key, value in zip(self.keys, matrix[:, -1])
+        }
+
+    def series(self, matrix, row=0, last=None):
+        """{month: value} for one series, optionally only the last ``last`` months."""
+        months = self.months[-last:] if last else self.months
+        values = matrix[row, -last:] if last else matrix[row]
+        return {
+            month: (None if np.isnan(value) else float(value))
+            for month, value in zip(months, values)
+        }
@@ -0,0 +1,101 @@
+"""N incremental appends must give the same answers as a rebuild on the concatenated frame."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import SalesAggregates
+from cube import MEASURES
+from load_data import build_kb, concat_frames, load_data_and_kb, prepare_rows
+from retriever import InsightRetriever
+from streaming_stats import StreamingStats
+
+COLUMNS = ["Date", "Product", "Region", "Sales", "Customer_Age", "Customer_Gender", "Customer_Satisfaction"]
+BATCH_SIZE = 97
+
+
+@pytest.fixture(scope="module")
+def frames():
+    df, _ = load_data_and_kb(use_cache=False, lazy=False)
+    cut = len(df) * 3 // 4
+    batches = [df.iloc[i: i + BATCH_SIZE][COLUMNS] for i in range(cut, len(df), BATCH_SIZE)]
+    return df, df.iloc[:cut].copy(), batches
+
+
+@pytest.fixture(scope="module")
+def retrievers(frames):
+    df, head, batches = frames
+    appended = InsightRetriever(head, build_kb(head))
+    for batch in batches:
+        appended.append(batch)
+
+    full = concat_frames([head] + [prepare_rows(batch) for batch in batches])
+    return appended, InsightRetriever(full, build_kb(full))
+
+
+def test_kb_matches_rebuild(retrievers):
+    appended, rebuilt = retrievers
+    for name, table in rebuilt.kb.items():
+        pd.testing.assert_frame_equal(
+            appended.kb[name].reset_index(drop=True),
+            table.reset_index(drop=True),
+            check_dtype=False,
+            check_categorical=False,
+            check_column_type=False,
+            obj=name,
+        )
+
+
+def test_totals_match_rebuild(retrievers):
+    appended, rebuilt = retrievers
+    assert appended.monthly_sales == rebuilt.monthly_sales
+    assert list(appended.monthly_sales) == list(rebuilt.monthly_sales)
+    assert appended.region_totals == rebuilt.region_totals
+    assert appended.product_totals == rebuilt.product_totals
+
+
+def test_cube_matches_rebuild(retrievers):
+    appended, rebuilt = retrievers
+    assert appended.cube.labels == rebuilt.cube.labels
+    assert appended.cube.row_count == rebuilt.cube.row_count
+    for measure in MEASURES:
+        np.testing.assert_allclose(getattr(appended.cube, measure), getattr(rebuilt.cube, measure))
+
+
+def test_stream_stats_match_rebuild(retrievers):
+    appended, rebuilt = retrievers
+    for dim in rebuilt.stream_stats.dimensions:
+        expected = rebuilt.stream_stats.std(dim)
+        assert appended.stream_stats.std(dim) == pytest.approx(expected, rel=1e-9)
+
+        # t-digest centroids depend on the merge order, so check each
+        # estimate by the share of rows at or below it
+        sales = rebuilt.df.groupby(dim, observed=True)["Sales"]
+        for label, quantiles in appended.stream_stats.percentiles(dim).items():
+            values = np.sort(sales.get_group(label).to_numpy())
+            for name, estimate in quantiles.items():
+                rank = np.searchsorted(values, estimate, side="right") / len(values)
+                assert abs(rank - float(name[1:]) / 100) < 0.03, (dim, label, name)
+
+
+def test_aggregates_updates_match_single_pass(frames):
+    df, head, batches = frames
+    folded = SalesAggregates.from_frame(head)
+    for batch in batches:
+        folded.update(prepare_rows(batch))
+
+    single = SalesAggregates.from_frame(df)
+    assert folded.row_count == single.row_count
+    for name, table in single.to_kb().items():
+        pd.testing.assert_frame_equal(folded.to_kb()[name], table, obj=name)
+
+
+def test_stream_stats_chunks_match_single_pass(frames):
+    df, _, _ = frames
+    chunked = StreamingStats()
+    for start in range(0, len(df), BATCH_SIZE):
+        chunked.update(df.iloc[start: start + BATCH_SIZE])
+
+    single = StreamingStats.from_frame(df)
+    for dim in single.dimensions:
+        assert chunked.std(dim) == pytest.approx(single.std(dim), rel=1e-9)
@@ -0,0 +1,22 @@
+"""Appends routed through the registry reach every reader of the shared dataset."""
+
+from dataset_registry import DatasetRegistry
+
+COLUMNS = ["Date", "Product", "Region", "Sales", "Customer_Age", "Customer_Gender", "Customer_Satisfaction"]
+
+
+def test_append_updates_shared_dataset(tmp_path):
+    registry = DatasetRegistry(cache_dir=str(tmp_path))
+    df, kb = registry.get()
+    before = kb["monthly_sales"]["Sales"].sum()
+    generation = registry.version()
+    retriever = registry.retriever()
+
+    batch = df.iloc[:5][COLUMNS]
+    assert registry.append(batch) == generation + 1
+    assert registry.version() == generation + 1
+
+    appended_df, appended_kb = registry.get()
+    assert len(appended_df) == len(df) + 5
+    assert appended_kb["monthly_sales"]["Sales"].sum() == before + batch["Sales"].sum()
+    assert registry.retriever() is retriever
@@ -0,0 +1,27 @@
+"""Partition discovery: month parsing and files that are skipped."""
+
+import pytest
+
+from partitions import PartitionCatalog, partition_month
+
+
+@pytest.mark.parametrize("path, month", [
+    ("data/sales_2022-01.csv", "2022-01"),
+    ("data/202201.parquet", "2022-01"),
+    ("data/Month=2022-01/part-0.csv", "2022-01"),
+    ("data/sales.csv", None),
+])
+def test_partition_month(path, month):
+    assert partition_month(path) == month
+
+
+def test_skipped_files_warn_and_are_reported(tmp_path):
+    (tmp_path / "sales_2022-01.csv").write_text("Date\n")
+    (tmp_path / "notes.csv").write_text("Date\n")
+    (tmp_path / "readme.txt").write_text("not data\n")
+
+    with pytest.warns(UserWarning, match="without a month"):
+        catalog = PartitionCatalog(str(tmp_path))
+
+    assert catalog.months() == ["2022-01"]
+    assert catalog.to_dict()["skipped"] == [str(tmp_path / "notes.csv")]
@@ -0,0 +1,82 @@
+"""ResultCache / cached_result: key normalization and data-version invalidation."""
+
+from load_data import load_data_and_kb
+from result_cache import ResultCache, cached_result
+from retriever import InsightRetriever
+
+
+class Source:
+    """Minimal stand-in for InsightRetriever: a version and a result cache."""
+
+    def __init__(self):
+        self.data_version = 0
+        self.result_cache = ResultCache()
+        self.calls = 0
+
+    @cached_result
+    def get_growth_stats(self, lag: int = 1, region=None):
+        self.calls += 1
+        return {"lag": lag, "region": region, "values": [self.data_version]}
+
+
+def test_equivalent_calls_share_one_key():
+    source = Source()
+    source.get_growth_stats()
+    source.get_growth_stats(1)
+    source.get_growth_stats(lag=1)
+    source.get_growth_stats(1, None)
+    source.get_growth_stats(region=None, lag=1)
+
+    assert source.calls == 1
+    assert len(source.result_cache) == 1
+    assert source.result_cache.stats()["hits"] == 4
+
+
+def test_different_arguments_get_different_keys():
+    source = Source()
+    source.get_growth_stats(1)
+    source.get_growth_stats(2)
+    source.get_growth_stats(1, "East")
+
+    assert source.calls == 3
+    assert len(source.result_cache) == 3
+
+
+def test_version_bump_invalidates():
+    source = Source()
+    assert source.get_growth_stats()["values"] == [0]
+
+    source.data_version += 1
+    assert source.get_growth_stats()["values"] == [1]
+    assert source.calls == 2
+    assert len(source.result_cache) == 1
+    assert source.result_cache.version == 1
+
+
+def test_results_are_copies():
+    source = Source()
+    source.get_growth_stats()["values"].append("edited")
+    assert source.get_growth_stats()["values"] == [0]
+
+
+def test_unhashable_arguments_bypass_the_cache():
+    source = Source()
+    source.get_growth_stats(region=["East"])
+    source.get_growth_stats(region=["East"])
+
+    assert source.calls == 2
+    assert len(source.result_cache) == 0
+
+
+def test_retriever_append_invalidates_cached_results():
+    df, kb = load_data_and_kb(use_cache=False, lazy=False)
+    columns = ["Date", "Product", "Region", "Sales", "Customer_Age", "Customer_Gender", "Customer_Satisfaction"]
+    retriever = InsightRetriever(df.iloc[:2000].copy(), kb)
+
+    before = retriever.get_region_performance()
+    assert retriever.get_region_performance() == before
+
+    version = retriever.data_version
+    retriever.append(df.iloc[2000:][columns])
+    assert retriever.data_version == version + 1
+    assert retriever.get_region_performance() != before
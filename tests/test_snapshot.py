@@ -0,0 +1,69 @@
+"""Snapshot round-trip: what load_data_and_kb builds is what it reloads."""
+
+import os
+
+import pandas as pd
+import pytest
+
+import snapshot
+from load_data import load_data_and_kb
+from snapshot import load_snapshot, save_snapshot
+
+
+@pytest.fixture(scope="module")
+def built():
+    return load_data_and_kb(use_cache=False, lazy=False)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_round_trip_is_lossless(built, tmp_path, mmap):
+    df, kb = built
+    source = tmp_path / "sales.csv"
+    source.write_text("stand-in source\n")
+
+    save_snapshot(str(tmp_path / "cache"), str(source), df, kb)
+    loaded_df, loaded_kb = load_snapshot(str(tmp_path / "cache"), str(source), mmap=mmap)
+
+    pd.testing.assert_frame_equal(loaded_df, df)
+    assert sorted(loaded_kb) == sorted(kb)
+    for name, table in kb.items():
+        pd.testing.assert_frame_equal(loaded_kb[name], table, obj=name)
+
+
+def test_age_gender_matrix_keeps_axis_dtypes(built, tmp_path):
+    df, kb = built
+    source = tmp_path / "sales.csv"
+    source.write_text("stand-in source\n")
+
+    save_snapshot(str(tmp_path / "cache"), str(source), df, {"age_gender_matrix": kb["age_gender_matrix"]})
+    loaded = load_snapshot(str(tmp_path / "cache"), str(source))[1]["age_gender_matrix"]
+
+    assert loaded.index.dtype == "int8"
+    assert isinstance(loaded.columns, pd.CategoricalIndex)
+    assert loaded.columns.name == "Customer_Gender"
+
+
+def test_warm_load_matches_cold_load(tmp_path):
+    cold_df, cold_kb = load_data_and_kb(cache_dir=str(tmp_path), lazy=False)
+    warm_df, warm_kb = load_data_and_kb(cache_dir=str(tmp_path), lazy=False)
+
+    pd.testing.assert_frame_equal(warm_df, cold_df)
+    for name, table in cold_kb.items():
+        pd.testing.assert_frame_equal(warm_kb[name], table, obj=name)
+
+
+def test_save_keeps_previous_snapshot(built, tmp_path, monkeypatch):
+    df, _ = built
+    source = tmp_path / "sales.csv"
+    source.write_text("stand-in source\n")
+    cache = str(tmp_path / "cache")
+
+    first = save_snapshot(cache, str(source), df, {})
+    second = save_snapshot(cache, str(source), df, {})
+    assert os.path.isdir(first) and os.path.isdir(second)
+
+    # Once superseded twice and past the age limit, the oldest one goes
+    monkeypatch.setattr(snapshot, "STALE_SNAPSHOT_AGE", -1)
+    third = save_snapshot(cache, str(source), df, {})
+    assert not os.path.isdir(first)
+    assert os.path.isdir(second) and os.path.isdir(third)
@@ -0,0 +1,71 @@
+"""resolve_period edge cases: a partial trailing month and empty ranges."""
+
+import pandas as pd
+import pytest
+
+from load_data import load_data_and_kb
+from retriever import InsightRetriever
+from time_index import resolve_period
+
+# The bundled data ends part-way through November 2028
+REFERENCE = pd.Timestamp("2028-11-04")
+
+
+def test_this_month_covers_the_whole_partial_month():
+    period = resolve_period("sales this month", REFERENCE)
+    assert (period.start, period.end) == (pd.Timestamp("2028-11-01"), pd.Timestamp("2028-12-01"))
+    assert period.label == "this month (2028-11)"
+
+
+def test_last_month_is_the_last_complete_month():
+    period = resolve_period("sales last month", REFERENCE)
+    assert (period.start, period.end) == (pd.Timestamp("2028-10-01"), pd.Timestamp("2028-11-01"))
+
+
+def test_window_includes_the_reference_day():
+    period = resolve_period("sales in the last 7 days", REFERENCE)
+    assert period.end == pd.Timestamp("2028-11-05")
+    assert period.end - period.start == pd.Timedelta(days=7)
+
+
+def test_quarter_without_year_has_started():
+    assert resolve_period("q4 sales", REFERENCE).label == "Q4 2028"
+    assert resolve_period("q1 sales", REFERENCE).label == "Q1 2028"
+
+
+def test_single_month_range_is_inclusive():
+    period = resolve_period("from 2025-06 to 2025-06", REFERENCE)
+    assert (period.start, period.end) == (pd.Timestamp("2025-06-01"), pd.Timestamp("2025-07-01"))
+
+
+def test_reversed_range_is_empty():
+    period = resolve_period("sales from 2025-06 to 2025-01", REFERENCE)
+    assert period.start == period.end == pd.Timestamp("2025-06-01")
+
+
+def test_no_period_phrase():
+    assert resolve_period("top products by region", REFERENCE) is None
+
+
+@pytest.fixture(scope="module")
+def retriever():
+    df, kb = load_data_and_kb(use_cache=False, lazy=False)
+    return InsightRetriever(df, kb)
+
+
+def test_reference_date_is_the_latest_row(retriever):
+    assert retriever.reference_date() == REFERENCE
+
+
+def test_partial_trailing_month_only_counts_rows_so_far(retriever):
+    stats = retriever.retrieve("sales this month")
+    assert stats["type"] == "period_stats"
+    assert list(stats["monthly_sales"]) == ["2028-11"]
+    assert stats["transactions"] == int((retriever.df["Date"] >= "2028-11-01").sum())
+
+
+@pytest.mark.parametrize("question", ["sales from 2025-06 to 2025-01", "sales in Q1 2030"])
+def test_empty_range_reports_no_data(retriever, question):
+    stats = retriever.retrieve(question)
+    assert stats["type"] == "period_stats"
+    assert stats["message"] == "No data found for the requested period."